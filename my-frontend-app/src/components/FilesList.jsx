@@ -16,6 +16,8 @@ function FilesList({ currentFolderId, onNavigate }) {
   const [files, setFiles] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   
   const [currentFolderName, setCurrentFolderName] = useState('Root');
   const [folderHistory, setFolderHistory] = useState([]); 
@@ -24,35 +26,36 @@ function FilesList({ currentFolderId, onNavigate }) {
   const [fileVersions, setFileVersions] = useState([]);
   const [loadingVersions, setLoadingVersions] = useState(false);
 
-  const fetchFiles = async () => {
-    setLoading(true);
-    setActiveVersionFileId(null); 
-    try {
-      const token = localStorage.getItem('token');
-      let url = `${domain_name}/files`;
-      if (currentFolderId) {
-        url += `?folder_id=${currentFolderId}`;
+  const fetchPage = async (cursor) => {
+    const token = localStorage.getItem('token');
+    const params = new URLSearchParams();
+    if (currentFolderId) params.append('folder_id', currentFolderId);
+    if (cursor) params.append('cursor', cursor);
+    const query = params.toString();
+    const url = `${domain_name}/files${query ? `?${query}` : ''}`;
+
+    const response = await fetch(url, {
+      method: 'GET',
+      headers: {
+        'Authorization': `Bearer ${token}`,
+        'Content-Type': 'application/json'
       }
+    });
 
-      const response = await fetch(url, {
-        method: 'GET',
-        headers: {
-          'Authorization': `Bearer ${token}`,
-          'Content-Type': 'application/json'
-        }
-      });
+    if (!response.ok) throw new Error(`Error ${response.status}: ${await response.text()}`);
 
-      if (!response.ok) throw new Error(`Error ${response.status}: ${await response.text()}`);
+    const data = await response.json();
+    if (Array.isArray(data)) return { items: data, next_cursor: null };
+    return { items: Array.isArray(data.items) ? data.items : [], next_cursor: data.next_cursor || null };
+  };
 
-      const data = await response.json();
-      
-      if (Array.isArray(data)) {
-        setFiles(data);
-      } else if (data.items && Array.isArray(data.items)) {
-        setFiles(data.items);
-      } else {
-        setFiles([]);
-      }
+  const fetchFiles = async () => {
+    setLoading(true);
+    setActiveVersionFileId(null); 
+    try {
+      const page = await fetchPage(null);
+      setFiles(page.items);
+      setNextCursor(page.next_cursor);
     } catch (err) {
       console.error("Fetch error:", err);
       setError(err.message);
@@ -61,6 +64,22 @@ function FilesList({ currentFolderId, onNavigate }) {
     }
   };
 
+  // Large folders come in pages - the next one is appended on demand
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(nextCursor);
+      setFiles((prev) => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      console.error("Fetch error:", err);
+      setError(err.message);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchFiles();
   }, [currentFolderId]); 
@@ -318,6 +337,16 @@ v{ver.version_no} - {new Date(ver.uploaded_at).toLocaleString()}
           })}
         </ul>
       )}
+
+      {nextCursor && (
+        <button
+          onClick={handleLoadMore}
+          disabled={loadingMore}
+          style={{ cursor: 'pointer', background: '#555', border: 'none', color: 'white', borderRadius: '4px', padding: '5px 10px' }}
+        >
+          {loadingMore ? 'Loading...' : 'Load more'}
+        </button>
+      )}
     </div>
   );
 }
@@ -0,0 +1,28 @@
+"""add blob codec
+
+Revision ID: 7b2e4c1d9a63
+Revises: 3c1f7a9d2b54
+Create Date: 2026-10-17 11:40:27.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e4c1d9a63'
+down_revision: Union[str, Sequence[str], None] = '3c1f7a9d2b54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blobs', sa.Column('codec', sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('blobs', 'codec')
@@ -0,0 +1,30 @@
+"""add blob delta base
+
+Revision ID: a4d81f0c6e27
+Revises: 7b2e4c1d9a63
+Create Date: 2026-10-17 14:05:51.337402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d81f0c6e27'
+down_revision: Union[str, Sequence[str], None] = '7b2e4c1d9a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blobs', sa.Column('delta_base_id', sa.UUID(), nullable=True))
+    op.create_foreign_key('fk_blobs_delta_base_id', 'blobs', 'blobs', ['delta_base_id'], ['id'], ondelete='RESTRICT')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_blobs_delta_base_id', 'blobs', type_='foreignkey')
+    op.drop_column('blobs', 'delta_base_id')
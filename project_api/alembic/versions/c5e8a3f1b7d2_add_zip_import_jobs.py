@@ -0,0 +1,54 @@
+"""add zip import jobs
+
+Revision ID: c5e8a3f1b7d2
+Revises: a4d81f0c6e27
+Create Date: 2026-10-17 18:42:27.905113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8a3f1b7d2'
+down_revision: Union[str, Sequence[str], None] = 'a4d81f0c6e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('zip_import_jobs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('owner_id', sa.UUID(), nullable=False),
+    sa.Column('parent_folder_id', sa.UUID(), nullable=True),
+    sa.Column('root_folder_id', sa.UUID(), nullable=True),
+    sa.Column('archive_name', sa.String(length=512), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('worker_token', sa.UUID(), nullable=True),
+    sa.Column('entries_total', sa.Integer(), nullable=False),
+    sa.Column('entries_processed', sa.Integer(), nullable=False),
+    sa.Column('bytes_written', sa.BigInteger(), nullable=False),
+    sa.Column('dedup_hits', sa.Integer(), nullable=False),
+    sa.Column('error_count', sa.Integer(), nullable=False),
+    sa.Column('errors', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('finished_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['parent_folder_id'], ['files.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['root_folder_id'], ['files.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Wznawianie po restarcie szuka niedokończonych zadań
+    op.create_index('ix_zip_import_jobs_status', 'zip_import_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_zip_import_jobs_status', table_name='zip_import_jobs')
+    op.drop_table('zip_import_jobs')
@@ -0,0 +1,75 @@
+"""add files hierarchy indexes
+
+Revision ID: d7f2b9e4a1c8
+Revises: c5e8a3f1b7d2
+Create Date: 2026-10-17 21:16:08.412950
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7f2b9e4a1c8'
+down_revision: Union[str, Sequence[str], None] = 'c5e8a3f1b7d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Duplikaty blobów (sprzed unikalnego sha256) sklejamy w jeden wiersz - najlepiej pełną treść, nie deltę.
+    # Treść w storage jest pod kluczem z hasha, więc usuwamy tylko wiersze
+    op.execute("""
+        CREATE TEMPORARY TABLE blob_duplicates ON COMMIT DROP AS
+        SELECT id, first_value(id) OVER (
+            PARTITION BY sha256 ORDER BY delta_base_id IS NOT NULL, created_at, id
+        ) AS keep_id
+        FROM blobs
+    """)
+    op.execute("DELETE FROM blob_duplicates WHERE id = keep_id")
+    op.execute("UPDATE file_versions SET blob_id = d.keep_id FROM blob_duplicates d WHERE file_versions.blob_id = d.id")
+    op.execute("UPDATE blobs SET delta_base_id = d.keep_id FROM blob_duplicates d WHERE blobs.delta_base_id = d.id")
+    op.execute("DELETE FROM blobs USING blob_duplicates d WHERE blobs.id = d.id")
+    op.create_index('uq_blobs_sha256', 'blobs', ['sha256'], unique=True)
+    op.create_index('ix_blobs_delta_base_id', 'blobs', ['delta_base_id'], postgresql_where=sa.text('delta_base_id IS NOT NULL'))
+
+    # Powtórzone nazwy w jednym folderze: pierwszy wiersz (folder przed plikiem, potem najstarszy) zostaje,
+    # reszta dostaje przed rozszerzeniem początek swojego id, np. "raport (1a2b3c4d).pdf"
+    op.execute(r"""
+        UPDATE files
+        SET name = regexp_replace(files.name, '(\.[^./]*)?$', ' (' || left(files.id::text, 8) || ')\1')
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY owner_id, parent_folder_id, name ORDER BY is_folder DESC, created_at, id
+            ) AS position
+            FROM files
+            WHERE owner_id IS NOT NULL
+        ) d
+        WHERE files.id = d.id AND d.position > 1
+    """)
+    op.create_index('uq_files_owner_parent_name', 'files', ['owner_id', 'parent_folder_id', 'name'], unique=True)
+    op.create_index('uq_files_owner_root_name', 'files', ['owner_id', 'name'], unique=True, postgresql_where=sa.text('parent_folder_id IS NULL'))
+    op.create_index('ix_files_owner_parent_listing', 'files', ['owner_id', 'parent_folder_id', sa.text('is_folder DESC'), 'name', 'id'])
+    op.create_index('ix_files_parent_folder_id', 'files', ['parent_folder_id'])
+    op.create_index('ix_files_current_version_id', 'files', ['current_version_id'])
+
+    op.create_index('ix_file_versions_blob_id', 'file_versions', ['blob_id'])
+    op.create_index('ix_logbook_user_occurred_at', 'logbook', ['user_id', 'occurred_at'])
+    op.create_index('ix_logbook_file_id', 'logbook', ['file_id'], postgresql_where=sa.text('file_id IS NOT NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_logbook_file_id', table_name='logbook')
+    op.drop_index('ix_logbook_user_occurred_at', table_name='logbook')
+    op.drop_index('ix_file_versions_blob_id', table_name='file_versions')
+    op.drop_index('ix_files_current_version_id', table_name='files')
+    op.drop_index('ix_files_parent_folder_id', table_name='files')
+    op.drop_index('ix_files_owner_parent_listing', table_name='files')
+    op.drop_index('uq_files_owner_root_name', table_name='files')
+    op.drop_index('uq_files_owner_parent_name', table_name='files')
+    op.drop_index('ix_blobs_delta_base_id', table_name='blobs')
+    op.drop_index('uq_blobs_sha256', table_name='blobs')
@@ -0,0 +1,77 @@
+"""
+Benchmark: przepustowość (pliki/s) dla wielu małych plików -
+N osobnych POST /files/ kontra jeden POST /files/batch.
+
+Żądania idą przez ASGI (bez sieci), baza to plik SQLite, storage to LocalBlobStorage
+w katalogu tymczasowym - tak samo jak w bench_hash_offload.py.
+
+    python benchmarks/bench_batch_upload.py --files 2000 --size-kb 4
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from httpx import AsyncClient, ASGITransport
+
+from bench_hash_offload import _setup
+from src.main import app
+
+
+async def _single(client: AsyncClient, payloads: list[tuple[str, bytes]], concurrency: int) -> None:
+    window = asyncio.Semaphore(concurrency)
+
+    async def post(name: str, content: bytes) -> None:
+        async with window:
+            response = await client.post("/api/v1/files/", files={"file": (name, content)})
+            assert response.status_code == 201, response.text
+
+    await asyncio.gather(*(post(name, content) for name, content in payloads))
+
+
+async def _batch(client: AsyncClient, payloads: list[tuple[str, bytes]]) -> None:
+    response = await client.post(
+        "/api/v1/files/batch",
+        files=[("files", (name, content)) for name, content in payloads],
+    )
+    assert response.status_code == 201, response.text
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000, help="liczba plików")
+    parser.add_argument("--size-kb", type=int, default=4, help="rozmiar każdego pliku")
+    # SQLite pozwala na jednego piszącego naraz, więc domyślnie żądania idą po kolei
+    parser.add_argument("--concurrency", type=int, default=1, help="równoległe POST /files/ w wariancie pojedynczym")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, _, _, _ = await _setup(Path(tmp))
+        print(f"{args.files} files x {args.size_kb} KB")
+        print(f"{'mode':<16}{'seconds':>10}{'files/s':>10}")
+        try:
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+                for mode in ("single", "batch"):
+                    # Osobna treść na przebieg, żeby deduplikacja nie faworyzowała drugiego
+                    payloads = [
+                        (f"{mode}_{i}.bin", os.urandom(args.size_kb * 1024))
+                        for i in range(args.files)
+                    ]
+                    start = time.perf_counter()
+                    if mode == "single":
+                        await _single(client, payloads, args.concurrency)
+                    else:
+                        await _batch(client, payloads)
+                    elapsed = time.perf_counter() - start
+                    print(f"{mode:<16}{elapsed:>10.2f}{args.files / elapsed:>10.1f}")
+        finally:
+            app.dependency_overrides.clear()
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+Benchmark: ścieżka (breadcrumbs) folderu na głębokości 1..64 - dawna pętla po przodkach
+(FileRepo.get_by_id na poziom, z selectinload wersji i bloba) kontra jedno rekurencyjne CTE (FileRepo.get_ancestors).
+Mierzy czas i liczbę instrukcji SQL na jedno rozwiązanie ścieżki.
+
+Baza to plik SQLite w katalogu tymczasowym - bez sieci, więc koszt round tripu jest bliski zeru.
+--rtt-ms dolicza opóźnienie do każdej instrukcji (jak odległy Postgres), żeby było widać, ile kosztują same round tripy.
+
+    python benchmarks/bench_breadcrumbs.py --depths 1 4 12 32 64 --rtt-ms 0.5
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import event
+
+from bench_hash_offload import _setup
+from src.infrastructure.uow import SqlAlchemyUoW
+
+
+async def _build_chain(session_factory, user, depth: int, siblings: int) -> list:
+    """Łańcuch folderów o zadanej głębokości; na każdym poziomie siblings dodatkowych folderów obok."""
+    uow = SqlAlchemyUoW(session_factory)
+    chain, rows, parent_id = [], [], None
+    for level in range(depth):
+        folder_id = uuid4()
+        for i in range(siblings):
+            rows.append({
+                "id": uuid4(), "owner_id": user.id, "name": f"sibling{i}", "is_folder": True,
+                "parent_folder_id": parent_id, "mime_type": "application/directory",
+            })
+        rows.append({
+            "id": folder_id, "owner_id": user.id, "name": f"level{level}", "is_folder": True,
+            "parent_folder_id": parent_id, "mime_type": "application/directory",
+        })
+        chain.append(folder_id)
+        parent_id = folder_id
+    async with uow:
+        await uow.files.add_many(rows)
+    return chain
+
+
+async def _loop(uow: SqlAlchemyUoW, user_id, folder_id) -> list:
+    # Dawne zachowanie list_files: get_by_id na każdy poziom
+    breadcrumbs = []
+    curr = await uow.files.get_by_id(folder_id)
+    while curr:
+        breadcrumbs.insert(0, {"id": str(curr.id), "name": curr.name})
+        curr = await uow.files.get_by_id(curr.parent_folder_id) if curr.parent_folder_id else None
+    return breadcrumbs
+
+
+async def _cte(uow: SqlAlchemyUoW, user_id, folder_id) -> list:
+    return [{"id": str(row.id), "name": row.name} for row in await uow.files.get_ancestors(user_id, folder_id)]
+
+
+async def _bench(depths: list[int], siblings: int, repeat: int, rtt_ms: float) -> None:
+    print(f"{'depth':>6}{'method':>8}{'ms/op':>10}{'SQL/op':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, session_factory, _, user = await _setup(Path(tmp))
+        statements = 0
+
+        def on_statement(*args):
+            nonlocal statements
+            statements += 1
+            if rtt_ms:
+                time.sleep(rtt_ms / 1000)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", on_statement)
+        for depth in depths:
+            chain = await _build_chain(session_factory, user, depth, siblings)
+            uow = SqlAlchemyUoW(session_factory)
+            results = {}
+            for name, method in (("loop", _loop), ("cte", _cte)):
+                async with uow:
+                    results[name] = await method(uow, user.id, chain[-1])  # rozgrzewka
+                statements = 0
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    async with uow:
+                        await method(uow, user.id, chain[-1])
+                elapsed = time.perf_counter() - start
+                print(f"{depth:>6}{name:>8}{elapsed / repeat * 1000:>10.2f}{statements / repeat:>8.0f}")
+            assert results["loop"] == results["cte"]
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 4, 12, 32, 64])
+    parser.add_argument("--siblings", type=int, default=50, help="dodatkowe foldery na każdym poziomie")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="sztuczne opóźnienie każdej instrukcji SQL")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(_bench(args.depths, args.siblings, args.repeat, args.rtt_ms))
+
+
+if __name__ == "__main__":
+    main()
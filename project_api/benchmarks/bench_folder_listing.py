@@ -0,0 +1,106 @@
+"""
+Benchmark: GET /files/ na folderze z --entries dziećmi (domyślnie 200k) - cały folder w jednej odpowiedzi
+(all=true, limit podniesiony na czas pomiaru) kontra pierwsza strona i przejście po wszystkich stronach kursorem.
+Mierzy czas żądania, rozmiar JSON-a i liczbę instrukcji SQL.
+
+Baza to plik SQLite w katalogu tymczasowym; żądania idą przez aplikację (ASGITransport), razem z serializacją.
+
+    python benchmarks/bench_folder_listing.py --entries 200000 --limit 200
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+
+from bench_hash_offload import _setup
+from src.config.app_config import settings
+from src.infrastructure.uow import SqlAlchemyUoW
+from src.main import app
+
+
+async def _fill_folder(session_factory, user, entries: int):
+    uow = SqlAlchemyUoW(session_factory)
+    folder_id = uuid4()
+    async with uow:
+        await uow.files.add_many([{
+            "id": folder_id, "owner_id": user.id, "name": "camera", "is_folder": True,
+            "parent_folder_id": None, "mime_type": "application/directory",
+        }])
+    for start in range(0, entries, 10_000):
+        async with uow:
+            await uow.files.add_many([{
+                "id": uuid4(), "owner_id": user.id, "name": f"IMG_{i:07d}.jpg", "is_folder": False,
+                "parent_folder_id": folder_id, "mime_type": "image/jpeg",
+            } for i in range(start, min(start + 10_000, entries))])
+    return folder_id
+
+
+async def _bench(entries: int, limit: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, session_factory, _, user = await _setup(Path(tmp))
+        folder_id = await _fill_folder(session_factory, user, entries)
+        settings.list_unpaginated_max_items = entries
+        statements = 0
+
+        def count(*args):
+            nonlocal statements
+            statements += 1
+
+        event.listen(engine.sync_engine, "before_cursor_execute", count)
+        print(f"entries={entries} limit={limit}")
+        print(f"{'case':<12}{'requests':>10}{'seconds':>10}{'ms/request':>12}{'JSON MB':>10}{'SQL':>8}")
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            async def get(**params) -> tuple[dict, int]:
+                response = await client.get("/api/v1/files/", params={"folder_id": str(folder_id), **params})
+                assert response.status_code == 200, response.text
+                return response.json(), len(response.content)
+
+            def report(case: str, requests: int, elapsed: float, size: int) -> None:
+                print(f"{case:<12}{requests:>10}{elapsed:>10.2f}{elapsed / requests * 1000:>12.1f}"
+                      f"{size / 1024 / 1024:>10.2f}{statements:>8}")
+
+            statements = 0
+            start = time.perf_counter()
+            data, size = await get(all="true")
+            report("all", 1, time.perf_counter() - start, size)
+            assert len(data["items"]) == entries
+
+            statements = 0
+            start = time.perf_counter()
+            data, size = await get(limit=limit)
+            report("first page", 1, time.perf_counter() - start, size)
+
+            statements, requests, total, seen, cursor = 0, 0, 0, 0, None
+            start = time.perf_counter()
+            while True:
+                data, size = await get(limit=limit, **({"cursor": cursor} if cursor else {}))
+                requests, total, seen = requests + 1, total + size, seen + len(data["items"])
+                cursor = data["next_cursor"]
+                if cursor is None:
+                    break
+            report("all pages", requests, time.perf_counter() - start, total)
+            assert seen == entries
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=200_000)
+    parser.add_argument("--limit", type=int, default=settings.list_page_size)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(_bench(args.entries, args.limit))
+
+
+if __name__ == "__main__":
+    main()
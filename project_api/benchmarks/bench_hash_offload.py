@@ -0,0 +1,179 @@
+"""
+Benchmark: opóźnienie GET /files/ w trakcie równoległych dużych uploadów,
+z hashowaniem SHA-256 w pętli zdarzeń (hash_worker_threads=0) i w puli wątków.
+
+Uploady idą przez FileService.upload_file (staging + hash), a sonda co kilka ms
+woła GET /api/v1/files/ przez ASGI i zbiera czasy odpowiedzi (p50 / p99 / max).
+Baza to plik SQLite w katalogu tymczasowym, storage to LocalBlobStorage w tym samym katalogu.
+
+    python benchmarks/bench_hash_offload.py --uploads 4 --size-mb 128 --threads 4
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.dialects.postgresql import INET, JSONB
+from starlette.datastructures import UploadFile, Headers
+
+from src.main import app
+from src.config.app_config import settings
+from src.deps import get_uow, get_storage
+from src.api.auto_auth import current_user
+from src.api.schemas.users import UserFromToken
+from src.application.file_service import FileService
+from src.application.logbook_service import LogbookService
+from src.common.utils import hash_utils
+from src.domain.entities.user import User
+from src.infrastructure.db.base import Base
+from src.infrastructure.storage.LocalBlobStorage import LocalBlobStorage
+from src.infrastructure.uow import SqlAlchemyUoW
+from src.rate_limiting import limiter
+
+
+@compiles(INET, "sqlite")
+def _inet_sqlite(type_, compiler, **kw):
+    return "VARCHAR(45)"
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_sqlite(type_, compiler, **kw):
+    return "TEXT"
+
+
+async def _setup(workdir: Path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{workdir / 'bench.db'}")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _register_now(dbapi_conn, _):
+        import datetime
+        dbapi_conn.create_function("now", 0, lambda: datetime.datetime.now(datetime.timezone.utc).isoformat())
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    user = User(display_name="bench", email="bench@example.com", hashed_password="x")
+    uow = SqlAlchemyUoW(session_factory)
+    async with uow:
+        await uow.users.add(user)
+        await uow.commit()
+
+    storage = LocalBlobStorage(base_path=str(workdir / "blobs"))
+    app.dependency_overrides[get_uow] = lambda: SqlAlchemyUoW(session_factory)
+    app.dependency_overrides[get_storage] = lambda: storage
+    app.dependency_overrides[current_user] = lambda: UserFromToken(
+        id=user.id, email=user.email, display_name=user.display_name
+    )
+    limiter.enabled = False
+    return engine, session_factory, storage, user
+
+
+def _make_source_files(workdir: Path, count: int, size_mb: int) -> list[Path]:
+    paths = []
+    block = os.urandom(1024 * 1024)
+    for i in range(count):
+        path = workdir / f"source_{i}.bin"
+        with open(path, "wb") as f:
+            for n in range(size_mb):
+                # Każdy plik inny, żeby deduplikacja nie skróciła pracy
+                f.write(block[:-8] + i.to_bytes(4, "big") + n.to_bytes(4, "big"))
+        paths.append(path)
+    return paths
+
+
+async def _upload(filesvc: FileService, session_factory, user, path: Path, run: str) -> None:
+    with open(path, "rb") as f:
+        upload = UploadFile(
+            file=f,
+            filename=f"{run}_{path.name}",
+            size=path.stat().st_size,
+            headers=Headers({"content-type": "application/octet-stream"}),
+        )
+        await filesvc.upload_file(
+            user_id=user.id,
+            file=upload,
+            parent_folder_id=None,
+            ip="127.0.0.1",
+            user_agent="bench",
+            uow=SqlAlchemyUoW(session_factory),
+        )
+
+
+async def _probe(client: AsyncClient, stop: asyncio.Event, interval: float) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/api/v1/files/")
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.text
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def _run(threads: int, sources: list[Path], session_factory, storage, user, interval: float) -> dict:
+    settings.hash_worker_threads = threads
+    hash_utils._executor = None
+    filesvc = FileService(LogbookService(), storage)
+    run = f"t{threads}"
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe(client, stop, interval))
+        start = time.perf_counter()
+        await asyncio.gather(*(_upload(filesvc, session_factory, user, p, run) for p in sources))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        latencies = await probe
+
+    latencies.sort()
+    return {
+        "threads": threads,
+        "upload_seconds": elapsed,
+        "samples": len(latencies),
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "max_ms": latencies[-1],
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=4, help="liczba równoległych uploadów")
+    parser.add_argument("--size-mb", type=int, default=128, help="rozmiar każdego uploadu")
+    parser.add_argument("--threads", type=int, default=4, help="hash_worker_threads dla wariantu z pulą")
+    parser.add_argument("--interval-ms", type=float, default=5.0, help="odstęp między zapytaniami sondy")
+    args = parser.parse_args()
+    # src.main włącza DEBUG - logi każdego zapytania zafałszowałyby pomiar
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        engine, session_factory, storage, user = await _setup(workdir)
+        sources = _make_source_files(workdir, args.uploads, args.size_mb)
+        print(f"{args.uploads} x {args.size_mb} MB uploads, probing GET /files/ every {args.interval_ms} ms")
+        print(f"{'hashing':<16}{'upload s':>10}{'samples':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+        try:
+            for threads in (0, args.threads):
+                r = await _run(threads, sources, session_factory, storage, user, args.interval_ms / 1000)
+                label = "event loop" if threads == 0 else f"pool({threads})"
+                print(f"{label:<16}{r['upload_seconds']:>10.2f}{r['samples']:>9}"
+                      f"{r['p50_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['max_ms']:>9.1f}")
+        finally:
+            app.dependency_overrides.clear()
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
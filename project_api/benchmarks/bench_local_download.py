@@ -0,0 +1,113 @@
+"""
+Benchmark: koszt pobierania dużego pliku z LocalBlobStorage -
+generator (StreamingResponse z storage.get) kontra FileResponse ze Starlette z pathsend (plik wysyła serwer).
+Serwer bez pathsend (uvicorn) dostaje generator także przy DOWNLOAD_SENDFILE=True - wiersz "no pathsend".
+
+Żądania idą bezpośrednio do aplikacji ASGI, a send tylko zlicza bajty, więc mierzymy
+pracę po stronie aplikacji: GB/s i sekundy CPU procesu (wszystkie wątki) na GB.
+Przy pathsend resztę (sendfile) wykonuje jądro na zlecenie serwera - tego tu nie widać.
+
+    python benchmarks/bench_local_download.py --size-mb 512 --repeat 5
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from httpx import AsyncClient, ASGITransport
+
+from bench_hash_offload import _setup
+from src.main import app
+from src.config.app_config import settings
+
+GB = 1024 ** 3
+
+
+async def _download(path: str, extensions: dict) -> int:
+    received = 0
+    status = None
+    request_sent = False
+    done = asyncio.Event()
+
+    async def receive():
+        # Po treści żądania receive czeka na rozłączenie, jak w prawdziwym serwerze
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal received, status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+        elif message["type"] == "http.response.pathsend":
+            received += os.path.getsize(message["path"])
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+        "extensions": extensions,
+    }
+    await app(scope, receive, send)
+    done.set()
+    assert status == 200, status
+    return received
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=512, help="rozmiar pobieranego pliku")
+    parser.add_argument("--repeat", type=int, default=5, help="liczba pobrań na wariant")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, _, _, _ = await _setup(Path(tmp))
+        try:
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+                content = os.urandom(args.size_mb * 1024 * 1024)
+                response = await client.post("/api/v1/files/", files={"file": ("big.bin", content)})
+                assert response.status_code == 201, response.text
+                del content
+            path = f"/api/v1/files/{response.json()['id']}/download"
+
+            print(f"{args.repeat} x {args.size_mb} MB download (page cache warm)")
+            print(f"{'mode':<26}{'GB/s':>8}{'CPU s/GB':>10}")
+            variants = (
+                ("generator", False, {}),
+                ("sendfile on, no pathsend", True, {}),
+                ("file response + pathsend", True, {"http.response.pathsend": {}}),
+            )
+            for label, sendfile, extensions in variants:
+                settings.download_sendfile = sendfile
+                await _download(path, extensions)  # rozgrzewka: cache stron, połączenia z bazą
+                received = 0
+                wall, cpu = time.perf_counter(), time.process_time()
+                for _ in range(args.repeat):
+                    received += await _download(path, extensions)
+                wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+                print(f"{label:<26}{received / GB / wall:>8.2f}{cpu / (received / GB):>10.3f}")
+        finally:
+            app.dependency_overrides.clear()
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
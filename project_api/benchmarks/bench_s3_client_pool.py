@@ -0,0 +1,141 @@
+"""
+Benchmark: narzut S3BlobStorage na jedną operację - klient per wywołanie (stare zachowanie:
+nowy S3BlobStorage w get_storage i nowy klient aioboto3 w każdym save/get/exists)
+kontra jeden klient otwarty w lifespan, ze wspólną pulą keep-alive.
+
+Mierzy opóźnienie (p50/p99) i sekundy CPU na operację dla exists() i get() małego bloba,
+sekwencyjnie i z --concurrency żądaniami naraz.
+
+Domyślnie uruchamia lokalny zamiennik S3 (moto_server, `pip install "moto[server]"`) w osobnym procesie.
+Aby mierzyć na MinIO: S3_ENDPOINT_URL=http://localhost:9000 python benchmarks/bench_s3_client_pool.py
+
+    python benchmarks/bench_s3_client_pool.py --ops 500 --concurrency 16
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.common.utils.stream_utils import AsyncBytesIO
+from src.infrastructure.storage.S3BlobStorage import S3BlobStorage
+
+BUCKET = "bench-bucket"
+KEY = "bench-blob"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _storage(endpoint: str, pool: int) -> S3BlobStorage:
+    return S3BlobStorage(
+        bucket=BUCKET,
+        region="us-east-1",
+        aws_access_key_id="bench",
+        aws_secret_access_key="bench",
+        endpoint_url=endpoint,
+        max_pool_connections=pool,
+    )
+
+
+async def _operation(storage: S3BlobStorage, op: str) -> None:
+    if op == "exists":
+        assert await storage.exists(KEY)
+    else:
+        async for _ in storage.get(KEY):
+            pass
+
+
+async def _run_case(endpoint: str, case: str, op: str, ops: int, concurrency: int, pool: int) -> dict:
+    shared = _storage(endpoint, pool)
+    if case == "shared":
+        await shared.open()
+    window = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one() -> None:
+        async with window:
+            start = time.perf_counter()
+            # Per wywołanie - jak dawny get_storage: nowa instancja, a w niej nowy klient
+            storage = shared if case == "shared" else _storage(endpoint, pool)
+            await _operation(storage, op)
+            latencies.append(time.perf_counter() - start)
+
+    try:
+        await one()  # rozgrzewka: pierwsze połączenie i ładowanie modeli botocore
+        latencies.clear()
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(ops)))
+        cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    finally:
+        await shared.close()
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "ops_s": ops / wall,
+        "cpu_ms_op": cpu / ops * 1000,
+    }
+
+
+async def _prepare(endpoint: str, size_kb: int) -> None:
+    storage = _storage(endpoint, 1)
+    async with storage._client() as s3:
+        try:
+            await s3.create_bucket(Bucket=BUCKET)
+        except s3.exceptions.BucketAlreadyOwnedByYou:
+            pass
+    await storage.save(AsyncBytesIO(os.urandom(size_kb * 1024)), KEY)
+
+
+async def _bench(endpoint: str, args) -> None:
+    await _prepare(endpoint, args.size_kb)
+    print(f"endpoint={endpoint} ops={args.ops} blob={args.size_kb} KB pool={args.pool}")
+    print(f"{'op':<8}{'case':<10}{'conc':>6}{'p50 ms':>10}{'p99 ms':>10}{'ops/s':>10}{'CPU ms/op':>12}")
+    for op in ("exists", "get"):
+        for concurrency in (1, args.concurrency):
+            for case in ("per_call", "shared"):
+                r = await _run_case(endpoint, case, op, args.ops, concurrency, args.pool)
+                print(f"{op:<8}{case:<10}{concurrency:>6}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+                      f"{r['ops_s']:>10.0f}{r['cpu_ms_op']:>12.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--size-kb", type=int, default=4)
+    parser.add_argument("--pool", type=int, default=50)
+    args = parser.parse_args()
+
+    endpoint = os.environ.get("S3_ENDPOINT_URL")
+    server = None
+    if not endpoint:
+        port = _free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "moto.server", "-p", str(port)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        endpoint = f"http://127.0.0.1:{port}"
+        time.sleep(2)
+
+    try:
+        asyncio.run(_bench(endpoint, args))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
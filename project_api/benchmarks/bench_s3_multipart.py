@@ -0,0 +1,148 @@
+"""
+Benchmark: S3BlobStorage.save - jeden put_object (stare zachowanie) vs streaming multipart.
+
+Mierzy przepustowość (MB/s) i szczytowe RSS procesu dla uploadu N MB.
+Każdy przypadek startuje w osobnym procesie, żeby ru_maxrss nie mieszał się między nimi.
+
+Domyślnie uruchamia lokalny zamiennik S3 (moto_server, `pip install "moto[server]"`) w osobnym procesie.
+Aby mierzyć na MinIO: S3_ENDPOINT_URL=http://localhost:9000 python benchmarks/bench_s3_multipart.py
+
+    python benchmarks/bench_s3_multipart.py --size-mb 256 --part-size-mb 8 --concurrency 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+BUCKET = "bench-bucket"
+
+
+class SyntheticStream:
+    """Asynchroniczny strumień size_bytes bajtów generowany w locie (nie trzyma całości w pamięci)."""
+
+    def __init__(self, size_bytes: int):
+        self._remaining = size_bytes
+        self._block = os.urandom(1024 * 1024)
+
+    async def read(self, size=-1):
+        if self._remaining <= 0:
+            return b""
+        if size < 0:
+            size = self._remaining
+        size = min(size, self._remaining)
+        out = bytearray()
+        while len(out) < size:
+            out += self._block[: size - len(out)]
+        self._remaining -= size
+        return bytes(out)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _peak_rss_mb() -> float:
+    # Linux raportuje ru_maxrss w KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _run_case(case: str, endpoint: str, size_mb: int, part_size_mb: int, concurrency: int) -> dict:
+    from src.infrastructure.storage.S3BlobStorage import S3BlobStorage
+
+    storage = S3BlobStorage(
+        bucket=BUCKET,
+        region="us-east-1",
+        aws_access_key_id="bench",
+        aws_secret_access_key="bench",
+        endpoint_url=endpoint,
+        part_size=part_size_mb * 1024 * 1024,
+        max_concurrency=concurrency,
+    )
+    stream = SyntheticStream(size_mb * 1024 * 1024)
+    baseline_rss = _peak_rss_mb()
+
+    start = time.perf_counter()
+    if case == "put_object":
+        async with storage._client() as s3:
+            content = await stream.read()
+            await s3.put_object(Bucket=BUCKET, Key=f"bench-{case}", Body=content)
+    else:
+        await storage.save(stream, f"bench-{case}")
+    elapsed = time.perf_counter() - start
+
+    return {
+        "case": case,
+        "size_mb": size_mb,
+        "seconds": round(elapsed, 3),
+        "throughput_mb_s": round(size_mb / elapsed, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "rss_growth_mb": round(_peak_rss_mb() - baseline_rss, 1),
+    }
+
+
+async def _create_bucket(endpoint: str) -> None:
+    import aioboto3
+    session = aioboto3.Session(aws_access_key_id="bench", aws_secret_access_key="bench", region_name="us-east-1")
+    async with session.client("s3", endpoint_url=endpoint) as s3:
+        try:
+            await s3.create_bucket(Bucket=BUCKET)
+        except s3.exceptions.BucketAlreadyOwnedByYou:
+            pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--part-size-mb", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--case", choices=["put_object", "multipart"], help=argparse.SUPPRESS)
+    parser.add_argument("--endpoint", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        result = asyncio.run(_run_case(args.case, args.endpoint, args.size_mb, args.part_size_mb, args.concurrency))
+        print(json.dumps(result))
+        return
+
+    endpoint = os.environ.get("S3_ENDPOINT_URL")
+    server = None
+    if not endpoint:
+        port = _free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "moto.server", "-p", str(port)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        endpoint = f"http://127.0.0.1:{port}"
+        time.sleep(2)
+
+    try:
+        asyncio.run(_create_bucket(endpoint))
+        print(f"endpoint={endpoint} size={args.size_mb} MB part={args.part_size_mb} MB concurrency={args.concurrency}")
+        print(f"{'case':<12}{'seconds':>10}{'MB/s':>10}{'peak RSS MB':>14}{'RSS growth MB':>16}")
+        for case in ("put_object", "multipart"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--case", case, "--endpoint", endpoint,
+                 "--size-mb", str(args.size_mb), "--part-size-mb", str(args.part_size_mb),
+                 "--concurrency", str(args.concurrency)],
+                capture_output=True, text=True, check=True,
+            )
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{r['case']:<12}{r['seconds']:>10}{r['throughput_mb_s']:>10}{r['peak_rss_mb']:>14}{r['rss_growth_mb']:>16}")
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: import archiwum ZIP (zadanie: create_zip_import_job + run_zip_import_job) dla syntetycznych archiwów
+z 1k / 10k / 100k wpisów - czas, wpisy/s, MB/s treści, liczba instrukcji SQL i sekundy CPU procesu.
+
+Archiwum: unikalne pliki po 100 w folderze, w drzewie dwóch poziomów folderów; domyślnie małe,
+z --member-kb duże i kompresowalne (deflate), żeby było widać rozpakowywanie i hashowanie.
+Każdy rozmiar importowany jest dwa razy: do pustego konta i ponownie (istniejące drzewo - nowe wersje),
+dla każdej liczby pracowników z --workers (ZIP_IMPORT_WORKERS). Paczki zadania - ZIP_IMPORT_BATCH_ENTRIES.
+Baza to plik SQLite w katalogu tymczasowym, storage to LocalBlobStorage w tym samym katalogu.
+
+    python benchmarks/bench_zip_import.py --entries 1000 10000 100000
+    python benchmarks/bench_zip_import.py --entries 64 --member-kb 8192 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import event
+from starlette.datastructures import UploadFile, Headers
+
+from bench_hash_offload import _setup
+from src.application.file_service import FileService
+from src.application.logbook_service import LogbookService
+from src.config.app_config import settings
+from src.infrastructure.uow import SqlAlchemyUoW
+
+
+def _make_archive(path: Path, entries: int, member_kb: int) -> int:
+    compression = zipfile.ZIP_DEFLATED if member_kb else zipfile.ZIP_STORED
+    # Tekst z losowymi wstawkami - deflate ma co robić, a każdy członek jest inny
+    block = b"".join(os.urandom(8).hex().encode() + b" lorem ipsum dolor sit amet\n" for _ in range(1024))
+    total = 0
+    with zipfile.ZipFile(path, "w", compression) as archive:
+        for i in range(entries):
+            content = f"entry {i}\n".encode() * 4
+            if member_kb:
+                content = (content + block * (member_kb * 1024 // len(block) + 1))[:member_kb * 1024]
+            archive.writestr(f"data/d{i // 10000}/f{i // 100 % 100}/file{i}.txt", content)
+            total += len(content)
+    return total
+
+
+async def _import(filesvc: FileService, session_factory, user, archive_path: Path) -> float:
+    with open(archive_path, "rb") as f:
+        upload = UploadFile(file=f, filename="import.zip", headers=Headers({"content-type": "application/zip"}))
+        uow = SqlAlchemyUoW(session_factory)
+        start = time.perf_counter()
+        result = await filesvc.create_zip_import_job(
+            uow=uow,
+            user_id=user.id,
+            file=upload,
+            parent_folder_id=None,
+            ip="127.0.0.1",
+            user_agent="bench",
+        )
+        await filesvc.run_zip_import_job(uow, result["job_id"])
+        elapsed = time.perf_counter() - start
+    job = await filesvc.get_zip_import_job(uow, user.id, result["job_id"])
+    assert job.status == "completed" and job.entries_processed == job.entries_total > 0, (job.status, job.error, job.entries_processed)
+    return elapsed
+
+
+async def _bench(entries_list: list[int], member_kb: int, workers_list: list[int]) -> None:
+    print(f"{'entries':>8}{'workers':>8}{'run':>10}{'seconds':>10}{'entries/s':>12}{'MB/s':>8}{'SQL stmts':>11}{'CPU s':>8}")
+    for entries in entries_list:
+        for workers in workers_list:
+            settings.zip_import_workers = workers
+            with tempfile.TemporaryDirectory() as tmp:
+                workdir = Path(tmp)
+                engine, session_factory, storage, user = await _setup(workdir)
+                filesvc = FileService(LogbookService(), storage)
+                archive_path = workdir / "import.zip"
+                content_mb = _make_archive(archive_path, entries, member_kb) / 1024 / 1024
+
+                statements = 0
+
+                def count(*args):
+                    nonlocal statements
+                    statements += 1
+
+                event.listen(engine.sync_engine, "before_cursor_execute", count)
+                for run in ("fresh", "reimport"):
+                    statements = 0
+                    cpu_start = time.process_time()
+                    elapsed = await _import(filesvc, session_factory, user, archive_path)
+                    cpu = time.process_time() - cpu_start
+                    print(f"{entries:>8}{workers:>8}{run:>10}{elapsed:>10.2f}{entries / elapsed:>12.0f}"
+                          f"{content_mb / elapsed:>8.0f}{statements:>11}{cpu:>8.2f}")
+                await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--member-kb", type=int, default=0, help="rozmiar członka (0 = małe pliki tekstowe)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[settings.zip_import_workers])
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    # Limit rozmiaru dotyczy treści, nie liczby wpisów - syntetyczne archiwa go nie przekraczają
+    settings.max_file_upload_size_mb = max(settings.max_file_upload_size_mb, 1024)
+    asyncio.run(_bench(args.entries, args.member_kb, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from urllib.parse import quote
+from fastapi import Request
+from fastapi.responses import FileResponse, RedirectResponse, Response, StreamingResponse
+from src.application.errors import RangeNotSatisfiableError
+from src.config.app_config import settings
+
+_RANGE_RE = re.compile(r"^\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*$", re.IGNORECASE)
+
+# Treść wersji nigdy się nie zmienia - klient może ją trzymać w cache bez rewalidacji.
+# "private", bo odpowiedź wymaga zalogowania i nie powinna lądować we współdzielonych cache'ach
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# Bieżąca wersja pliku może się zmienić - klient trzyma kopię, ale pyta o nią warunkowo
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def parse_range(header: Optional[str], size_bytes: int) -> Optional[tuple[int, int]]:
+    """
+    Pojedynczy zakres z nagłówka Range ("bytes=0-99", "bytes=100-", "bytes=-100") jako (start, end) włącznie.
+    None - brak nagłówka, zła składnia albo kilka zakresów (wtedy odsyłamy cały plik, co RFC 9110 dopuszcza).
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header)
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.group(1), match.group(2)
+
+    if first == "":
+        # Sufiks: ostatnie N bajtów
+        suffix = int(last)
+        if suffix == 0 or size_bytes == 0:
+            raise RangeNotSatisfiableError(size_bytes)
+        return max(size_bytes - suffix, 0), size_bytes - 1
+
+    start = int(first)
+    if start >= size_bytes:
+        raise RangeNotSatisfiableError(size_bytes)
+    end = int(last) if last else size_bytes - 1
+    if end < start:
+        return None
+    return start, min(end, size_bytes - 1)
+
+
+def _as_utc(value) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def if_range_matches(header: str, etag: str, last_modified: datetime) -> bool:
+    """If-Range: zakres obowiązuje tylko, jeśli wersja się nie zmieniła (silny ETag albo dokładna data)."""
+    header = header.strip()
+    if header.startswith('"') or header.startswith("W/"):
+        return header == etag
+    try:
+        return _as_utc(parsedate_to_datetime(header)) == last_modified.replace(microsecond=0)
+    except (TypeError, ValueError):
+        return False
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """
+    Czy klient ma już tę treść (RFC 9110, 13.2.2): If-None-Match ma pierwszeństwo,
+    If-Modified-Since liczy się tylko bez niego.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Porównanie słabe - W/"x" pasuje do "x"
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        return last_modified.replace(microsecond=0) <= _as_utc(parsedate_to_datetime(if_modified_since))
+    except (TypeError, ValueError):
+        return False
+
+
+async def build_download_response(request: Request, file_stream, version, filename: str, media_type: str, immutable: bool = False):
+    """
+    Odpowiedź z treścią wersji pliku: 304, gdy klient ma aktualną kopię, 200 z całością
+    albo 206 z zakresem z nagłówka Range.
+    ETag to SHA-256 treści, więc jest silny i wspólny dla wszystkich plików o tej samej zawartości.
+    Storage nie jest dotykany przed wysłaniem treści - 304 kosztuje tylko odczyt metadanych.
+    Surowy blob z lokalnego dysku przy serwerze z pathsend idzie jako FileResponse (plik wysyła serwer,
+    Range i wiele zakresów obsługuje Starlette), a z S3 (przy s3_download_redirect) - jako 302 na presigned GET; Range obsługuje wtedy S3.
+    """
+    size_bytes = version.blob.size_bytes
+    etag = f'"{version.blob.sha256}"'
+    last_modified = _as_utc(version.uploaded_at)
+    validators = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+    }
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=validators)
+
+    if settings.s3_download_redirect:
+        url = await file_stream.presigned_url(filename, media_type, settings.s3_presigned_url_ttl_s)
+        if url:
+            # URL wygasa - przekierowania nie wolno trzymać w cache
+            return RedirectResponse(url, status_code=302, headers={"Cache-Control": "no-store"})
+
+    headers = {
+        "Content-Disposition": f"attachment; filename*=utf-8''{quote(filename)}",
+        "Accept-Ranges": "bytes",
+        **validators,
+    }
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if if_range is None or if_range_matches(if_range, etag, last_modified):
+        byte_range = parse_range(request.headers.get("range"), size_bytes)
+
+    path = None
+    if settings.download_sendfile and size_bytes and "http.response.pathsend" in request.scope.get("extensions", {}):
+        path = await file_stream.local_path()
+    if path:
+        # Zakres z żądania Starlette czyta sam; nasze ETag i Last-Modified mają pierwszeństwo przed tymi ze stat
+        return FileResponse(path, headers=headers, media_type=media_type)
+    # Bez pathsend (np. uvicorn) FileResponse czytałby plik po 64 KB w wątku - generator storage czyta po 1 MB
+
+    if byte_range is None:
+        return StreamingResponse(file_stream, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size_bytes}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(file_stream.slice(start, end), status_code=206, media_type=media_type, headers=headers)
@@ -1,9 +1,7 @@
 import mimetypes
 import os
-from fastapi import APIRouter, Depends, Header, Request, File, UploadFile, Form, Query, Cookie, HTTPException
-from urllib.parse import quote
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, Request, File, UploadFile, Form, Query, Cookie, HTTPException
 
-from fastapi.responses import StreamingResponse
 from src.deps import get_uow
 from src.api.schemas.files import  RenameFileRequest, FileResponse, VersionResponse
 from src.infrastructure.uow import SqlAlchemyUoW
@@ -14,10 +12,14 @@ from typing import Annotated, Optional
 from src.rate_limiting import limiter
 import uuid
 from src.api.schemas.users import UserFromToken
-from src.application.errors import BadFileFormatError, FileTooLargeError, FolderNotFoundError, InvalidParentFolder, FileNameExistsError, FileNotFoundError, AccessDeniedError, FolderNameExistsError
-from src.api.schemas.files import DirectoryListingResponse, CreateFolderRequest
+from src.application.errors import RangeNotSatisfiableError, BlobNotFoundError, BadFileFormatError, FileTooLargeError, FolderNotFoundError, InvalidParentFolder, FileNameExistsError, FileNotFoundError, AccessDeniedError, FolderNameExistsError, ZipImportJobNotFoundError, InvalidCursorError, ListingTooLargeError
+from src.api.schemas.files import DirectoryListingResponse, CreateFolderRequest, UploadByHashRequest, ZipImportJobResponse
 from uuid import UUID
 from src.config.app_config import settings
+from src.api.downloads import build_download_response
+from src.common.utils.zip_utils import stream_zip
+from fastapi.responses import StreamingResponse
+from urllib.parse import quote
 
 router = APIRouter(
     prefix="/files",
@@ -29,6 +31,7 @@ RATE_LIMIT = settings.STANDARD_RATE_LIMIT
 #/api/v1/files/?parent_id=uuid-here
 async def upload_file(
     request: Request,
+    background_tasks: BackgroundTasks,
     parent_id: Optional[UUID] = Form(None, description="ID folderu nadrzędnego. Jeśli brak - plik zostanie przesłany do Root."),
 
     file: UploadFile = File(...), 
@@ -40,7 +43,7 @@ async def upload_file(
 
     user_agent = request.headers.get("user-agent", "unknown")
     try:
-        return await filesvc.upload_file(
+        result = await filesvc.upload_file(
         uow=uow,
         user_id = current_user.id,
         file = file,
@@ -52,9 +55,93 @@ async def upload_file(
         raise HTTPException(status_code=e.status_code, detail=str(e))
     except InvalidParentFolder as e:
         raise HTTPException(status_code=e.status_code, detail=str(e))
-    
+    except FileNameExistsError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    # Starsza wersja zamienia się w deltę już po wysłaniu odpowiedzi
+    if settings.version_delta_compaction and result["version"] > 1:
+        background_tasks.add_task(filesvc.compact_in_background, uow, [result["id"]])
+    return result
     
 
+@router.post("/by-hash", status_code=201)
+@limiter.limit(RATE_LIMIT)
+async def upload_file_by_hash(
+    body: UploadByHashRequest,
+    request: Request,
+    current_user: UserFromToken = Depends(current_user),
+    filesvc: FileService = Depends(get_file_service),
+    uow: SqlAlchemyUoW = Depends(get_uow)
+):
+    """
+    Tworzy plik z treści, którą użytkownik już ma (po SHA-256 i rozmiarze), bez wysyłania bajtów.
+    404 oznacza, że trzeba wysłać plik zwykłym uploadem.
+    """
+    try:
+        return await filesvc.upload_by_hash(
+            uow=uow,
+            user_id=current_user.id,
+            file_name=body.file_name,
+            sha256_hash=body.sha256,
+            size_bytes=body.size_bytes,
+            parent_folder_id=body.parent_folder_id,
+            mime_type=body.mime_type,
+            ip=request.client.host if request.client else "unknown",
+            user_agent=request.headers.get("user-agent", "unknown"),
+        )
+    except BlobNotFoundError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except InvalidParentFolder as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except FileNameExistsError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+
+@router.post("/batch", status_code=201)
+@limiter.limit(RATE_LIMIT)
+async def upload_files_batch(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: UserFromToken = Depends(current_user),
+    filesvc: FileService = Depends(get_file_service),
+    uow: SqlAlchemyUoW = Depends(get_uow)
+):
+    """
+    Wiele plików w jednym żądaniu multipart: pola "files" (powtarzane) i opcjonalne "parent_id".
+    Formularz parsujemy ręcznie, bo domyślny limit Starlette to 1000 plików na żądanie.
+    """
+    async with request.form(max_files=settings.max_batch_upload_files) as form:
+        files = [f for f in form.getlist("files") if not isinstance(f, str)]
+        if not files:
+            raise HTTPException(status_code=400, detail="No files provided")
+        parent_id = form.get("parent_id") or None
+        try:
+            parent_id = UUID(parent_id) if parent_id else None
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Invalid parent_id")
+
+        try:
+            result = await filesvc.upload_files_batch(
+                uow=uow,
+                user_id=current_user.id,
+                files=files,
+                parent_folder_id=parent_id,
+                ip=request.client.host if request.client else "unknown",
+                user_agent=request.headers.get("user-agent", "unknown"),
+            )
+        except FileTooLargeError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+        except InvalidParentFolder as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+        except FileNameExistsError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    new_versions = list({f["id"]: None for f in result["files"] if f["version"] > 1})
+    if settings.version_delta_compaction and new_versions:
+        background_tasks.add_task(filesvc.compact_in_background, uow, new_versions)
+    return result
+
+
 @router.get("/", response_model=DirectoryListingResponse)
 @limiter.limit(RATE_LIMIT)
 async def get_user_files(
@@ -63,12 +150,21 @@ async def get_user_files(
         None, 
         description="ID folderu. Jeśli brak - wyświetla Root."
     ),
+    limit: Optional[int] = Query(
+        None, ge=1, le=settings.list_max_page_size,
+        description="Rozmiar strony. Jeśli brak - domyślny z konfiguracji."
+    ),
+    cursor: Optional[str] = Query(None, description="next_cursor z poprzedniej strony."),
+    all_items: bool = Query(
+        False, alias="all",
+        description="Cały folder w jednej odpowiedzi, bez stronicowania - tylko dla małych folderów."
+    ),
     current_user: UserFromToken = Depends(current_user),
     filesvc: FileService = Depends(get_file_service),
     uow: SqlAlchemyUoW = Depends(get_uow)
 ):
     """
-    Pobiera zawartość folderu (pliki i podfoldery).
+    Pobiera zawartość folderu (pliki i podfoldery), stronami: foldery najpierw, potem po nazwie.
     """
     ip = request.client.host if request.client else "unknown"
     user_agent = request.headers.get("user-agent", "unknown")
@@ -80,11 +176,18 @@ async def get_user_files(
             folder_id=folder_id,
             ip=ip,
             user_agent=user_agent,
+            limit=limit,
+            cursor=cursor,
+            all_items=all_items,
         )
 
         return result
     except FolderNotFoundError as e:
         raise HTTPException(status_code=e.status_code, detail=str(e))
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except ListingTooLargeError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     
 
 
@@ -146,20 +249,50 @@ async def download_file(
                  if guessed_ext:
                      final_filename += guessed_ext
 
-        encoded_filename = quote(final_filename)
-        
-        headers = {
-            "Content-Disposition": f"attachment; filename*=utf-8''{encoded_filename}"
-        }
-
         media_type = file_meta.mime_type if file_meta.mime_type else "application/octet-stream"
 
-        return StreamingResponse(file_stream, media_type=media_type, headers=headers)
+        return await build_download_response(request, file_stream, version_meta, final_filename, media_type)
 
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e)) # Zmieniłem na 404
     except AccessDeniedError as e:
         raise HTTPException(status_code=e.status_code, detail=str(e))
+    except RangeNotSatisfiableError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Content-Range": f"bytes */{e.size_bytes}"})
+
+@router.get("/{folder_id}/download-zip", status_code=200)
+@limiter.limit(RATE_LIMIT)
+async def download_folder_zip(
+    folder_id: UUID,
+    request: Request,
+    current_user: UserFromToken = Depends(current_user),
+    filesvc: FileService = Depends(get_file_service),
+    uow: SqlAlchemyUoW = Depends(get_uow)
+):
+    """
+    Pobiera cały folder (z podfolderami) jako archiwum ZIP składane w locie.
+    """
+    try:
+        folder, entries = await filesvc.download_folder_zip(
+            uow=uow,
+            user_id=current_user.id,
+            folder_id=folder_id,
+            ip=request.client.host if request.client else "unknown",
+            user_agent=request.headers.get("user-agent", "unknown")
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except AccessDeniedError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except BadFileFormatError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    headers = {"Content-Disposition": f"attachment; filename*=utf-8''{quote(folder.name + '.zip')}"}
+    return StreamingResponse(
+        stream_zip(entries, max_entropy=settings.blob_compression_max_entropy),
+        media_type="application/zip",
+        headers=headers,
+    )
 
 @router.delete("/{file_id}", status_code=204)
 @limiter.limit(RATE_LIMIT)
@@ -271,26 +404,25 @@ async def download_file_version(
                  if guessed: ext = guessed
 
         final_filename = f"{name_root}_v{version_meta.version_no}{ext}"
-        encoded_filename = quote(final_filename)
-
-        headers = {
-            "Content-Disposition": f"attachment; filename*=utf-8''{encoded_filename}"
-        }
         
         media_type = file_meta.mime_type if file_meta.mime_type else "application/octet-stream"
 
-        return StreamingResponse(file_stream, media_type=media_type, headers=headers)
+        # Wersja o danym id ma zawsze tę samą treść
+        return await build_download_response(request, file_stream, version_meta, final_filename, media_type, immutable=True)
 
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except AccessDeniedError as e:
         raise HTTPException(status_code=403, detail=str(e))
+    except RangeNotSatisfiableError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Content-Range": f"bytes */{e.size_bytes}"})
     
 
-@router.post("/zip", status_code=200)
+@router.post("/zip", status_code=202)
 @limiter.limit(RATE_LIMIT)
 async def upload_zip_file(
     request: Request,
+    background_tasks: BackgroundTasks,
     parent_id: Optional[UUID] = Form(None, description="ID folderu nadrzędnego. Jeśli brak - plik zostanie przesłany do Root."),
     file: UploadFile = File(...),
     current_user: UserFromToken = Depends(current_user),
@@ -302,7 +434,7 @@ async def upload_zip_file(
     if file.content_type not in ["application/zip", "application/x-zip-compressed", "application/octet-stream"]:
         pass
     try:
-        return await filesvc.upload_zip_folder(
+        result = await filesvc.create_zip_import_job(
         uow=uow,
         user_id = current_user.id,
         file = file,
@@ -310,18 +442,32 @@ async def upload_zip_file(
         ip = ip,
         user_agent = user_agent,
         )
-    
-    #TODO Obslużyć wyjątki
     except FileTooLargeError as e:
         raise HTTPException(status_code=e.status_code, detail=str(e))
     except InvalidParentFolder as e:
         raise HTTPException(status_code=e.status_code, detail=str(e))
     except FolderNotFoundError as e:
         raise HTTPException(status_code=e.status_code, detail=str(e))
-    except FileNameExistsError as e:
-        raise HTTPException(status_code=e.status_code, detail=str(e))
     except BadFileFormatError as e:
         raise HTTPException(status_code=e.status_code, detail=str(e))
     except AccessDeniedError as e:
         raise HTTPException(status_code=e.status_code, detail=str(e))
 
+    # Import rusza po wysłaniu odpowiedzi; postęp pod GET /files/zip/jobs/{job_id}
+    background_tasks.add_task(filesvc.run_zip_import_job, uow, result["job_id"])
+    return result
+
+
+@router.get("/zip/jobs/{job_id}", response_model=ZipImportJobResponse)
+@limiter.limit(RATE_LIMIT)
+async def get_zip_import_job(
+    request: Request,
+    job_id: UUID,
+    current_user: UserFromToken = Depends(current_user),
+    filesvc: FileService = Depends(get_file_service),
+    uow: SqlAlchemyUoW = Depends(get_uow)
+):
+    try:
+        return await filesvc.get_zip_import_job(uow, current_user.id, job_id)
+    except ZipImportJobNotFoundError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends
+from src.api.auto_auth import current_user
+from src.api.upload_admission import upload_admission
+from src.deps import get_blob_cache
+from src.infrastructure.storage.CachedBlobStorage import BlobCache
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+)
+
+
+@router.get("/uploads", dependencies=[Depends(current_user)])
+async def get_upload_metrics():
+    """
+    Bieżący stan admission control uploadów (bajty w locie, kolejka, odmowy).
+    Tylko liczby zagregowane - bez identyfikatorów użytkowników, ale tylko dla zalogowanych.
+    """
+    return upload_admission.snapshot()
+
+
+@router.get("/blob-cache", dependencies=[Depends(current_user)])
+async def get_blob_cache_metrics(blob_cache: BlobCache = Depends(get_blob_cache)):
+    """
+    Stan cache blobów w pamięci tego procesu: zajętość, trafienia, chybienia, wyparcia. Tylko dla zalogowanych.
+    """
+    return blob_cache.snapshot()
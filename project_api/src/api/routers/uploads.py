@@ -0,0 +1,150 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, HTTPException, Path
+from src.deps import get_uow
+from src.deps import get_filesvc as get_file_service
+from src.api.auto_auth import current_user
+from src.api.schemas.users import UserFromToken
+from src.api.schemas.uploads import CreateUploadSessionRequest, UploadSessionResponse, UploadChunkResponse
+from src.application.file_service import FileService, AsyncIteratorReader
+from src.application.errors import (FileTooLargeError, InvalidParentFolder, InvalidChunkError,
+    UploadIncompleteError, UploadSessionNotFoundError, FileNameExistsError)
+from src.infrastructure.uow import SqlAlchemyUoW
+from src.rate_limiting import limiter
+from src.config.app_config import settings
+from uuid import UUID
+
+router = APIRouter(
+    prefix="/files/uploads",
+    tags=["uploads"],
+)
+RATE_LIMIT = settings.STANDARD_RATE_LIMIT
+
+
+@router.post("/", status_code=201, response_model=UploadSessionResponse)
+@limiter.limit(RATE_LIMIT)
+async def create_upload_session(
+    body: CreateUploadSessionRequest,
+    request: Request,
+    current_user: UserFromToken = Depends(current_user),
+    filesvc: FileService = Depends(get_file_service),
+    uow: SqlAlchemyUoW = Depends(get_uow)
+):
+    """
+    Otwiera wznawialny upload. Klient wysyła potem kawałki (PUT) w dowolnej kolejności i robi commit.
+    """
+    try:
+        upload_session = await filesvc.create_upload_session(
+            uow=uow,
+            user_id=current_user.id,
+            file_name=body.file_name,
+            size_bytes=body.size_bytes,
+            parent_folder_id=body.parent_folder_id,
+            mime_type=body.mime_type,
+            chunk_size=body.chunk_size,
+            ip=request.client.host if request.client else "unknown",
+            user_agent=request.headers.get("user-agent", "unknown"),
+        )
+        return UploadSessionResponse(
+            upload_id=upload_session.id,
+            file_name=upload_session.file_name,
+            size_bytes=upload_session.size_bytes,
+            chunk_size=upload_session.chunk_size,
+            chunk_count=upload_session.chunk_count,
+        )
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except InvalidChunkError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except InvalidParentFolder as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+
+@router.put("/{upload_id}/chunks/{chunk_no}", response_model=UploadChunkResponse)
+@limiter.limit(RATE_LIMIT)
+async def upload_chunk(
+    upload_id: UUID,
+    request: Request,
+    chunk_no: int = Path(..., ge=0),
+    current_user: UserFromToken = Depends(current_user),
+    filesvc: FileService = Depends(get_file_service),
+    uow: SqlAlchemyUoW = Depends(get_uow)
+):
+    """
+    Zapisuje kawałek (surowe body żądania). Ponowne wysłanie tego samego numeru nadpisuje kawałek.
+    """
+    try:
+        return await filesvc.upload_chunk(
+            uow=uow,
+            user_id=current_user.id,
+            upload_id=upload_id,
+            chunk_no=chunk_no,
+            stream=AsyncIteratorReader(request.stream()),
+        )
+    except UploadSessionNotFoundError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except InvalidChunkError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+
+@router.get("/{upload_id}", response_model=UploadSessionResponse)
+@limiter.limit(RATE_LIMIT)
+async def get_upload_session(
+    upload_id: UUID,
+    request: Request,
+    current_user: UserFromToken = Depends(current_user),
+    filesvc: FileService = Depends(get_file_service),
+    uow: SqlAlchemyUoW = Depends(get_uow)
+):
+    """
+    Zwraca odebrane kawałki (numer, offset, rozmiar), żeby klient wiedział, co wysłać ponownie.
+    """
+    try:
+        return await filesvc.get_upload_session(uow=uow, user_id=current_user.id, upload_id=upload_id)
+    except UploadSessionNotFoundError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+
+@router.post("/{upload_id}/commit", status_code=201)
+@limiter.limit(RATE_LIMIT)
+async def commit_upload_session(
+    upload_id: UUID,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: UserFromToken = Depends(current_user),
+    filesvc: FileService = Depends(get_file_service),
+    uow: SqlAlchemyUoW = Depends(get_uow)
+):
+    try:
+        result = await filesvc.commit_upload_session(
+            uow=uow,
+            user_id=current_user.id,
+            upload_id=upload_id,
+            ip=request.client.host if request.client else "unknown",
+            user_agent=request.headers.get("user-agent", "unknown"),
+        )
+    except UploadSessionNotFoundError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except UploadIncompleteError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except InvalidParentFolder as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except FileNameExistsError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    if settings.version_delta_compaction and result["version"] > 1:
+        background_tasks.add_task(filesvc.compact_in_background, uow, [result["id"]])
+    return result
+
+
+@router.delete("/{upload_id}", status_code=204)
+@limiter.limit(RATE_LIMIT)
+async def abort_upload_session(
+    upload_id: UUID,
+    request: Request,
+    current_user: UserFromToken = Depends(current_user),
+    filesvc: FileService = Depends(get_file_service),
+    uow: SqlAlchemyUoW = Depends(get_uow)
+):
+    try:
+        await filesvc.abort_upload_session(uow=uow, user_id=current_user.id, upload_id=upload_id)
+    except UploadSessionNotFoundError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
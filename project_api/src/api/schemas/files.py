@@ -27,6 +27,7 @@ class DirectoryListingResponse(BaseModel):
     current_folder_id: Optional[UUID]
     items: List[FileResponse]
     breadcrumbs: List[dict] # np. [{"i
+    next_cursor: Optional[str] = Field(None, description="Kursor następnej strony (parametr cursor). Brak - to ostatnia strona.")
 
 class VersionResponse(BaseModel):
     id: UUID
@@ -42,4 +43,35 @@ class RenameFileRequest(BaseModel):
 
 class CreateFolderRequest(BaseModel):
     folder_name: str = Field(..., min_length=1, max_length=255, description="Nazwa folderu")
-    parent_folder_id: Optional[UUID] = Field(None, description="ID nowego folderu nadrzędnego. Jeśli brak - przenosi do Root.")
\ No newline at end of file
+    parent_folder_id: Optional[UUID] = Field(None, description="ID nowego folderu nadrzędnego. Jeśli brak - przenosi do Root.")
+
+class UploadByHashRequest(BaseModel):
+    file_name: str = Field(..., min_length=1, max_length=255, description="Nazwa pliku (z rozszerzeniem!)")
+    sha256: str = Field(..., pattern=r"^[0-9a-fA-F]{64}$", description="SHA-256 treści pliku (hex)")
+    size_bytes: int = Field(..., ge=0, description="Rozmiar pliku w bajtach")
+    parent_folder_id: Optional[UUID] = Field(None, description="ID folderu nadrzędnego. Jeśli brak - plik trafi do Root.")
+    mime_type: Optional[str] = Field(None, max_length=255)
+
+class ZipImportError(BaseModel):
+    path: str
+    detail: str
+
+class ZipImportJobResponse(BaseModel):
+    """Stan importu ZIP w tle - postęp liczony po zatwierdzonych paczkach."""
+    job_id: UUID = Field(validation_alias="id")
+    status: str
+    archive_name: str
+    parent_folder_id: Optional[UUID] = None
+    root_folder_id: Optional[UUID] = None
+    entries_total: int
+    entries_processed: int
+    bytes_written: int
+    dedup_hits: int
+    error_count: int
+    errors: List[ZipImportError] = []
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
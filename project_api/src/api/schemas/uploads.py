@@ -0,0 +1,34 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
+from uuid import UUID
+
+
+class CreateUploadSessionRequest(BaseModel):
+    file_name: str = Field(..., min_length=1, max_length=255, description="Nazwa pliku (z rozszerzeniem!)")
+    size_bytes: int = Field(..., ge=0, description="Całkowity rozmiar pliku w bajtach")
+    parent_folder_id: Optional[UUID] = Field(None, description="ID folderu nadrzędnego. Jeśli brak - plik trafi do Root.")
+    mime_type: Optional[str] = Field(None, max_length=255)
+    chunk_size: Optional[int] = Field(None, gt=0, description="Rozmiar kawałka w bajtach (co najmniej MIN_UPLOAD_CHUNK_SIZE_MB, chyba że plik jest mniejszy). Jeśli brak - domyślny z konfiguracji.")
+
+
+class ReceivedChunk(BaseModel):
+    chunk_no: int
+    offset: int
+    size_bytes: int
+
+
+class UploadSessionResponse(BaseModel):
+    upload_id: UUID
+    file_name: str
+    size_bytes: int
+    chunk_size: int
+    chunk_count: int
+    received_chunks: List[ReceivedChunk] = []
+    received_bytes: int = 0
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class UploadChunkResponse(BaseModel):
+    chunk_no: int
+    size_bytes: int
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import re
+from collections import defaultdict
+from typing import Optional
+from src.api.auto_auth import get_bearer_token
+from src.application.errors import InvalidTokenError, TokenExpiredError
+from src.config.app_config import settings
+from src.infrastructure.security.access_token import decode_access_token
+from starlette.requests import Request
+
+
+class UploadAdmissionController:
+    """
+    Limit bajtów uploadów w locie - na cały proces i na użytkownika.
+    Żądanie, które się nie mieści, czeka w kolejce do queue_timeout sekund, potem dostaje odmowę.
+    Limit 0 wyłącza dane ograniczenie.
+    """
+
+    def __init__(self, max_bytes: int, max_user_bytes: int, queue_timeout: float):
+        self.max_bytes = max_bytes
+        self.max_user_bytes = max_user_bytes
+        self.queue_timeout = queue_timeout
+        self.bytes_in_flight = 0
+        self.peak_bytes_in_flight = 0
+        self.queued = 0
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self._per_user: dict[str, int] = defaultdict(int)
+        self._cond = asyncio.Condition()
+
+    def cost(self, size_bytes: int) -> int:
+        # Upload większy niż limit przechodzi sam, zajmując cały budżet - inaczej czekałby w nieskończoność
+        limits = [limit for limit in (self.max_bytes, self.max_user_bytes) if limit > 0]
+        return min([size_bytes, *limits])
+
+    def _fits(self, key: str, cost: int) -> bool:
+        if self.max_bytes > 0 and self.bytes_in_flight + cost > self.max_bytes:
+            return False
+        if self.max_user_bytes > 0 and self._per_user[key] + cost > self.max_user_bytes:
+            return False
+        return True
+
+    async def acquire(self, key: str, cost: int) -> bool:
+        """Rezerwuje cost bajtów dla klucza; False, gdy nie zwolniło się miejsce w czasie queue_timeout."""
+        async with self._cond:
+            if not self._fits(key, cost):
+                self.queued += 1
+                try:
+                    await asyncio.wait_for(self._cond.wait_for(lambda: self._fits(key, cost)), self.queue_timeout)
+                except asyncio.TimeoutError:
+                    self.rejected_total += 1
+                    return False
+                finally:
+                    self.queued -= 1
+            self.bytes_in_flight += cost
+            self._per_user[key] += cost
+            self.peak_bytes_in_flight = max(self.peak_bytes_in_flight, self.bytes_in_flight)
+            self.admitted_total += 1
+            return True
+
+    async def release(self, key: str, cost: int) -> None:
+        async with self._cond:
+            self.bytes_in_flight -= cost
+            self._per_user[key] -= cost
+            if self._per_user[key] <= 0:
+                del self._per_user[key]
+            self._cond.notify_all()
+
+    def snapshot(self) -> dict:
+        return {
+            "bytes_in_flight": self.bytes_in_flight,
+            "peak_bytes_in_flight": self.peak_bytes_in_flight,
+            "max_bytes": self.max_bytes,
+            "max_user_bytes": self.max_user_bytes,
+            "active_users": len(self._per_user),
+            "queued": self.queued,
+            "admitted_total": self.admitted_total,
+            "rejected_total": self.rejected_total,
+        }
+
+
+upload_admission = UploadAdmissionController(
+    max_bytes=settings.upload_admission_max_mb * 1024 * 1024,
+    max_user_bytes=settings.upload_admission_max_user_mb * 1024 * 1024,
+    queue_timeout=settings.upload_admission_queue_timeout_s,
+)
+
+
+class UploadAdmissionMiddleware:
+    """
+    Czysty middleware ASGI - musi działać przed FastAPI, bo ten parsuje (i spooluje na dysk)
+    multipart jeszcze przed wywołaniem zależności i endpointu.
+    """
+    # Trasy uploadu względem prefiksu API
+    UPLOAD_ROUTES = [
+        ("POST", re.compile(r"^/files/?$")),
+        ("POST", re.compile(r"^/files/zip/?$")),
+        ("POST", re.compile(r"^/files/batch/?$")),
+        ("PUT", re.compile(r"^/files/uploads/[^/]+/chunks/\d+/?$")),
+    ]
+
+    def __init__(self, app, controller: UploadAdmissionController, prefix: str = ""):
+        self.app = app
+        self.controller = controller
+        self.prefix = prefix
+
+    def _is_upload(self, scope) -> bool:
+        path = scope["path"]
+        if scope["type"] != "http" or not path.startswith(self.prefix):
+            return False
+        path = path[len(self.prefix):]
+        return any(scope["method"] == method and pattern.match(path) for method, pattern in self.UPLOAD_ROUTES)
+
+    @staticmethod
+    def _client_key(request: Request) -> str:
+        # Zweryfikowany token, a nie samo "sub" - inaczej dałoby się zająć cudzy budżet
+        token = get_bearer_token(request)
+        if token:
+            try:
+                return f"user:{decode_access_token(token)['sub']}"
+            except (InvalidTokenError, TokenExpiredError, KeyError):
+                pass
+        return f"ip:{request.client.host if request.client else 'unknown'}"
+
+    @staticmethod
+    def _declared_size(request: Request) -> Optional[int]:
+        try:
+            return int(request.headers["content-length"])
+        except (KeyError, ValueError):
+            return None
+
+    async def __call__(self, scope, receive, send):
+        if not self._is_upload(scope):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        key = self._client_key(request)
+        # Bez Content-Length (chunked) zakładamy najgorszy przypadek - maksymalny dozwolony upload
+        size_bytes = self._declared_size(request)
+        if size_bytes is None:
+            size_bytes = settings.max_file_upload_size_mb * 1024 * 1024
+        cost = self.controller.cost(size_bytes)
+
+        if not await self.controller.acquire(key, cost):
+            body = json.dumps({"detail": "Too many uploads in progress, retry later"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(settings.upload_admission_retry_after_s).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        released = False
+
+        async def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                await self.controller.release(key, cost)
+
+        async def send_and_release(message) -> None:
+            await send(message)
+            # Ostatni fragment odpowiedzi wysłany - BackgroundTasks (np. kompaktacja) nie trzymają już budżetu
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                await release()
+
+        try:
+            await self.app(scope, receive, send_and_release)
+        finally:
+            await release()
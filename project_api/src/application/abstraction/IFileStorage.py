@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import BinaryIO, AsyncGenerator
+from typing import BinaryIO, AsyncGenerator, Optional
 
 class IBlobStorage(ABC):
     """
@@ -16,12 +16,156 @@ class IBlobStorage(ABC):
         pass
 
     @abstractmethod
-    async def get(self, file_hash: str) -> AsyncGenerator[bytes, None]:
+    async def stage(self, file_stream: BinaryIO) -> str:
         """
-        Pobiera plik jako strumień bajtów.
+        Zapisuje strumień w obszarze tymczasowym (staging), zanim znany jest hash.
+        Zwraca identyfikator kopii tymczasowej.
         """
         pass
 
+    async def stored_bytes(self, staging_id: str) -> Optional[int]:
+        """
+        Ile bajtów kopia tymczasowa faktycznie dopisze do storage po promote
+        (mniej niż rozmiar pliku, gdy storage deduplikuje kawałki). None - cały plik.
+        """
+        return None
+
+    async def staged_codec(self, staging_id: str) -> Optional[str]:
+        """
+        Kodek, którym storage zakodował kopię tymczasową (np. "zlib"). None - surowe bajty.
+        Trafia do Blob.codec i wraca do storage przy każdym odczycie.
+        """
+        return None
+
+    def codec_for(self, head: bytes) -> Optional[str]:
+        """
+        Kodek, którym storage zakoduje treść zaczynającą się od head - bez zapisywania czegokolwiek.
+        """
+        return None
+
+    @abstractmethod
+    async def promote(self, staging_id: str, file_hash: str) -> str:
+        """
+        Atomowo przenosi kopię tymczasową pod adres wynikający z hasha.
+        Zwraca ścieżkę (lub klucz), pod którym plik został zapisany.
+        """
+        pass
+
+    @abstractmethod
+    async def discard(self, staging_id: str) -> None:
+        """
+        Usuwa kopię tymczasową (np. gdy blob okazał się duplikatem).
+        """
+        pass
+
+    @abstractmethod
+    async def write_chunk(self, upload_id: str, chunk_no: int, file_stream: BinaryIO) -> int:
+        """
+        Zapisuje (lub nadpisuje) kawałek wznawialnego uploadu.
+        Zwraca liczbę zapisanych bajtów.
+        """
+        pass
+
+    @abstractmethod
+    async def list_chunks(self, upload_id: str) -> dict[int, int]:
+        """
+        Zwraca odebrane kawałki uploadu jako {numer_kawałka: rozmiar_w_bajtach}.
+        """
+        pass
+
+    @abstractmethod
+    async def read_chunks(self, upload_id: str, chunk_count: int) -> AsyncGenerator[bytes, None]:
+        """
+        Odczytuje kawałki 0..chunk_count-1 po kolei jako jeden strumień bajtów.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_chunks(self, upload_id: str) -> None:
+        """
+        Usuwa wszystkie kawałki uploadu.
+        """
+        pass
+
+    @abstractmethod
+    async def save_import_archive(self, job_id: str, file_stream: BinaryIO) -> int:
+        """
+        Zapisuje archiwum zadania importu (osobno od kawałków uploadów), żeby przeżyło restart procesu.
+        Zwraca liczbę zapisanych bajtów.
+        """
+        pass
+
+    @abstractmethod
+    async def read_import_archive(self, job_id: str) -> AsyncGenerator[bytes, None]:
+        """
+        Odczytuje archiwum zadania importu jako strumień bajtów.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_import_archive(self, job_id: str) -> None:
+        """
+        Usuwa archiwum zadania importu (zadanie zakończone albo nieprzyjęte).
+        """
+        pass
+
+    @abstractmethod
+    async def get(self, file_hash: str, codec: Optional[str] = None) -> AsyncGenerator[bytes, None]:
+        """
+        Pobiera plik jako strumień bajtów. codec - kodek zapisany przy blobie (Blob.codec).
+        """
+        pass
+
+    @abstractmethod
+    async def get_range(self, file_hash: str, start: int, end: int, codec: Optional[str] = None) -> AsyncGenerator[bytes, None]:
+        """
+        Pobiera bajty start..end (włącznie, jak w nagłówku Range) jako strumień.
+        """
+        pass
+
+    async def local_path(self, file_hash: str, codec: Optional[str] = None) -> Optional[str]:
+        """
+        Ścieżka do surowych bajtów blobu na lokalnym dysku - serwer może je wysłać sam (sendfile).
+        None - blob trzeba czytać przez get (inny backend, kompresja, manifest kawałków).
+        """
+        return None
+
+    async def presigned_url(
+        self, file_hash: str, filename: str, media_type: str, expires_in: int, codec: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Krótkotrwały URL, pod którym klient pobierze surowe bajty blobu bezpośrednio z backendu,
+        z podanymi Content-Disposition i Content-Type. None - backend tego nie umie albo blob nie jest surowy.
+        """
+        return None
+
+    async def list_blobs(self) -> AsyncGenerator[tuple[str, Optional[str], float], None]:
+        """
+        Wszystkie bloby jako (hash, kodek, czas modyfikacji - epoch), bez stagingu i kawałków uploadów.
+        Backend bez listowania nic nie zwraca - GC niczego w nim nie usunie.
+        """
+        return
+        yield
+
+    async def modified_at(self, file_hash: str, codec: Optional[str] = None) -> Optional[float]:
+        """
+        Czas ostatniej modyfikacji blobu (epoch). None - blobu nie ma albo backend tego nie wie.
+        """
+        return None
+
+    async def touch(self, file_hash: str, codec: Optional[str] = None) -> None:
+        """
+        Odświeża czas modyfikacji - GC nie usunie blobu, do którego właśnie dopisano nowe odwołanie.
+        """
+        return None
+
+    async def collect_garbage(self, live: set[str], min_age_s: float) -> int:
+        """
+        Usuwa obiekty, do których nie prowadzi żaden klucz z live (np. kawałki usuniętych blobów),
+        jeśli są starsze niż min_age_s. Zwraca liczbę usuniętych obiektów; 0 - storage nie ma czego sprzątać.
+        """
+        return 0
+
     @abstractmethod
     async def delete(self, file_hash: str) -> None:
         """
@@ -30,8 +174,8 @@ class IBlobStorage(ABC):
         pass
     
     @abstractmethod
-    async def exists(self, file_hash: str) -> bool:
+    async def exists(self, file_hash: str, codec: Optional[str] = None) -> bool:
         """
-        Sprawdza czy taki blob już fizycznie istnieje.
+        Sprawdza czy taki blob (zakodowany podanym kodekiem) już fizycznie istnieje.
         """
         pass
\ No newline at end of file
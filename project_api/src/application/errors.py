@@ -101,4 +101,53 @@ class BadFileFormatError(Exception):
         self.status_code = 400
         self.detail = detail
     def __str__(self):
-        return self.detail
\ No newline at end of file
+        return self.detail
+class UploadSessionNotFoundError(Exception):
+    def __init__(self, detail: str = "Upload session not found"):
+        self.status_code = 404
+        self.detail = detail
+    def __str__(self):
+        return self.detail
+class InvalidCursorError(Exception):
+    def __init__(self, detail: str = "Invalid pagination cursor"):
+        self.status_code = 400
+        self.detail = detail
+    def __str__(self):
+        return self.detail
+class ListingTooLargeError(Exception):
+    def __init__(self, detail: str = "Folder is too large to list in one response, use cursor pagination"):
+        self.status_code = 400
+        self.detail = detail
+    def __str__(self):
+        return self.detail
+class ZipImportJobNotFoundError(Exception):
+    def __init__(self, detail: str = "Import job not found"):
+        self.status_code = 404
+        self.detail = detail
+    def __str__(self):
+        return self.detail
+class InvalidChunkError(Exception):
+    def __init__(self, detail: str = "Invalid chunk"):
+        self.status_code = 400
+        self.detail = detail
+    def __str__(self):
+        return self.detail
+class UploadIncompleteError(Exception):
+    def __init__(self, detail: str = "Upload is not complete"):
+        self.status_code = 409
+        self.detail = detail
+    def __str__(self):
+        return self.detail
+class BlobNotFoundError(Exception):
+    def __init__(self, detail: str = "Content not found, upload the file bytes"):
+        self.status_code = 404
+        self.detail = detail
+    def __str__(self):
+        return self.detail
+class RangeNotSatisfiableError(Exception):
+    def __init__(self, size_bytes: int, detail: str = "Requested range not satisfiable"):
+        self.status_code = 416
+        self.size_bytes = size_bytes
+        self.detail = detail
+    def __str__(self):
+        return self.detail
@@ -1,33 +1,161 @@
+import asyncio
 import os
+from datetime import timedelta
+import tempfile
 from src.application.abstraction.IFileStorage import IBlobStorage
 from src.infrastructure.uow import SqlAlchemyUoW
 from src.application.logbook_service import LogbookService
 from src.domain.entities.blob import Blob
 import hashlib
 from fastapi import UploadFile
+from sqlalchemy.exc import IntegrityError
 from src.application.errors import BadFileFormatError, FileTooLargeError, FolderNameExistsError, FolderNotFoundError, InvalidParentFolder, FileNotFoundError, AccessDeniedError
 from src.domain.enums.op_type import OpType
 from src.domain.entities.file import File
 from src.domain.entities.file_version import FileVersion
+from src.domain.entities.upload_session import UploadSession
+from src.domain.entities.zip_import_job import ZipImportJob
 from uuid import UUID, uuid4
 from src.api.schemas.files import VersionResponse
 import zipfile
+import zlib
 import mimetypes
 from pathlib import Path
-from typing import Optional
+from typing import NamedTuple, Optional
 from src.api.schemas.files import FileResponse
 from src.config.app_config import settings
+from src.common.utils.hash_utils import INLINE_HASH_THRESHOLD, hash_update, offload
+from src.common.utils.delta_utils import DeltaTooLargeError, apply_delta, encode_delta
+from src.common.utils.stream_utils import slice_stream
+from src.common.utils.time_utils import utcnow
+from src.common.utils.cursor_utils import decode_cursor, encode_cursor
+from src.common.utils.zip_utils import ZipEntry, plan_zip_import, with_parent_folders
+from posixpath import dirname
 import logging
-import io
-from src.application.errors import FileNameExistsError
+from src.application.errors import FileNameExistsError, BlobNotFoundError, InvalidChunkError, UploadIncompleteError, UploadSessionNotFoundError, ZipImportJobNotFoundError, InvalidCursorError, ListingTooLargeError
 
-class AsyncBytesIO(io.BytesIO):
+# Odtwarzane wersje i budowane delty trzymamy w pamięci do tego rozmiaru, większe idą na dysk
+DELTA_SPOOL_SIZE = 16 * 1024 * 1024
+# Zadanie importu ZIP pamięta tyle pierwszych błędów członków; dalsze tylko liczy (error_count)
+ZIP_IMPORT_MAX_ERRORS = 100
+# Paczka importu, którą wycofał konflikt nazw z równoległym zapisem, jest powtarzana tyle razy
+ZIP_IMPORT_BATCH_ATTEMPTS = 2
+
+
+class _ZipImportJobLost(Exception):
+    """Zadanie importu przejął inny pracownik - bieżąca paczka się wycofuje, a ten pracownik kończy."""
+
+
+class _NewFolder(NamedTuple):
+    """Folder założony w bieżącej paczce importu - udaje wiersz z FileRepo.get_children."""
+    id: UUID
+    is_folder: bool = True
+    version_no: Optional[int] = None
+
+
+def _use_stored_blob_ids(version_rows: list[dict], blob_rows: list[dict], stored: dict[str, UUID]) -> None:
+    """Wersje wskazujące na blob, którego hash zdążył zapisać ktoś inny, przepinamy na jego wiersz."""
+    replaced = {row["id"]: stored[row["sha256"]] for row in blob_rows if stored[row["sha256"]] != row["id"]}
+    for row in version_rows:
+        row["blob_id"] = replaced.get(row["blob_id"], row["blob_id"])
+
+
+async def _iter_file(f, chunk_size: int = 1024 * 1024):
+    while chunk := await asyncio.to_thread(f.read, chunk_size):
+        yield chunk
+
+
+class BlobReader:
+    """
+    Leniwy odczyt treści wersji: iteracja daje cały plik, slice(start, end) - zakres bajtów.
+    Nic nie jest czytane ze storage, dopóki odpowiedź nie zacznie strumieniować.
+    """
+    def __init__(self, service: "FileService", chain: list[tuple[str, Optional[str]]]):
+        self._service = service
+        self._chain = chain
+
+    def __aiter__(self):
+        return self._service._read_blob(self._chain).__aiter__()
+
+    def slice(self, start: int, end: int):
+        """Bajty start..end (włącznie)."""
+        return self._service._read_blob_range(self._chain, start, end)
+
+    async def local_path(self) -> Optional[str]:
+        """Ścieżka do pliku z surową treścią na lokalnym dysku albo None (delta, kompresja, S3)."""
+        if len(self._chain) != 1:
+            return None
+        return await self._service.storage.local_path(*self._chain[0])
+
+    async def presigned_url(self, filename: str, media_type: str, expires_in: int) -> Optional[str]:
+        """Bezpośredni, krótkotrwały URL do surowej treści w backendzie (S3) albo None."""
+        if len(self._chain) != 1:
+            return None
+        sha256_hash, codec = self._chain[0]
+        return await self._service.storage.presigned_url(sha256_hash, filename, media_type, expires_in, codec)
+
+
+class AsyncIteratorReader:
+    """
+    Adapter: asynchroniczny iterator bajtów (np. request.stream() albo storage.read_chunks)
+    wystawiony jako obiekt z async read(size), którego oczekuje IBlobStorage.
+    """
+    def __init__(self, iterator):
+        self._iterator = iterator.__aiter__()
+        self._buffer = b""
+        self._exhausted = False
+
+    async def read(self, size=-1):
+        while not self._exhausted and (size < 0 or len(self._buffer) < size):
+            try:
+                self._buffer += await self._iterator.__anext__()
+            except StopAsyncIteration:
+                self._exhausted = True
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+class SyncStreamReader:
     """
-    Adapter, który sprawia, że zwykłe BytesIO ma asynchroniczną metodę read.
-    Dzięki temu LocalBlobStorage (który oczekuje await) nie zgłupieje.
+    Adapter: synchroniczny strumień (np. zip_ref.open(member)) wystawiony z async read(size),
+    którego oczekuje IBlobStorage. Czyta tylko tyle, o ile poprosi storage.
+    threaded=True przenosi read do wątku - rozpakowanie deflate zwalnia GIL, więc kilka
+    członków archiwum rozpakowuje się równolegle, a pętla zdarzeń nie stoi.
     """
+    def __init__(self, stream, threaded: bool = False):
+        self._stream = stream
+        self._threaded = threaded
+
+    async def read(self, size=-1):
+        if self._threaded:
+            return await asyncio.to_thread(self._stream.read, size)
+        return self._stream.read(size)
+
+
+class HashingReader:
+    """
+    Opakowuje strumień z asynchronicznym read i liczy SHA-256 oraz rozmiar w trakcie czytania.
+    Dzięki temu storage zapisuje bajty, a my hashujemy je w tym samym przebiegu.
+    """
+    def __init__(self, stream, max_size_bytes: int):
+        self._stream = stream
+        self._sha256 = hashlib.sha256()
+        self._max_size_bytes = max_size_bytes
+        self.size_bytes = 0
+
     async def read(self, size=-1):
-        return super().read(size)
+        chunk = await self._stream.read(size)
+        if chunk:
+            self.size_bytes += len(chunk)
+            if self.size_bytes > self._max_size_bytes:
+                raise FileTooLargeError()
+            await hash_update(self._sha256, chunk)
+        return chunk
+
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
     
 
 
@@ -47,24 +175,53 @@ class FileService:
         session_id: Optional[UUID] = None
     ):
         
-        sha256 = hashlib.sha256()
-        size_bytes = 0
         max_size_bytes = settings.max_file_upload_size_mb * 1024 * 1024
-        
-        # Czytamy plik w kawałkach po 1MB
-        while chunk := await file.read(1024 * 1024):
-            sha256.update(chunk)
-            size_bytes += len(chunk)
-            if size_bytes > max_size_bytes:
-                raise FileTooLargeError()
+        # Starlette zna rozmiar po sparsowaniu multipartu - nie ma sensu stage'ować 500 MB, żeby je odrzucić
+        if file.size is not None and file.size > max_size_bytes:
+            raise FileTooLargeError()
 
-        sha256_hash = sha256.hexdigest()
-        await file.seek(0)
-        mime_type = file.content_type
-        _, extension = os.path.splitext(file.filename)
-        extension = extension.lower() if extension else ''
+        # Jeden przebieg: bajty lecą do stagingu w storage i są hashowane po drodze
+        reader = HashingReader(file, max_size_bytes)
+        staging_id = await self.storage.stage(reader)
+        try:
+            return await self._register_staged_upload(
+                uow=uow,
+                user_id=user_id,
+                file_name=file.filename,
+                mime_type=file.content_type,
+                staging_id=staging_id,
+                sha256_hash=reader.hexdigest(),
+                size_bytes=reader.size_bytes,
+                parent_folder_id=parent_folder_id,
+                ip=ip,
+                user_agent=user_agent,
+                session_id=session_id,
+            )
+        except BaseException:
+            await self.storage.discard(staging_id)
+            raise
 
+    async def _register_staged_upload(
+        self,
+        uow: SqlAlchemyUoW,
+        user_id: UUID,
+        file_name: str,
+        mime_type: Optional[str],
+        staging_id: str,
+        sha256_hash: str,
+        size_bytes: int,
+        parent_folder_id: Optional[UUID],
+        ip: str,
+        user_agent: str,
+        session_id: Optional[UUID] = None,
+        upload_id: Optional[UUID] = None
+    ):
         async with uow:
+            # Sesja uploadu znika w tej samej transakcji co powstaje wersja. DELETE blokuje wiersz,
+            # więc równoległy commit tej samej sesji czeka, a potem nie usuwa nic i nie zdubluje pliku
+            if upload_id and not await uow.upload_sessions.delete_by_id(upload_id):
+                raise UploadSessionNotFoundError(detail=f"Upload session {upload_id} not found.")
+
             await self.logbook.register_log(
                 uow=uow,
                 op_type=OpType.FILE_UPLOAD_ATTEMPT,
@@ -72,7 +229,7 @@ class FileService:
                 remote_addr=ip,
                 user_agent=user_agent,
                 details={
-                    "filename": file.filename,
+                    "filename": file_name,
                     "size": size_bytes,
                     "sha256": sha256_hash
                 }
@@ -80,97 +237,567 @@ class FileService:
 
             blob = await uow.blobs.get_by_hash(sha256_hash)
             is_new_blob = False
+            stored_bytes = 0
 
             if not blob:
                 is_new_blob = True
-                storage_path = await self.storage.save(file, sha256_hash)
+                stored_bytes = await self.storage.stored_bytes(staging_id)
+                codec = await self.storage.staged_codec(staging_id)
+                storage_path = await self.storage.promote(staging_id, sha256_hash)
                 
                 blob = Blob(
                     sha256=sha256_hash,
                     size_bytes=size_bytes,
                     storage_path=storage_path,
+                    codec=codec,
                 )
-                await uow.blobs.add(blob)
+                try:
+                    async with uow.session.begin_nested():
+                        await uow.blobs.add(blob)
+                except IntegrityError:
+                    # Równoległy upload tej samej treści zdążył założyć blob (sha256 jest unikalny) - bierzemy jego,
+                    # treść pod tym samym kluczem w storage już jest
+                    blob = await uow.blobs.get_by_hash(sha256_hash)
+                    is_new_blob, stored_bytes = False, 0
+            else:
+                await self.storage.discard(staging_id)
+
+            result = await self._add_file_version(
+                uow=uow,
+                user_id=user_id,
+                file_name=file_name,
+                mime_type=mime_type,
+                blob=blob,
+                deduplicated=not is_new_blob,
+                stored_bytes=stored_bytes,
+                parent_folder_id=parent_folder_id,
+                ip=ip,
+                user_agent=user_agent,
+                session_id=session_id,
+            )
+
+            return result
+
+    async def _add_file_version(
+        self,
+        uow: SqlAlchemyUoW,
+        user_id: UUID,
+        file_name: str,
+        mime_type: Optional[str],
+        blob: Blob,
+        deduplicated: bool,
+        parent_folder_id: Optional[UUID],
+        ip: str,
+        user_agent: str,
+        session_id: Optional[UUID] = None,
+        stored_bytes: Optional[int] = 0
+    ) -> dict:
+        """
+        Tworzy plik (albo kolejną wersję istniejącego) wskazujący na blob. Wołane wewnątrz otwartego uow.
+        stored_bytes - ile bajtów ta wersja dopisała do storage (None - cały blob); reszta to oszczędność.
+        """
+        if stored_bytes is None:
+            stored_bytes = blob.size_bytes
+        saved_bytes = max(blob.size_bytes - stored_bytes, 0)
+        _, extension = os.path.splitext(file_name)
+        extension = extension.lower() if extension else ''
+
+        if parent_folder_id:
+            parent_folder: File = await uow.files.get_by_id(parent_folder_id)
+            if not parent_folder:
+                 raise InvalidParentFolder(parent_folder_id, "Parent folder does not exist.")
+            
+            if parent_folder.owner_id != user_id:
+                raise InvalidParentFolder(parent_folder_id, "Access denied to this folder.")
+            if not parent_folder.is_folder:
+                raise InvalidParentFolder(parent_folder_id, "Target is not a folder.")
+
+        existing_file = await uow.files.get_by_owner_and_name(
+            owner_id=user_id, 
+            name=file_name, 
+            parent_id=parent_folder_id
+        )
+        if existing_file and existing_file.is_folder:
+            raise FileNameExistsError(detail=f"A folder named '{file_name}' already exists in the target folder.")
+
+        target_file_id = None
+        new_version_no = 1
+
+        if existing_file:
+            target_file_id = existing_file.id
+            existing_file.extension = extension
+            existing_file.mime_type = mime_type
+            if existing_file.current_version:
+                new_version_no = existing_file.current_version.version_no + 1
+            else:
+                new_version_no = 1 
+            
+            existing_file.mime_type = mime_type
+            
+        else:
+            new_file = File(
+                owner_id=user_id,
+                name=file_name,
+                mime_type=mime_type,
+                extension=extension,
+                is_folder=False,
+                parent_folder_id=parent_folder_id,
+            )
+            await uow.files.add(new_file)
+            try:
                 await uow.session.flush()
+            except IntegrityError:
+                # Równoległy upload zdążył założyć plik o tej nazwie
+                raise FileNameExistsError(detail=f"File name '{file_name}' already exists in the target folder.")
+            target_file_id = new_file.id
+            new_version_no = 1
+            existing_file = new_file 
+        new_version = FileVersion(
+            file_id=target_file_id,
+            version_no=new_version_no,
+            uploaded_by=user_id,
+            uploaded_at=utcnow(),
+            blob_id=blob.id, 
+        )
+        await uow.file_versions.add(new_version)
+        await uow.session.flush()
+
+        existing_file.current_version_id = new_version.id
+
+        await self.logbook.register_log(
+            uow=uow,
+            op_type=OpType.UPLOAD,
+            user_id=user_id,
+            remote_addr=ip,
+            user_agent=user_agent,
+            session_id=session_id,
+            details={
+                "filename": file_name,
+                "file_id": str(target_file_id),
+                "version_no": new_version_no,
+                "deduplicated": deduplicated,
+                "stored_bytes": stored_bytes,
+            }
+        )
+
+        return {
+            "id": target_file_id,
+            "name": file_name,
+            "version": new_version_no, # Zwracamy numer wersji
+            "deduplicated": deduplicated,
+            "stored_bytes": stored_bytes,
+            "saved_bytes": saved_bytes,
+        }
+
+    async def upload_by_hash(
+        self,
+        uow: SqlAlchemyUoW,
+        user_id: UUID,
+        file_name: str,
+        sha256_hash: str,
+        size_bytes: int,
+        parent_folder_id: Optional[UUID],
+        ip: str,
+        user_agent: str,
+        mime_type: Optional[str] = None,
+        session_id: Optional[UUID] = None
+    ) -> dict:
+        """
+        Tworzy plik bez przesyłania bajtów, jeśli użytkownik ma już tę treść w swoich plikach.
+        Brak trafienia -> BlobNotFoundError i klient wysyła plik zwykłym uploadem.
+        """
+        sha256_hash = sha256_hash.lower()
+        async with uow:
+            await self.logbook.register_log(
+                uow=uow,
+                op_type=OpType.FILE_UPLOAD_ATTEMPT,
+                user_id=user_id,
+                remote_addr=ip,
+                user_agent=user_agent,
+                session_id=session_id,
+                details={
+                    "filename": file_name,
+                    "size": size_bytes,
+                    "sha256": sha256_hash,
+                    "mode": "by_hash"
+                }
+            )
+            # Tylko bloby, do których użytkownik już ma dostęp - inaczej sama znajomość hasha
+            # dawałaby dostęp do cudzego pliku
+            blob = await uow.blobs.get_by_hash_for_owner(sha256_hash, user_id)
+            if blob and blob.size_bytes == size_bytes:
+                return await self._add_file_version(
+                    uow=uow,
+                    user_id=user_id,
+                    file_name=file_name,
+                    mime_type=mime_type or mimetypes.guess_type(file_name)[0],
+                    blob=blob,
+                    deduplicated=True,
+                    parent_folder_id=parent_folder_id,
+                    ip=ip,
+                    user_agent=user_agent,
+                    session_id=session_id,
+                )
+        raise BlobNotFoundError()
+
+    async def upload_files_batch(
+        self,
+        uow: SqlAlchemyUoW,
+        user_id: UUID,
+        files: list[UploadFile],
+        parent_folder_id: Optional[UUID],
+        ip: str,
+        user_agent: str,
+        session_id: Optional[UUID] = None
+    ) -> dict:
+        """
+        Wiele plików w jednym żądaniu. Każdy plik trafia do stagingu (hash po drodze), a potem
+        wszystkie wiersze Blob/File/FileVersion/logbook idą kilkoma wielowierszowymi INSERT-ami w jednej transakcji.
+        """
+        max_size_bytes = settings.max_file_upload_size_mb * 1024 * 1024
+        if any(f.size is not None and f.size > max_size_bytes for f in files):
+            raise FileTooLargeError()
 
+        window = asyncio.Semaphore(settings.batch_upload_stage_concurrency)
+
+        async def stage_one(upload: UploadFile) -> tuple[UploadFile, str, str, int]:
+            async with window:
+                reader = HashingReader(upload, max_size_bytes)
+                staging_id = await self.storage.stage(reader)
+                return upload, staging_id, reader.hexdigest(), reader.size_bytes
+
+        results = await asyncio.gather(*(stage_one(f) for f in files), return_exceptions=True)
+        staged = [r for r in results if not isinstance(r, BaseException)]
+        try:
+            failed = [r for r in results if isinstance(r, BaseException)]
+            if failed:
+                raise failed[0]
+            return await self._register_staged_batch(
+                uow, user_id, staged, parent_folder_id, ip, user_agent, session_id
+            )
+        except BaseException:
+            # Po promote discard jest no-opem, więc sprzątamy wszystko bez rozróżniania
+            for _, staging_id, _, _ in staged:
+                await self.storage.discard(staging_id)
+            raise
+
+    async def _register_staged_batch(
+        self,
+        uow: SqlAlchemyUoW,
+        user_id: UUID,
+        staged: list[tuple[UploadFile, str, str, int]],
+        parent_folder_id: Optional[UUID],
+        ip: str,
+        user_agent: str,
+        session_id: Optional[UUID] = None
+    ) -> dict:
+        async with uow:
             if parent_folder_id:
                 parent_folder: File = await uow.files.get_by_id(parent_folder_id)
-                if not parent_folder:
-                     raise InvalidParentFolder(parent_folder_id, "Parent folder does not exist.")
-                
-                if parent_folder.owner_id != user_id:
-                    raise InvalidParentFolder(parent_folder_id, "Access denied to this folder.")
-                if not parent_folder.is_folder:
-                    raise InvalidParentFolder(parent_folder_id, "Target is not a folder.")
+                if not parent_folder or parent_folder.owner_id != user_id or not parent_folder.is_folder:
+                    raise InvalidParentFolder(parent_folder_id)
 
-            existing_file = await uow.files.get_by_owner_and_name(
-                owner_id=user_id, 
-                name=file.filename, 
-                parent_id=parent_folder_id
+            blob_ids = {
+                sha256_hash: blob.id
+                for sha256_hash, blob in (await uow.blobs.get_by_hashes(list({s[2] for s in staged}))).items()
+            }
+            existing_files = await uow.files.get_by_names_in_folder(
+                user_id, list({upload.filename for upload, _, _, _ in staged}), parent_folder_id
             )
+            folder_names = sorted(f.name for f in existing_files if f.is_folder)
+            if folder_names:
+                raise FileNameExistsError(detail=f"A folder named '{folder_names[0]}' already exists in the target folder.")
+            # nazwa -> (id pliku, ostatni numer wersji); ta sama nazwa dwa razy w paczce to kolejne wersje
+            file_state = {
+                f.name: (f.id, f.current_version.version_no if f.current_version else 0)
+                for f in existing_files
+            }
 
-            target_file_id = None
-            new_version_no = 1
+            blob_rows, file_rows, version_rows = [], [], []
+            file_updates: dict[UUID, dict] = {}
+            log_entries = [{
+                "op_type": OpType.FILE_UPLOAD_ATTEMPT,
+                "user_id": user_id,
+                "session_id": session_id,
+                "remote_addr": ip,
+                "user_agent": user_agent,
+                "details": {"mode": "batch", "count": len(staged), "size": sum(s[3] for s in staged)},
+            }]
+            uploaded = []
+            now = utcnow()
 
-            if existing_file:
-                target_file_id = existing_file.id
-                existing_file.extension = extension
-                existing_file.mime_type = file.content_type
-                if existing_file.current_version:
-                    new_version_no = existing_file.current_version.version_no + 1
+            for upload, staging_id, sha256_hash, size_bytes in staged:
+                deduplicated = sha256_hash in blob_ids
+                stored_bytes = 0
+                if deduplicated:
+                    await self.storage.discard(staging_id)
                 else:
-                    new_version_no = 1 
-                
-                existing_file.mime_type = file.content_type
-                
-            else:
-                new_file = File(
-                    owner_id=user_id,
-                    name=file.filename,
-                    mime_type=file.content_type,
-                    extension=extension,
-                    is_folder=False,
-                    parent_folder_id=parent_folder_id,
-                )
-                await uow.files.add(new_file)
-                await uow.session.flush() 
-                target_file_id = new_file.id
-                new_version_no = 1
-                existing_file = new_file 
-            from src.common.utils.time_utils import utcnow
-            new_version = FileVersion(
-                file_id=target_file_id,
-                version_no=new_version_no,
-                uploaded_by=user_id,
-                uploaded_at=utcnow(),
-                blob_id=blob.id, 
-            )
-            await uow.file_versions.add(new_version)
-            await uow.session.flush()
+                    stored_bytes = await self.storage.stored_bytes(staging_id)
+                    if stored_bytes is None:
+                        stored_bytes = size_bytes
+                    codec = await self.storage.staged_codec(staging_id)
+                    storage_path = await self.storage.promote(staging_id, sha256_hash)
+                    blob_ids[sha256_hash] = uuid4()
+                    blob_rows.append({
+                        "id": blob_ids[sha256_hash],
+                        "sha256": sha256_hash,
+                        "size_bytes": size_bytes,
+                        "storage_path": storage_path,
+                        "codec": codec,
+                    })
 
-            existing_file.current_version_id = new_version.id
+                _, extension = os.path.splitext(upload.filename)
+                extension = extension.lower() if extension else ''
+                if upload.filename in file_state:
+                    file_id, last_version_no = file_state[upload.filename]
+                else:
+                    file_id, last_version_no = uuid4(), 0
+                    file_rows.append({
+                        "id": file_id,
+                        "owner_id": user_id,
+                        "name": upload.filename,
+                        "mime_type": upload.content_type,
+                        "extension": extension,
+                        "is_folder": False,
+                        "parent_folder_id": parent_folder_id,
+                    })
 
+                version_id, version_no = uuid4(), last_version_no + 1
+                file_state[upload.filename] = (file_id, version_no)
+                version_rows.append({
+                    "id": version_id,
+                    "file_id": file_id,
+                    "version_no": version_no,
+                    "uploaded_by": user_id,
+                    "uploaded_at": now,
+                    "blob_id": blob_ids[sha256_hash],
+                })
+                file_updates[file_id] = {
+                    "id": file_id,
+                    "current_version_id": version_id,
+                    "mime_type": upload.content_type,
+                    "extension": extension,
+                }
+                log_entries.append({
+                    "op_type": OpType.UPLOAD,
+                    "user_id": user_id,
+                    "session_id": session_id,
+                    "file_id": file_id,
+                    "remote_addr": ip,
+                    "user_agent": user_agent,
+                    "details": {
+                        "filename": upload.filename,
+                        "file_id": str(file_id),
+                        "version_no": version_no,
+                        "deduplicated": deduplicated,
+                        "stored_bytes": stored_bytes,
+                        "mode": "batch"
+                    },
+                })
+                uploaded.append({
+                    "id": file_id,
+                    "name": upload.filename,
+                    "version": version_no,
+                    "deduplicated": deduplicated,
+                    "stored_bytes": stored_bytes,
+                    "saved_bytes": max(size_bytes - stored_bytes, 0),
+                })
+
+            # Kolejność wynika z kluczy obcych: pliki -> wersje -> current_version_id plików
+            _use_stored_blob_ids(version_rows, blob_rows, await uow.blobs.add_many(blob_rows))
+            try:
+                await uow.files.add_many(file_rows)
+                await uow.file_versions.add_many(version_rows)
+            except IntegrityError:
+                # Równoległy zapis zdążył zająć jedną z nazw (albo numer wersji) - cała paczka się wycofuje
+                raise FileNameExistsError(detail="A file with one of these names was just created in the target folder.")
+            await uow.files.update_many(list(file_updates.values()))
+            await self.logbook.register_logs(uow, log_entries)
+
+            return {"count": len(uploaded), "files": uploaded}
+
+    async def create_upload_session(
+        self,
+        uow: SqlAlchemyUoW,
+        user_id: UUID,
+        file_name: str,
+        size_bytes: int,
+        parent_folder_id: Optional[UUID],
+        ip: str,
+        user_agent: str,
+        mime_type: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        session_id: Optional[UUID] = None
+    ) -> UploadSession:
+        if size_bytes > settings.max_file_upload_size_mb * 1024 * 1024:
+            raise FileTooLargeError()
+        chunk_size = chunk_size or settings.upload_chunk_size_mb * 1024 * 1024
+        if chunk_size > settings.max_upload_chunk_size_mb * 1024 * 1024:
+            raise InvalidChunkError(detail=f"Chunk size exceeds the maximum of {settings.max_upload_chunk_size_mb} MB.")
+        # Drobne kawałki to tysiące PUT-ów i obiektów w storage na plik; mniejszy może być tylko ostatni,
+        # więc mały plik wysyła się jednym kawałkiem
+        if chunk_size < settings.min_upload_chunk_size_mb * 1024 * 1024 and chunk_size < size_bytes:
+            raise InvalidChunkError(detail=f"Chunk size must be at least {settings.min_upload_chunk_size_mb} MB.")
+
+        async with uow:
+            if parent_folder_id:
+                parent_folder: File = await uow.files.get_by_id(parent_folder_id)
+                if not parent_folder or parent_folder.owner_id != user_id or not parent_folder.is_folder:
+                    raise InvalidParentFolder(parent_folder_id)
+
+            upload_session = UploadSession(
+                id=uuid4(),
+                owner_id=user_id,
+                file_name=file_name,
+                mime_type=mime_type or mimetypes.guess_type(file_name)[0],
+                parent_folder_id=parent_folder_id,
+                size_bytes=size_bytes,
+                chunk_size=chunk_size,
+            )
+            await uow.upload_sessions.add(upload_session)
             await self.logbook.register_log(
                 uow=uow,
-                op_type=OpType.UPLOAD,
+                op_type=OpType.FILE_UPLOAD_ATTEMPT,
                 user_id=user_id,
                 remote_addr=ip,
                 user_agent=user_agent,
                 session_id=session_id,
                 details={
-                    "filename": file.filename,
-                    "file_id": str(target_file_id),
-                    "version_no": new_version_no,
-                    "deduplicated": not is_new_blob
+                    "filename": file_name,
+                    "size": size_bytes,
+                    "upload_id": str(upload_session.id),
+                    "status": "session_created"
                 }
             )
+            return upload_session
 
-            return {
-                "id": target_file_id,
-                "name": file.filename,
-                "version": new_version_no, # Zwracamy numer wersji
-                "deduplicated": not is_new_blob
-            }
+    async def _get_owned_upload_session(self, uow: SqlAlchemyUoW, user_id: UUID, upload_id: UUID) -> UploadSession:
+        async with uow:
+            upload_session = await uow.upload_sessions.get_by_id(upload_id)
+        if not upload_session or upload_session.owner_id != user_id:
+            raise UploadSessionNotFoundError(detail=f"Upload session {upload_id} not found.")
+        return upload_session
+
+    async def upload_chunk(
+        self,
+        uow: SqlAlchemyUoW,
+        user_id: UUID,
+        upload_id: UUID,
+        chunk_no: int,
+        stream,
+    ) -> dict:
+        upload_session = await self._get_owned_upload_session(uow, user_id, upload_id)
+        if not 0 <= chunk_no < upload_session.chunk_count:
+            raise InvalidChunkError(detail=f"Chunk number must be between 0 and {upload_session.chunk_count - 1}.")
+
+        expected_size = upload_session.expected_chunk_size(chunk_no)
+        try:
+            size_bytes = await self.storage.write_chunk(
+                str(upload_id), chunk_no, HashingReader(stream, expected_size)
+            )
+        except FileTooLargeError:
+            raise InvalidChunkError(detail=f"Chunk {chunk_no} exceeds the expected size of {expected_size} bytes.")
+        if size_bytes != expected_size:
+            raise InvalidChunkError(detail=f"Chunk {chunk_no} should be {expected_size} bytes, got {size_bytes}.")
+        return {"chunk_no": chunk_no, "size_bytes": size_bytes}
+
+    async def get_upload_session(self, uow: SqlAlchemyUoW, user_id: UUID, upload_id: UUID) -> dict:
+        upload_session = await self._get_owned_upload_session(uow, user_id, upload_id)
+        received = await self.storage.list_chunks(str(upload_id))
+        return self._upload_session_status(upload_session, received)
+
+    @staticmethod
+    def _upload_session_status(upload_session: UploadSession, received: dict[int, int]) -> dict:
+        complete_chunks = sorted(
+            chunk_no for chunk_no, size in received.items()
+            if chunk_no < upload_session.chunk_count and size == upload_session.expected_chunk_size(chunk_no)
+        )
+        return {
+            "upload_id": upload_session.id,
+            "file_name": upload_session.file_name,
+            "size_bytes": upload_session.size_bytes,
+            "chunk_size": upload_session.chunk_size,
+            "chunk_count": upload_session.chunk_count,
+            "received_chunks": [
+                {
+                    "chunk_no": chunk_no,
+                    "offset": chunk_no * upload_session.chunk_size,
+                    "size_bytes": received[chunk_no],
+                }
+                for chunk_no in complete_chunks
+            ],
+            "received_bytes": sum(received[chunk_no] for chunk_no in complete_chunks),
+        }
+
+    async def commit_upload_session(
+        self,
+        uow: SqlAlchemyUoW,
+        user_id: UUID,
+        upload_id: UUID,
+        ip: str,
+        user_agent: str,
+        session_id: Optional[UUID] = None
+    ):
+        upload_session = await self._get_owned_upload_session(uow, user_id, upload_id)
+        status = self._upload_session_status(upload_session, await self.storage.list_chunks(str(upload_id)))
+        if len(status["received_chunks"]) != upload_session.chunk_count:
+            raise UploadIncompleteError(
+                detail=f"Received {len(status['received_chunks'])} of {upload_session.chunk_count} chunks."
+            )
+
+        # Sklejamy kawałki w staging tak jak przy zwykłym uploadzie - hash liczy się po drodze
+        reader = HashingReader(
+            AsyncIteratorReader(self.storage.read_chunks(str(upload_id), upload_session.chunk_count)),
+            upload_session.size_bytes,
+        )
+        staging_id = await self.storage.stage(reader)
+        try:
+            result = await self._register_staged_upload(
+                uow=uow,
+                user_id=user_id,
+                file_name=upload_session.file_name,
+                mime_type=upload_session.mime_type,
+                staging_id=staging_id,
+                sha256_hash=reader.hexdigest(),
+                size_bytes=reader.size_bytes,
+                parent_folder_id=upload_session.parent_folder_id,
+                ip=ip,
+                user_agent=user_agent,
+                session_id=session_id,
+                upload_id=upload_id,
+            )
+        except BaseException:
+            await self.storage.discard(staging_id)
+            raise
+
+        await self.storage.delete_chunks(str(upload_id))
+        return result
+
+    async def expire_upload_sessions(self, uow: SqlAlchemyUoW) -> int:
+        """
+        Usuwa sesje niezatwierdzone przez upload_session_ttl_hours razem z kawałkami w storage.
+        Zwraca liczbę usuniętych sesji.
+        """
+        cutoff = utcnow() - timedelta(hours=settings.upload_session_ttl_hours)
+        async with uow:
+            expired = await uow.upload_sessions.list_created_before(cutoff)
+        removed = 0
+        for upload_id in expired:
+            async with uow:
+                # Sesję mógł w międzyczasie zatwierdzić albo przerwać jej właściciel - wtedy kawałki już sprzątnął
+                if not await uow.upload_sessions.delete_by_id(upload_id):
+                    continue
+            await self.storage.delete_chunks(str(upload_id))
+            removed += 1
+        return removed
+
+    async def abort_upload_session(self, uow: SqlAlchemyUoW, user_id: UUID, upload_id: UUID) -> None:
+        upload_session = await self._get_owned_upload_session(uow, user_id, upload_id)
+        async with uow:
+            if not await uow.upload_sessions.delete_by_id(upload_session.id):
+                # Równoległy commit albo abort był pierwszy - kawałki należą teraz do niego
+                raise UploadSessionNotFoundError(detail=f"Upload session {upload_id} not found.")
+        await self.storage.delete_chunks(str(upload_id))
 
 
     async def list_files(
@@ -180,8 +807,21 @@ class FileService:
         user_agent: str,
         user_id: UUID, 
         folder_id: Optional[UUID] = None,
-        session_id: Optional[UUID] = None
+        session_id: Optional[UUID] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        all_items: bool = False
     ) -> dict:
+        """
+        Zawartość folderu stronami po kluczu (foldery, nazwa, id); next_cursor wskazuje następną stronę.
+        all_items=True zwraca cały folder naraz - tylko do list_unpaginated_max_items wpisów.
+        """
+        after = self._decode_listing_cursor(cursor, folder_id) if cursor else None
+        if all_items:
+            limit = settings.list_unpaginated_max_items
+        else:
+            limit = min(limit or settings.list_page_size, settings.list_max_page_size)
+
         async with uow:
             await self.logbook.register_log(
                 uow=uow,
@@ -195,9 +835,10 @@ class FileService:
             breadcrumbs = []
             
             if folder_id:
-                folder = await uow.files.get_by_id(folder_id)
-                if not folder or folder.owner_id != user_id or not folder.is_folder:
-                    self.logbook.register_log(
+                # Cała ścieżka jednym zapytaniem; pusta, gdy folder nie istnieje albo nie należy do użytkownika
+                ancestors = await uow.files.get_ancestors(user_id, folder_id)
+                if not ancestors:
+                    await self.logbook.register_log(
                         uow=uow,
                         op_type=OpType.LIST_FILES,
                         user_id=user_id,
@@ -207,36 +848,36 @@ class FileService:
                         details={"folder_id": str(folder_id), "status": "failed"}
                     )
                     raise FolderNotFoundError(f"Folder {folder_id} not found or access denied")
-                
-                
-                curr = folder
-                while curr:
-                    breadcrumbs.insert(0, {"id": str(curr.id), "name": curr.name})
-                    if curr.parent_folder_id:
-                         
-                         curr = await uow.files.get_by_id(curr.parent_folder_id)
-                    else:
-                        curr = None
-            
-            
-            files_db = await uow.files.list_in_folder(user_id, folder_id)
-
-            items = []
-            for f in files_db:
-                size = 0
-                if not f.is_folder and f.current_version and f.current_version.blob:
-                    size = f.current_version.blob.size_bytes
-                
-
+                breadcrumbs = [{"id": str(row.id), "name": row.name} for row in ancestors]
 
-                items.append({
-                    "id": f.id,
-                    "name": f.name,
-                    "is_folder": f.is_folder,
-                    "mime_type": f.mime_type,
-                    "size_bytes": size,
+            # Jeden wiersz więcej niż strona - tak wiemy, czy jest następna, bez liczenia całego folderu
+            rows = await uow.files.list_page(user_id, folder_id, limit + 1, after)
+            next_cursor = None
+            if len(rows) > limit:
+                if all_items:
+                    raise ListingTooLargeError(
+                        detail=f"Folder has more than {limit} entries, use cursor pagination."
+                    )
+                rows = rows[:limit]
+                last = rows[-1]
+                next_cursor = encode_cursor({
+                    "f": str(folder_id) if folder_id else None,
+                    "d": last.is_folder,
+                    "n": last.name,
+                    "i": str(last.id),
                 })
 
+            items = [
+                {
+                    "id": row.id,
+                    "name": row.name,
+                    "is_folder": row.is_folder,
+                    "mime_type": row.mime_type,
+                    "size_bytes": 0 if row.is_folder else row.size_bytes or 0,
+                }
+                for row in rows
+            ]
+
             await self.logbook.register_log(
                 uow=uow,
                 op_type=OpType.LIST_FILES,
@@ -250,8 +891,20 @@ class FileService:
             return {
                 "current_folder_id": folder_id,
                 "items": items,
-                "breadcrumbs": breadcrumbs
+                "breadcrumbs": breadcrumbs,
+                "next_cursor": next_cursor
             }
+
+    @staticmethod
+    def _decode_listing_cursor(cursor: str, folder_id: Optional[UUID]) -> tuple[bool, str, UUID]:
+        """Pozycja z kursora listingu; kursor z innego folderu albo uszkodzony to błąd klienta."""
+        try:
+            position = decode_cursor(cursor)
+            if position.get("f") != (str(folder_id) if folder_id else None):
+                raise ValueError("Cursor belongs to another folder")
+            return bool(position["d"]), str(position["n"]), UUID(position["i"])
+        except (ValueError, KeyError, TypeError):
+            raise InvalidCursorError()
         
 
     async def rename_file(self, uow: SqlAlchemyUoW,  user_id: UUID,  file_id: UUID,  new_name: str, ip: str, user_agent: str, session_id: Optional[UUID] = None) -> FileResponse:
@@ -323,6 +976,11 @@ class FileService:
 
             old_name = file.name
             file.name = new_name
+            try:
+                await uow.session.flush()
+            except IntegrityError:
+                # Nazwę zajął w międzyczasie równoległy zapis
+                raise FileNameExistsError(detail=f"File name '{new_name}' already exists in the target folder.")
             await self.logbook.register_log(
                 uow=uow,
                 op_type=OpType.RENAME,
@@ -486,6 +1144,11 @@ class FileService:
                 parent_folder_id=parent_folder_id,
             )
             await uow.files.add(new_folder)
+            try:
+                await uow.session.flush()
+            except IntegrityError:
+                # Nazwę zajął w międzyczasie równoległy zapis
+                raise FolderNameExistsError(f"Folder name '{folder_name}' already exists in the target folder.")
             self.logbook.register_log(
                 uow=uow,
                 op_type=OpType.FOLDER_CREATE,
@@ -548,83 +1211,612 @@ class FileService:
                 )
 
                 try:
-                    file_stream = self.storage.get(target_version.blob.sha256)
+                    file_stream = BlobReader(self, await self._blob_chain(uow, target_version.blob))
                 except FileNotFoundError:
                     raise FileNotFoundError(detail="Blob not found in storage.")
                 return file_record, target_version, file_stream
             
-    async def upload_zip_folder(
-            self, 
-            uow: SqlAlchemyUoW, 
-            user_id: UUID, 
-            file: UploadFile, 
+    @staticmethod
+    def _delta_key(file_hash: str, base_hash: str) -> str:
+        # Baza w kluczu - delta po nieudanej kompaktacji nie zostanie pomylona z deltą względem innej bazy
+        return f"{file_hash}.delta.{base_hash}"
+
+    @staticmethod
+    def _archive_name(name: str) -> str:
+        # Nazwa z bazy nie może wyjść poza katalog przy rozpakowaniu ("../", "a/b")
+        name = name.replace("/", "_").replace("\\", "_")
+        return "_" if name in ("", ".", "..") else name
+
+    async def download_folder_zip(
+            self,
+            uow: SqlAlchemyUoW,
+            user_id: UUID,
+            folder_id: UUID,
+            ip: str,
+            user_agent: str,
+            session_id: Optional[UUID] = None
+        ) -> tuple[File, list[ZipEntry]]:
+        """
+        Pozycje archiwum ZIP z całym poddrzewem folderu: jedno zapytanie o drzewo i jeden wpis w logbooku.
+        Treść plików czytana jest ze storage dopiero podczas wysyłania archiwum.
+        """
+        async with uow:
+            folder = await uow.files.get_by_id(folder_id)
+            if not folder:
+                raise FileNotFoundError(detail=f"Folder with id {folder_id} not found.")
+            if folder.owner_id != user_id:
+                raise AccessDeniedError(detail="Access denied.")
+            if not folder.is_folder:
+                raise BadFileFormatError(detail="Only folders can be downloaded as ZIP.")
+
+            rows = await uow.files.get_subtree(user_id, folder_id)
+
+            # Unikalne nazwy w obrębie rodzeństwa - archiwum nie może mieć dwóch pozycji o tej samej ścieżce
+            names: dict[UUID, str] = {}
+            taken: set[tuple] = set()
+            for row in sorted(rows, key=lambda r: (r.is_folder is False, r.name)):
+                name = root = self._archive_name(row.name)
+                ext = ""
+                if not row.is_folder:
+                    root, ext = os.path.splitext(name)
+                n = 1
+                while (row.parent_folder_id, name.lower()) in taken:
+                    n += 1
+                    name = f"{root} ({n}){ext}"
+                taken.add((row.parent_folder_id, name.lower()))
+                names[row.id] = name
+
+            parents = {row.id: row.parent_folder_id for row in rows}
+            paths: dict[UUID, str] = {}
+
+            def path_of(file_id: UUID) -> str:
+                if file_id not in paths:
+                    parent = parents[file_id]
+                    paths[file_id] = names[file_id] if file_id == folder_id else f"{path_of(parent)}/{names[file_id]}"
+                return paths[file_id]
+
+            entries: list[ZipEntry] = []
+            for row in sorted(rows, key=lambda r: path_of(r.id)):
+                path = path_of(row.id)
+                if row.is_folder:
+                    entries.append(ZipEntry(path, row.created_at))
+                elif row.Blob is not None:
+                    chain = await self._blob_chain(uow, row.Blob)
+                    entries.append(ZipEntry(
+                        path,
+                        row.uploaded_at or row.created_at,
+                        row.Blob.size_bytes,
+                        lambda chain=chain: self._read_blob(chain),
+                    ))
+
+            await self.logbook.register_log(
+                uow=uow,
+                op_type=OpType.DOWNLOAD,
+                user_id=user_id,
+                remote_addr=ip,
+                user_agent=user_agent,
+                session_id=session_id,
+                details={
+                    "folder_id": str(folder_id),
+                    "archive": "zip",
+                    "file_count": sum(not e.is_dir for e in entries),
+                }
+            )
+            return folder, entries
+
+    async def _blob_chain(self, uow: SqlAlchemyUoW, blob: Blob) -> list[tuple[str, Optional[str]]]:
+        """
+        (hash, kodek) od bloba do pełnej treści: [delta, delta, ..., pełny]. Wołane wewnątrz otwartego uow.
+        Kodek delty to kodek jej zapisu w storage, nie pełnej treści.
+        """
+        chain = [blob]
+        while chain[-1].delta_base_id:
+            chain.append(await uow.blobs.get_by_id(chain[-1].delta_base_id))
+        return [(b.sha256, b.codec) for b in chain]
+
+    async def _read_blob(self, chain: list[tuple[str, Optional[str]]]):
+        """Strumień pełnej treści bloba; wersje zapisane jako delty odtwarzane w locie od najnowszej."""
+        if len(chain) == 1:
+            async for data in self.storage.get(*chain[0]):
+                yield data
+            return
+
+        base = tempfile.SpooledTemporaryFile(max_size=DELTA_SPOOL_SIZE)
+        try:
+            # Spool przechodzi na dysk powyżej DELTA_SPOOL_SIZE - zapisy w wątku, nie w pętli zdarzeń
+            async for data in self.storage.get(*chain[-1]):
+                await asyncio.to_thread(base.write, data)
+            for i in range(len(chain) - 2, -1, -1):
+                (sha256_hash, codec), (base_hash, _) = chain[i], chain[i + 1]
+                delta = AsyncIteratorReader(self.storage.get(self._delta_key(sha256_hash, base_hash), codec))
+                if i == 0:
+                    async for data in apply_delta(base, delta):
+                        yield data
+                    return
+                restored = tempfile.SpooledTemporaryFile(max_size=DELTA_SPOOL_SIZE)
+                async for data in apply_delta(base, delta):
+                    await asyncio.to_thread(restored.write, data)
+                base.close()
+                base = restored
+        finally:
+            base.close()
+
+    async def _read_blob_range(self, chain: list[tuple[str, Optional[str]]], start: int, end: int):
+        if len(chain) == 1:
+            sha256_hash, codec = chain[0]
+            async for data in self.storage.get_range(sha256_hash, start, end, codec):
+                yield data
+            return
+        # Wersję zapisaną jako delta trzeba najpierw odtworzyć - zakres wycinamy z całości
+        async for data in slice_stream(self._read_blob(chain), start, end):
+            yield data
+
+    async def compact_file_versions(self, uow: SqlAlchemyUoW, file_id: UUID) -> int:
+        """
+        Zamienia starsze wersje pliku na delty względem następnej wersji.
+        Bloby będące bieżącą wersją jakiegokolwiek pliku zostają w całości. Zwraca liczbę skompaktowanych blobów.
+        """
+        min_size_bytes = settings.version_delta_min_size_kb * 1024
+        async with uow:
+            versions = sorted(await uow.file_versions.list_by_file_id(file_id), key=lambda v: v.version_no)
+            candidates = []
+            for older, newer in zip(versions, versions[1:]):
+                blob = older.blob
+                if blob.delta_base_id or blob.id == newer.blob_id or blob.size_bytes < min_size_bytes:
+                    continue
+                if await uow.blobs.is_current_anywhere(blob.id):
+                    continue
+                base_chain = await self._blob_chain(uow, newer.blob)
+                if any(sha256_hash == blob.sha256 for sha256_hash, _ in base_chain):
+                    continue  # delta względem samego siebie - cykl
+                candidates.append((blob.id, blob.sha256, blob.codec, blob.size_bytes, newer.blob.id, base_chain))
+
+        compacted = 0
+        # Kodowanie delty trwa - robimy je poza transakcją, a blob przepinamy dopiero na końcu
+        for blob_id, sha256_hash, codec, size_bytes, base_id, base_chain in candidates:
+            delta_key = self._delta_key(sha256_hash, base_chain[0][0])
+            try:
+                with tempfile.SpooledTemporaryFile(max_size=DELTA_SPOOL_SIZE) as delta:
+                    await encode_delta(
+                        self._read_blob(base_chain),
+                        self.storage.get(sha256_hash, codec),
+                        delta,
+                        max_size=int(size_bytes * settings.version_delta_max_ratio),
+                    )
+                    await asyncio.to_thread(delta.seek, 0)
+                    # Delta ma własny kodek (storage mógł jej nie skompresować) - trafia do wiersza bloba
+                    staging_id = await self.storage.stage(AsyncIteratorReader(_iter_file(delta)))
+                    delta_codec = await self.storage.staged_codec(staging_id)
+                    storage_path = await self.storage.promote(staging_id, delta_key)
+            except DeltaTooLargeError:
+                continue
+
+            async with uow:
+                blob = await uow.blobs.get_by_id(blob_id)
+                if blob is None or blob.delta_base_id or await uow.blobs.is_current_anywhere(blob_id):
+                    # W międzyczasie ktoś wgrał tę treść jako bieżącą wersję - zostaje w całości
+                    await self.storage.delete(delta_key)
+                    continue
+                blob.delta_base_id = base_id
+                blob.storage_path = storage_path
+                blob.codec = delta_codec
+            # Pełną kopię usuwamy dopiero po commicie - do tego momentu odczyty jej potrzebują
+            await self.storage.delete(sha256_hash)
+            compacted += 1
+        return compacted
+
+    async def compact_in_background(self, uow: SqlAlchemyUoW, file_ids: list[UUID]) -> None:
+        """
+        Kompaktacja wersji po uploadzie (BackgroundTasks) - błąd nie może dotrzeć do klienta, tylko do logów.
+        W pętli zostaje tylko I/O: granice kawałków delty liczy pula procesów, pliki tymczasowe obsługują wątki.
+        """
+        for file_id in file_ids:
+            try:
+                await self.compact_file_versions(uow, file_id)
+            except Exception:
+                logging.exception(f"Version compaction failed for file {file_id}")
+
+    async def collect_blob_garbage(self, uow: SqlAlchemyUoW) -> int:
+        """
+        Sprząta storage z obiektów, do których nie prowadzi żaden blob w bazie (np. kawałki wersji
+        zamienionych na delty). Obiekty młodsze niż blob_gc_min_age_hours zostają - to mogą być uploady w toku.
+        """
+        async with uow:
+            hashes = await uow.blobs.list_content_hashes()
+        live = {
+            sha256_hash if base_hash is None else self._delta_key(sha256_hash, base_hash)
+            for sha256_hash, base_hash in hashes
+        }
+        removed = await self.storage.collect_garbage(live, settings.blob_gc_min_age_hours * 3600)
+        if removed:
+            logging.info(f"Blob GC removed {removed} unreferenced storage objects")
+        return removed
+
+    async def create_zip_import_job(
+            self,
+            uow: SqlAlchemyUoW,
+            user_id: UUID,
+            file: UploadFile,
             parent_folder_id: Optional[UUID],
-            ip: str, 
-            user_agent: str
-        ):
+            ip: str,
+            user_agent: str,
+            session_id: Optional[UUID] = None
+        ) -> dict:
+        """
+        Przyjęcie archiwum do importu w tle. To, co klient może poprawić (uszkodzony katalog centralny,
+        limit rozmiaru, folder docelowy), sprawdzamy od razu; archiwum trafia do storage (osobno od kawałków
+        uploadów), żeby przeżyło restart procesu. Rozpakowanie i zapis robi run_zip_import_job.
+        """
         MAX_ZIP_SIZE_MB = settings.max_file_upload_size_mb
-        processed_paths = set()
-        created_files_count = 0
+        try:
+            with zipfile.ZipFile(file.file, 'r') as zip_ref:
+                members = zip_ref.infolist()
+        except zipfile.BadZipFile:
+            raise BadFileFormatError(detail="Uploaded file is not a valid ZIP archive.")
+        total_uncompressed_size = sum(zinfo.file_size for zinfo in members)
+        if total_uncompressed_size > MAX_ZIP_SIZE_MB * 1024 * 1024:
+            raise FileTooLargeError(detail=f"Zip contents exceed limit of {MAX_ZIP_SIZE_MB} MB.")
+        _, file_members = plan_zip_import(members)
+
+        async with uow:
+            await self._check_zip_target(uow, user_id, parent_folder_id)
+
+        job_id = uuid4()
+        await file.seek(0)
+        await self.storage.save_import_archive(str(job_id), file)
         try:
             async with uow:
-                parent_folder = await uow.files.get_by_id(parent_folder_id) if parent_folder_id else None
-                if parent_folder==None and parent_folder_id is not None:
-                    raise FolderNotFoundError(f"Parent folder with id {parent_folder_id} not found.")
-                if parent_folder  and parent_folder.owner_id != user_id:
-                    raise AccessDeniedError("Access denied to this folder.")
-                zip_stem = Path(file.filename).stem  # Ucina .zip
-                root_zip_folder_id = await self._get_or_create_folder(
-                    uow, user_id, zip_stem, parent_folder_id
+                job = ZipImportJob(
+                    id=job_id,
+                    owner_id=user_id,
+                    parent_folder_id=parent_folder_id,
+                    archive_name=file.filename or "archive.zip",
+                    status="queued",
+                    entries_total=len(file_members),
+                    entries_processed=0,
+                    bytes_written=0,
+                    dedup_hits=0,
+                    error_count=0,
+                    errors=[],
+                    updated_at=utcnow(),
+                )
+                await uow.zip_import_jobs.add(job)
+                await self.logbook.register_log(
+                    uow=uow,
+                    op_type=OpType.FILE_UPLOAD_ATTEMPT,
+                    user_id=user_id,
+                    remote_addr=ip,
+                    user_agent=user_agent,
+                    session_id=session_id,
+                    details={
+                        "filename": job.archive_name,
+                        "entries": len(file_members),
+                        "job_id": str(job_id),
+                        "status": "zip_import_queued"
+                    }
                 )
-                folder_map = {"": root_zip_folder_id}
+        except BaseException:
+            await self.storage.delete_import_archive(str(job_id))
+            raise
+        return {"job_id": job_id, "status": "queued", "entries_total": len(file_members)}
 
-                with zipfile.ZipFile(file.file, 'r') as zip_ref:
-                    total_uncompressed_size = sum(zinfo.file_size for zinfo in zip_ref.infolist())
-                    if total_uncompressed_size > MAX_ZIP_SIZE_MB * 1024 * 1024:
-                        raise FileTooLargeError(detail=f"Zip contents exceed limit of {MAX_ZIP_SIZE_MB} MB.")
-                    
-                    zip_contents = sorted(zip_ref.infolist(), key=lambda x: x.filename)
-
-                    for member in zip_contents:
-                        filename = member.filename
-                        if filename in processed_paths: continue
-                        processed_paths.add(filename)
-                        if filename.startswith("/") or ".." in filename: continue
-                        if "__MACOSX" in filename or ".DS_Store" in filename: continue
-                        path_parts = filename.rstrip("/").split("/")
-                        # Startujemy od naszego nowego folderu-kontenera
-                        current_parent_id = root_zip_folder_id
-                        parts_to_process = path_parts if member.is_dir() else path_parts[:-1]
-                        
-                        for i, part_name in enumerate(parts_to_process):
-                            current_path_key = "/".join(path_parts[:i+1])
-                            found_id = folder_map.get(current_path_key)
-                            if found_id:
-                                current_parent_id = found_id
-                            else:
-                                new_folder_uuid = await self._get_or_create_folder(
-                                    uow, user_id, part_name, current_parent_id
-                                )
-                                folder_map[current_path_key] = new_folder_uuid
-                                current_parent_id = new_folder_uuid
-                        if member.is_dir():
-                            continue
-
-                        file_name = path_parts[-1]
-                        
-                        with zip_ref.open(member) as source_stream:
-                            ext = os.path.splitext(file_name)[1].lower()
-                            mime = mimetypes.types_map.get(ext, "application/octet-stream")
-
-                            await self._save_zip_member_as_file(
-                                uow, user_id, source_stream, file_name, 
-                                current_parent_id, mime, ext, ip, user_agent
-                            )
-                            created_files_count += 1
-        except zipfile.BadZipFile:
-            raise BadFileFormatError(detail="Uploaded file is not a valid ZIP archive.")
+    async def get_zip_import_job(self, uow: SqlAlchemyUoW, user_id: UUID, job_id: UUID) -> ZipImportJob:
+        async with uow:
+            job = await uow.zip_import_jobs.get_by_id(job_id)
+        if not job or job.owner_id != user_id:
+            raise ZipImportJobNotFoundError(detail=f"Import job {job_id} not found.")
+        return job
+
+    async def run_zip_import_job(self, uow: SqlAlchemyUoW, job_id: UUID, expected_token: Optional[UUID] = None) -> None:
+        """
+        Wykonanie zadania importu - z BackgroundTasks po przyjęciu archiwum albo przy wznowieniu po restarcie.
+        Najpierw przejmujemy zadanie (worker_token); jeśli prowadzi je już ktoś inny, nic nie robimy.
+        Błąd całego zadania kończy je statusem failed; anulowanie (zamknięcie procesu) zostawia je do wznowienia.
+        """
+        token = uuid4()
+        async with uow:
+            if not await uow.zip_import_jobs.claim(job_id, expected_token, token):
+                return
+            job = await uow.zip_import_jobs.get_by_id(job_id)
+            progress = {
+                "root_folder_id": job.root_folder_id,
+                "entries_processed": job.entries_processed,
+                "bytes_written": job.bytes_written,
+                "dedup_hits": job.dedup_hits,
+                "error_count": job.error_count,
+                "errors": list(job.errors or []),
+            }
+            user_id, parent_folder_id, root_name = job.owner_id, job.parent_folder_id, Path(job.archive_name).stem
+
+        heartbeat = asyncio.create_task(self._zip_import_heartbeat(uow, job_id, token))
+        try:
+            with tempfile.TemporaryFile() as archive:
+                async for data in self.storage.read_import_archive(str(job_id)):
+                    await offload(archive.write, data)
+                with zipfile.ZipFile(archive) as zip_ref:
+                    await self._import_zip_batches(
+                        uow, job_id, token, zip_ref, user_id, root_name, parent_folder_id, progress
+                    )
+            status, error = "completed", None
+        except _ZipImportJobLost:
+            return
+        except Exception as e:
+            logging.exception(f"ZIP import job {job_id} failed")
+            status, error = "failed", getattr(e, "detail", None) or str(e) or type(e).__name__
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+        async with uow:
+            finished = await uow.zip_import_jobs.update_owned(
+                job_id, token, status=status, error=error, finished_at=utcnow()
+            )
+        if finished:
+            await self.storage.delete_import_archive(str(job_id))
+
+    async def _zip_import_heartbeat(self, uow: SqlAlchemyUoW, job_id: UUID, token: UUID) -> None:
+        """
+        Odświeża updated_at zadania co jedną trzecią dzierżawy (zip_import_lease_s), także w trakcie długiej paczki.
+        Własny uow - ten z argumentu obsługuje w tym czasie paczki zadania.
+        """
+        heartbeat_uow = uow.fork()
+        while True:
+            await asyncio.sleep(max(settings.zip_import_lease_s / 3, 1))
+            async with heartbeat_uow:
+                if not await heartbeat_uow.zip_import_jobs.update_owned(job_id, token):
+                    return
 
-        return {"status": "success", "imported_files": created_files_count}
+    async def resume_zip_import_jobs(self, uow: SqlAlchemyUoW) -> int:
+        """
+        Przejmuje niedokończone zadania (queued/running), których pracownik nie dał znaku życia przez
+        zip_import_lease_s - padł albo zadanie nigdy nie ruszyło - i prowadzi je od ostatniej zatwierdzonej paczki.
+        Zadania żywych pracowników (świeży heartbeat) zostają u nich. Wołane cyklicznie, nie tylko przy starcie.
+        """
+        async with uow:
+            pending = await uow.zip_import_jobs.list_stale(utcnow() - timedelta(seconds=settings.zip_import_lease_s))
+        for job_id, worker_token in pending:
+            await self.run_zip_import_job(uow, job_id, expected_token=worker_token)
+        return len(pending)
+
+    async def _import_zip_batches(
+        self,
+        uow: SqlAlchemyUoW,
+        job_id: UUID,
+        token: UUID,
+        zip_ref: zipfile.ZipFile,
+        user_id: UUID,
+        root_name: str,
+        parent_folder_id: Optional[UUID],
+        progress: dict,
+    ) -> None:
+        """
+        Pliki paczkami po zip_import_batch_entries w kolejności planu (plan jest deterministyczny, więc
+        entries_processed wskazuje to samo miejsce po restarcie). Paczka zakłada tylko foldery nad swoimi plikami;
+        foldery bez plików w poddrzewie zakłada pierwsza. Każda paczka to jedna transakcja razem z postępem.
+        """
+        folder_paths, file_members = plan_zip_import(zip_ref.infolist())
+        batch_size = max(settings.zip_import_batch_entries, 1)
+        empty_folders = set(folder_paths) - with_parent_folders(folder_path for folder_path, _, _ in file_members)
+        starts = range(progress["entries_processed"], len(file_members), batch_size) if file_members else [0]
+
+        for start in starts:
+            batch = file_members[start:start + batch_size]
+            batch_folders = with_parent_folders(folder_path for folder_path, _, _ in batch)
+            if start == 0:
+                batch_folders |= empty_folders
+            for attempt in range(ZIP_IMPORT_BATCH_ATTEMPTS):
+                staged, failures = await self._stage_zip_members(zip_ref, batch)
+                try:
+                    async with uow:
+                        await self._check_zip_target(uow, user_id, parent_folder_id)
+                        root_id = progress["root_folder_id"]
+                        if root_id is None:
+                            root_id = await self._get_or_create_folder(uow, user_id, root_name, parent_folder_id)
+                            await uow.session.flush()
+                        stats = await self._write_zip_batch(
+                            uow, user_id, root_id, sorted(batch_folders, key=lambda f: (f.count("/"), f)), staged
+                        )
+                        failures += stats["failures"]
+                        errors = progress["errors"]
+                        update = {
+                            "root_folder_id": root_id,
+                            "entries_processed": start + len(batch),
+                            "bytes_written": progress["bytes_written"] + stats["bytes_written"],
+                            "dedup_hits": progress["dedup_hits"] + stats["dedup_hits"],
+                            "error_count": progress["error_count"] + len(failures),
+                            "errors": errors + failures[:max(ZIP_IMPORT_MAX_ERRORS - len(errors), 0)],
+                        }
+                        if not await uow.zip_import_jobs.update_owned(job_id, token, **update):
+                            raise _ZipImportJobLost()
+                except IntegrityError:
+                    # Ktoś równolegle zajął nazwę z tej paczki; paczka się wycofała, a powtórka zobaczy
+                    # nowe rodzeństwo i pominie kolidujących członków jak każdy inny konflikt nazw
+                    for _, _, staging_id, _, _ in staged:
+                        await self.storage.discard(staging_id)
+                    if attempt + 1 == ZIP_IMPORT_BATCH_ATTEMPTS:
+                        raise FileNameExistsError(detail="Names in the archive keep colliding with concurrent writes.")
+                    continue
+                except BaseException:
+                    for _, _, staging_id, _, _ in staged:
+                        await self.storage.discard(staging_id)
+                    raise
+                break
+            progress.update(update)
+
+    async def _check_zip_target(self, uow: SqlAlchemyUoW, user_id: UUID, parent_folder_id: Optional[UUID]) -> None:
+        parent_folder = await uow.files.get_by_id(parent_folder_id) if parent_folder_id else None
+        if parent_folder==None and parent_folder_id is not None:
+            raise FolderNotFoundError(f"Parent folder with id {parent_folder_id} not found.")
+        if parent_folder  and parent_folder.owner_id != user_id:
+            raise AccessDeniedError("Access denied to this folder.")
+
+    async def _stage_zip_members(
+        self, zip_ref: zipfile.ZipFile, file_members: list[tuple[str, str, zipfile.ZipInfo]]
+    ) -> tuple[list[tuple[str, str, str, str, int]], list[dict]]:
+        """
+        Treść każdego pliku z archiwum prosto do stagingu, hashowana po drodze.
+        Do zip_import_workers członków naraz: rozpakowanie i SHA-256 idą w wątkach (oba zwalniają GIL),
+        odczyty surowych bajtów serializuje wewnętrzna blokada ZipFile. Każdy członek w locie trzyma
+        najwyżej jeden kawałek, więc pamięć jest ograniczona niezależnie od rozmiaru archiwum.
+        Zwraca (folder, nazwa, staging_id, sha256, rozmiar) w kolejności planu oraz błędy członków,
+        których nie dało się wczytać (uszkodzone dane, za duży plik) - te pomijamy.
+        """
+        max_size_bytes = settings.max_file_upload_size_mb * 1024 * 1024
+        workers = max(settings.zip_import_workers, 1)
+        staged: list[Optional[tuple[str, str, str, str, int]]] = [None] * len(file_members)
+        failures: list[Optional[dict]] = [None] * len(file_members)
+        # Stała liczba pracowników ciągnie członków ze wspólnego iteratora - bez zadania na każdy wpis
+        pending = iter(enumerate(file_members))
+
+        async def worker() -> None:
+            for index, (folder_path, file_name, member) in pending:
+                try:
+                    with zip_ref.open(member) as source_stream:
+                        # Małe pliki rozpakowujemy od razu - przeskok do wątku kosztowałby więcej
+                        threaded = workers > 1 and member.file_size >= INLINE_HASH_THRESHOLD
+                        reader = HashingReader(SyncStreamReader(source_stream, threaded), max_size_bytes)
+                        staging_id = await self.storage.stage(reader)
+                    staged[index] = (folder_path, file_name, staging_id, reader.hexdigest(), reader.size_bytes)
+                except (zipfile.BadZipFile, zipfile.LargeZipFile, FileTooLargeError, NotImplementedError, EOFError, zlib.error) as e:
+                    failures[index] = {"path": member.filename, "detail": getattr(e, "detail", None) or str(e)}
+
+        tasks = [asyncio.create_task(worker()) for _ in range(min(workers, len(file_members)))]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Pozostali pracownicy nie mogą dalej stage'ować za plecami sprzątania - zatrzymujemy ich przed nim
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for item in staged:
+                if item is not None:
+                    await self.storage.discard(item[2])
+            raise
+        return [item for item in staged if item is not None], [item for item in failures if item is not None]
+
+    async def _write_zip_batch(
+        self,
+        uow: SqlAlchemyUoW,
+        user_id: UUID,
+        root_id: UUID,
+        folder_paths: list[str],
+        staged: list[tuple[str, str, str, str, int]],
+    ) -> dict:
+        """
+        Zapis paczki importu w otwartej transakcji. Istniejące foldery o tych samych nazwach
+        są używane ponownie, istniejące pliki dostają kolejną wersję, o deduplikacji decyduje hash.
+        Zapytań jest tyle, ile poziomów drzewa (wyszukanie nazw) plus kilka INSERT-ów - nie tyle, ile wpisów.
+        Nazwa zajęta przez coś innego (plik tam, gdzie archiwum ma folder, i odwrotnie) pomija członka
+        razem z wszystkim pod nim - trafia do błędów zadania, bo nazwy rodzeństwa są unikalne.
+        Zwraca liczbę plików, bajty nowej treści, liczbę członków, których treść już była w storage, i pominięte.
+        """
+        folder_ids: dict[str, Optional[UUID]] = {"": root_id}
+        # Tylko foldery sprzed importu mogą już mieć dzieci; ich zawartość czytamy hurtowo, poziomami
+        preexisting = {root_id}
+        children: dict[UUID, dict[str, tuple]] = {}
+
+        async def load_children(parent_ids) -> None:
+            pending = list({p for p in parent_ids if p in preexisting and p not in children})
+            for parent_id in pending:
+                children[parent_id] = {}
+            for row in await uow.files.get_children(user_id, pending):
+                children[row.parent_folder_id].setdefault(row.name, row)
+
+        folder_rows = []
+        for depth in sorted({path.count("/") for path in folder_paths}):
+            level = [path for path in folder_paths if path.count("/") == depth]
+            await load_children(folder_ids[dirname(path)] for path in level)
+            for path in level:
+                parent_id = folder_ids[dirname(path)]
+                name = path.rsplit("/", 1)[-1]
+                existing = children.get(parent_id, {}).get(name)
+                if parent_id is None or (existing is not None and not existing.is_folder):
+                    folder_ids[path] = None
+                    continue
+                if existing is not None:
+                    folder_ids[path] = existing.id
+                    preexisting.add(existing.id)
+                    continue
+                folder_ids[path] = uuid4()
+                # Plik o tej nazwie dalej w tej samej paczce ma zobaczyć nowy folder
+                children.setdefault(parent_id, {})[name] = _NewFolder(folder_ids[path])
+                folder_rows.append({
+                    "id": folder_ids[path],
+                    "owner_id": user_id,
+                    "name": name,
+                    "is_folder": True,
+                    "parent_folder_id": parent_id,
+                    "mime_type": "application/directory",
+                })
+
+        await load_children(folder_ids[folder_path] for folder_path, _, _, _, _ in staged if folder_ids[folder_path])
+        blob_ids = {
+            sha256_hash: blob.id
+            for sha256_hash, blob in (await uow.blobs.get_by_hashes(list({s[3] for s in staged}))).items()
+        }
+
+        blob_rows, file_rows, version_rows, file_updates = [], [], [], []
+        stats = {"files": 0, "bytes_written": 0, "dedup_hits": 0, "failures": []}
+        now = utcnow()
+        for folder_path, file_name, staging_id, sha256_hash, size_bytes in staged:
+            parent_id = folder_ids[folder_path]
+            existing = children.get(parent_id, {}).get(file_name)
+            if parent_id is None or (existing is not None and existing.is_folder):
+                await self.storage.discard(staging_id)
+                path = f"{folder_path}/{file_name}" if folder_path else file_name
+                stats["failures"].append({"path": path, "detail": "Name is already used by a file or folder."})
+                continue
+            stats["files"] += 1
+            if sha256_hash in blob_ids:
+                await self.storage.discard(staging_id)
+                stats["dedup_hits"] += 1
+            else:
+                codec = await self.storage.staged_codec(staging_id)
+                storage_path = await self.storage.promote(staging_id, sha256_hash)
+                blob_ids[sha256_hash] = uuid4()
+                blob_rows.append({
+                    "id": blob_ids[sha256_hash],
+                    "sha256": sha256_hash,
+                    "size_bytes": size_bytes,
+                    "storage_path": storage_path,
+                    "codec": codec,
+                })
+                stats["bytes_written"] += size_bytes
+
+            ext = os.path.splitext(file_name)[1].lower()
+            mime = mimetypes.types_map.get(ext, "application/octet-stream")
+            if existing is not None:
+                file_id, version_no = existing.id, (existing.version_no or 0) + 1
+            else:
+                file_id, version_no = uuid4(), 1
+                file_rows.append({
+                    "id": file_id,
+                    "owner_id": user_id,
+                    "name": file_name,
+                    "mime_type": mime,
+                    "extension": ext,
+                    "is_folder": False,
+                    "parent_folder_id": parent_id,
+                })
+
+            version_id = uuid4()
+            version_rows.append({
+                "id": version_id,
+                "file_id": file_id,
+                "version_no": version_no,
+                "uploaded_by": user_id,
+                "uploaded_at": now,
+                "blob_id": blob_ids[sha256_hash],
+            })
+            file_updates.append({"id": file_id, "current_version_id": version_id, "mime_type": mime, "extension": ext})
+
+        # Foldery są posortowane rodzic przed dzieckiem; dalej kolejność wynika z kluczy obcych
+        await uow.files.add_many(folder_rows)
+        _use_stored_blob_ids(version_rows, blob_rows, await uow.blobs.add_many(blob_rows))
+        await uow.files.add_many(file_rows)
+        await uow.file_versions.add_many(version_rows)
+        await uow.files.update_many(file_updates)
+        return stats
 
 
     async def _get_or_create_folder(self, uow:SqlAlchemyUoW, user_id, name, parent_id) -> UUID:
@@ -637,6 +1829,8 @@ class FileService:
         
         if existing and existing.is_folder:
             return existing.id
+        if existing:
+            raise FolderNameExistsError(f"A file named '{name}' already exists in the target folder.")
         
         new_folder = File(
             id = uuid4(),
@@ -648,79 +1842,3 @@ class FileService:
         )
         await uow.files.add(new_folder) 
         return new_folder.id
-
-    async def _save_zip_member_as_file(
-        self, uow: SqlAlchemyUoW, user_id, stream, filename, parent_id, mime, ext, ip, user_agent
-    ):
-        import hashlib
-        sha256 = hashlib.sha256()
-        size_bytes = 0
-        content_chunks = []
-        
-        while chunk := stream.read(1024 * 1024):
-            sha256.update(chunk)
-            size_bytes += len(chunk)
-            content_chunks.append(chunk)
-            
-        sha256_hash = sha256.hexdigest()
-
-        blob = await uow.blobs.get_by_hash(sha256_hash)
-        blob_id = blob.id if blob else None
-        if not blob:
-            full_content = b"".join(content_chunks)
-            file_obj = AsyncBytesIO(full_content)
-            
-            storage_path = await self.storage.save(file_obj, sha256_hash)
-            blob_id = uuid4()
-            blob = Blob(
-                id=blob_id,  
-                sha256=sha256_hash,
-                size_bytes=size_bytes,
-                storage_path=storage_path
-            )
-            await uow.blobs.add(blob)
-
-        existing_file = await uow.files.get_by_owner_and_name(user_id, filename, parent_id)
-        
-        if existing_file:
-            existing_file.extension = ext
-            existing_file.mime_type = mime
-            max_ver = await uow.file_versions.get_highest_version_no(existing_file.id)
-            new_version_no = (max_ver if max_ver is not None else 0) + 1
-            
-            ver = FileVersion(
-                file_id=existing_file.id,
-                version_no=new_version_no,
-                uploaded_by=user_id,
-                blob_id=blob.id
-            )
-            await uow.file_versions.add(ver)
-            
-        else:
-            # TWORZENIE NOWEGO PLIKU
-            new_file_id = uuid4()
-            new_version_id = uuid4()
-            new_file = File(
-                id=new_file_id,
-                owner_id=user_id,
-                name=filename,
-                mime_type=mime,
-                extension=ext,
-                is_folder=False,
-                parent_folder_id=parent_id,
-            )
-            await uow.files.add(new_file)   
-            logging.debug(f"Created new file {filename} with ID {new_file.id} in parent {parent_id}")
-            logging.debug(f"size bytes: {size_bytes}")  
-            ver = FileVersion(
-                id =new_version_id,
-                file_id=new_file.id,
-                version_no=1,
-                uploaded_by=user_id,
-                blob_id=blob_id,
-                # size_bytes=size_bytes
-            )
-            await uow.file_versions.add(ver)
-            await uow.session.flush()
-
-            await uow.files.update_version(new_file.id, ver.id)
\ No newline at end of file
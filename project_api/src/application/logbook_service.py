@@ -1,5 +1,5 @@
 import alembic
-from typing import Any, Mapping, Optional 
+from typing import Any, Mapping, Optional, Sequence
 from src.infrastructure.uow import SqlAlchemyUoW
 from src.domain.enums.op_type import OpType
 from src.domain.entities.logbook import LogBook
@@ -30,4 +30,20 @@ class LogbookService:
         )
         await uow.logbook.add(log)
 
-    
\ No newline at end of file
+    async def register_logs(self, uow: SqlAlchemyUoW, entries: Sequence[Mapping[str, Any]]) -> None:
+        """
+        Wiele wpisów jednym INSERT-em (np. upload wsadowy). Każdy wpis ma te same pola co register_log.
+        """
+        rows = [
+            {
+                "op_type": entry["op_type"].value,
+                "remote_addr": entry["remote_addr"],
+                "user_agent": entry["user_agent"],
+                "details": entry["details"],
+                "user_id": entry.get("user_id"),
+                "session_id": entry.get("session_id"),
+                "file_id": entry.get("file_id"),
+            }
+            for entry in entries
+        ]
+        await uow.logbook.add_many(rows)
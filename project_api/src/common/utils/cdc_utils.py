@@ -0,0 +1,113 @@
+import hashlib
+import numpy as np
+from src.common.utils.process_utils import run_in_process
+
+# Tablica gear: stała losowa liczba 64-bit dla każdej wartości bajtu (deterministyczna - granice nie mogą
+# zmieniać się między procesami, bo od nich zależą hashe kawałków już zapisanych w storage)
+GEAR = np.array(
+    [int.from_bytes(hashlib.sha256(b"gear%d" % i).digest()[:8], "big") for i in range(256)], dtype=np.uint64
+)
+# Gear hash 64-bit zależy od ostatnich 64 bajtów - krótszy kawałek nie miałby pełnego okna
+WINDOW = 64
+
+
+def _top_bits_mask(bits: int) -> np.uint64:
+    # Starsze bity gear hasha zależą od całego okna, młodsze - tylko od kilku ostatnich bajtów
+    return np.uint64(((1 << bits) - 1) << (64 - bits))
+
+
+def _gear_hashes(data) -> np.ndarray:
+    """h[i] = suma G[data[i - k]] << k po k < 64 (mod 2^64) dla każdej pozycji naraz - okno podwajane 6 razy."""
+    h = GEAR[np.frombuffer(data, dtype=np.uint8)]
+    width = 1
+    while width < WINDOW:
+        h[width:] += h[:-width] << np.uint64(width)
+        width *= 2
+    return h
+
+
+# Hashe liczone blokami - tablice uint64 mieszczą się w cache CPU (kilka razy szybciej niż cały bufor naraz)
+SCAN_BLOCK = 16 * 1024
+
+
+def _candidates(data, hard_mask: np.uint64, easy_mask: np.uint64) -> tuple[np.ndarray, np.ndarray]:
+    """Offsety za bajtami, na których hash spełnia trudną i łatwą maskę (trudna ma więcej bitów, więc to podzbiór)."""
+    view = memoryview(data)
+    hard, easy = [], []
+    for start in range(0, len(view), SCAN_BLOCK):
+        overlap = min(start, WINDOW - 1)
+        h = _gear_hashes(view[start - overlap:start + SCAN_BLOCK])[overlap:]
+        found = np.flatnonzero((h & easy_mask) == 0)
+        easy.append(found + (start + 1))
+        hard.append(found[(h[found] & hard_mask) == 0] + (start + 1))
+    empty = np.empty(0, dtype=np.intp)
+    return np.concatenate([empty, *hard]), np.concatenate([empty, *easy])
+
+
+def cut_points(data: bytes, min_size: int, avg_size: int, max_size: int) -> list[int]:
+    """
+    Końce kawałków (offsety w data), które da się już wyznaczyć - data zaczyna się na granicy kawałka.
+    Granica wypada za bajtem, na którym starsze bity gear hasha są zerami (FastCDC z normalizacją:
+    przed avg_size maska trudniejsza, za nim łatwiejsza), najpóźniej po max_size bajtach.
+    Funkcja modułu bez stanu - można ją liczyć w puli procesów.
+    """
+    bits = max((avg_size - min_size).bit_length() - 1, 2)
+    hard, easy = _candidates(data, _top_bits_mask(bits + 1), _top_bits_mask(bits - 1))
+
+    cuts, start, size = [], 0, len(data)
+    while True:
+        i = np.searchsorted(hard, start + min_size)
+        if i < len(hard) and hard[i] < start + avg_size:
+            cut = int(hard[i])
+        elif size < start + avg_size:
+            break
+        else:
+            i = np.searchsorted(easy, start + avg_size)
+            if i < len(easy) and easy[i] < start + max_size:
+                cut = int(easy[i])
+            elif size < start + max_size:
+                break
+            else:
+                cut = start + max_size
+        cuts.append(cut)
+        start = cut
+    return cuts
+
+
+class ContentDefinedChunker:
+    """
+    Strumieniowy podział na kawałki wyznaczane treścią (FastCDC, gear hash liczony wektorowo w numpy).
+    Wstawienie lub zmiana kilku bajtów przesuwa tylko sąsiednie granice, więc reszta kawałków nowej wersji
+    pliku ma te same hashe co w poprzedniej. Kawałki mają od min_size do max_size bajtów (średnio około avg_size).
+    """
+
+    def __init__(self, min_size: int, avg_size: int, max_size: int):
+        if not WINDOW <= min_size <= avg_size <= max_size:
+            raise ValueError(f"Expected {WINDOW} <= min_size <= avg_size <= max_size")
+        self.min_size = min_size
+        self.avg_size = avg_size
+        self.max_size = max_size
+        self._buffer = bytearray()
+
+    def _split(self, cuts: list[int]) -> list[bytes]:
+        chunks = [bytes(self._buffer[start:end]) for start, end in zip([0, *cuts], cuts)]
+        if cuts:
+            del self._buffer[:cuts[-1]]
+        return chunks
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """Dokłada bajty i zwraca kawałki, których granice są już znane."""
+        self._buffer += data
+        return self._split(cut_points(self._buffer, self.min_size, self.avg_size, self.max_size))
+
+    async def feed_async(self, data: bytes) -> list[bytes]:
+        """Jak feed, ale granice większych buforów liczy pula procesów - pętla zdarzeń i pula hashowania są wolne."""
+        self._buffer += data
+        cuts = await run_in_process(cut_points, self._buffer, self.min_size, self.avg_size, self.max_size)
+        return self._split(cuts)
+
+    def flush(self) -> list[bytes]:
+        """Zwraca resztę bufora jako ostatni kawałek (koniec strumienia)."""
+        chunks = [bytes(self._buffer)] if self._buffer else []
+        self._buffer = bytearray()
+        return chunks
@@ -0,0 +1,20 @@
+import base64
+import json
+
+
+def encode_cursor(position: dict) -> str:
+    """Nieprzezroczysty kursor stronicowania - base64url z JSON-a pozycji, bez dopełnienia '='."""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Odwrotność encode_cursor; ValueError, gdy kursor jest uszkodzony albo nie jest obiektem JSON."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(position, dict):
+        raise ValueError("Malformed cursor")
+    return position
@@ -0,0 +1,129 @@
+import asyncio
+import hashlib
+import struct
+from typing import AsyncGenerator, AsyncIterator, BinaryIO
+from src.common.utils.cdc_utils import ContentDefinedChunker
+
+# Format delty: MAGIC, potem operacje
+#   b"C" + >QI (offset, długość)  - skopiuj bajty z bazy
+#   b"I" + >I (długość) + dane    - wstaw bajty z delty
+MAGIC = b"FVD1"
+_COPY = struct.Struct(">QI")
+_INSERT = struct.Struct(">I")
+
+READ_SIZE = 1024 * 1024 # 1MB
+
+
+def _chunker() -> ContentDefinedChunker:
+    # Drobne kawałki - rozdzielczość delty; granice wyznaczane treścią, więc przesunięcia nie psują dopasowań
+    return ContentDefinedChunker(min_size=1024, avg_size=4096, max_size=32 * 1024)
+
+
+async def _chunks(stream: AsyncIterator[bytes]) -> AsyncGenerator[bytes, None]:
+    chunker = _chunker()
+    async for data in stream:
+        # Granice liczy pula procesów - kompaktacja w tle nie zabiera CPU pętli obsługującej requesty
+        for chunk in await chunker.feed_async(data):
+            yield chunk
+    for chunk in chunker.flush():
+        yield chunk
+
+
+def _digest(chunk: bytes) -> bytes:
+    return hashlib.blake2b(chunk, digest_size=16).digest()
+
+
+class DeltaTooLargeError(Exception):
+    """Delta wyszła większa niż dopuszczalny limit - lepiej trzymać wersję w całości."""
+
+
+async def encode_delta(base: AsyncIterator[bytes], target: AsyncIterator[bytes], out: BinaryIO, max_size: int) -> int:
+    """
+    Zapisuje do out deltę, która z bazy odtwarza target. Zwraca rozmiar delty.
+    Rzuca DeltaTooLargeError, gdy delta przekroczy max_size bajtów.
+    """
+    index: dict[bytes, tuple[int, int]] = {}
+    offset = 0
+    async for chunk in _chunks(base):
+        index.setdefault(_digest(chunk), (offset, len(chunk)))
+        offset += len(chunk)
+
+    written = 0
+    copy_offset = copy_length = 0
+    pending_insert = bytearray()
+    # Operacje zbieramy w pamięci i zapisujemy do out w wątku, po READ_SIZE naraz
+    pending_out = bytearray()
+
+    def emit(data: bytes) -> None:
+        nonlocal written
+        written += len(data)
+        if written > max_size:
+            raise DeltaTooLargeError()
+        pending_out.extend(data)
+
+    async def write_out() -> None:
+        if pending_out:
+            await asyncio.to_thread(out.write, bytes(pending_out))
+            pending_out.clear()
+
+    def flush_copy() -> None:
+        nonlocal copy_length
+        if copy_length:
+            emit(b"C" + _COPY.pack(copy_offset, copy_length))
+            copy_length = 0
+
+    def flush_insert() -> None:
+        if pending_insert:
+            emit(b"I" + _INSERT.pack(len(pending_insert)) + pending_insert)
+            pending_insert.clear()
+
+    emit(MAGIC)
+    async for chunk in _chunks(target):
+        match = index.get(_digest(chunk))
+        if len(pending_out) >= READ_SIZE:
+            await write_out()
+        if match is None:
+            flush_copy()
+            pending_insert += chunk
+            continue
+        flush_insert()
+        # Sąsiednie dopasowania sklejamy w jedną operację kopiowania
+        if copy_length and copy_offset + copy_length == match[0]:
+            copy_length += match[1]
+        else:
+            flush_copy()
+            copy_offset, copy_length = match
+    flush_copy()
+    flush_insert()
+    await write_out()
+    return written
+
+
+async def apply_delta(base: BinaryIO, delta) -> AsyncGenerator[bytes, None]:
+    """
+    Odtwarza treść z bazy (plik z seek) i delty (obiekt z async read(size)) jako strumień bajtów.
+    Baza bywa tymczasowym plikiem na dysku - seek i read idą do wątku.
+    """
+    if await delta.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a version delta")
+
+    while op := await delta.read(1):
+        if op == b"C":
+            offset, length = _COPY.unpack(await delta.read(_COPY.size))
+            await asyncio.to_thread(base.seek, offset)
+            while length:
+                data = await asyncio.to_thread(base.read, min(length, READ_SIZE))
+                if not data:
+                    raise ValueError("Delta copies past the end of its base")
+                length -= len(data)
+                yield data
+        elif op == b"I":
+            (length,) = _INSERT.unpack(await delta.read(_INSERT.size))
+            while length:
+                data = await delta.read(min(length, READ_SIZE))
+                if not data:
+                    raise ValueError("Truncated delta")
+                length -= len(data)
+                yield data
+        else:
+            raise ValueError(f"Unknown delta operation {op!r}")
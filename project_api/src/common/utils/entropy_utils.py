@@ -0,0 +1,10 @@
+import math
+from collections import Counter
+
+
+def shannon_entropy(sample: bytes) -> float:
+    """Entropia w bitach na bajt (0 - stała treść, 8 - szum / dane już skompresowane)."""
+    if not sample:
+        return 0.0
+    total = len(sample)
+    return -sum(n / total * math.log2(n / total) for n in Counter(sample).values())
@@ -0,0 +1,39 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from src.config.app_config import settings
+
+# Poniżej tego rozmiaru przeskok do wątku kosztuje więcej niż samo hashowanie
+INLINE_HASH_THRESHOLD = 64 * 1024
+
+_executor: ThreadPoolExecutor | None = None
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Wspólna, ograniczona pula wątków do hashowania (rozmiar z settings.hash_worker_threads)."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.hash_worker_threads, thread_name_prefix="sha256")
+    return _executor
+
+def shutdown_executor() -> None:
+    """Zamyka pulę przy wyłączaniu aplikacji; kolejne offload() utworzy nową."""
+    global _executor
+    if _executor is not None:
+        executor, _executor = _executor, None
+        executor.shutdown(wait=True)
+
+async def offload(func, chunk: bytes):
+    """
+    func(chunk) w tej samej puli co hashowanie - dla funkcji, które zwalniają GIL
+    na dużych buforach (hashlib, zlib). Małe bufory liczymy od razu w pętli.
+    """
+    if settings.hash_worker_threads <= 0 or len(chunk) < INLINE_HASH_THRESHOLD:
+        return func(chunk)
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), func, chunk)
+
+async def hash_update(hasher, chunk: bytes) -> None:
+    """
+    hasher.update(chunk) poza pętlą zdarzeń - hashlib zwalnia GIL dla dużych buforów,
+    więc inne requesty na tym workerze nie czekają na hashowanie uploadu.
+    hash_worker_threads = 0 wyłącza pulę i hashuje w pętli.
+    """
+    await offload(hasher.update, chunk)
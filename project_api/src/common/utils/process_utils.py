@@ -0,0 +1,37 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from src.config.app_config import settings
+
+# Poniżej tego rozmiaru przesłanie danych do procesu kosztuje więcej niż samo liczenie
+INLINE_PROCESS_THRESHOLD = 256 * 1024
+
+_pool: ProcessPoolExecutor | None = None
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Wspólna pula procesów do pracy CPU (rozmiar z settings.cpu_worker_processes), osobna od puli hashowania."""
+    global _pool
+    if _pool is None:
+        # spawn, nie fork - fork procesu z wątkami i otwartymi połączeniami potrafi się zakleszczyć
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.cpu_worker_processes,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+def shutdown_pool() -> None:
+    """Zamyka pulę przy wyłączaniu aplikacji; kolejne run_in_process() utworzy nową."""
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        pool.shutdown(wait=True)
+
+async def run_in_process(func, data: bytes, *args):
+    """
+    func(data, *args) w puli procesów - dla obliczeń, które trzymają GIL (pętle w Pythonie, małe operacje numpy)
+    i w wątku wstrzymywałyby pętlę zdarzeń. func musi być funkcją modułu (pickle), data - bytes.
+    Małe bufory i cpu_worker_processes = 0 - liczone od razu w pętli.
+    """
+    if settings.cpu_worker_processes <= 0 or len(data) < INLINE_PROCESS_THRESHOLD:
+        return func(data, *args)
+    return await asyncio.get_running_loop().run_in_executor(_get_pool(), func, bytes(data), *args)
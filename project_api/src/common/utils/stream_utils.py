@@ -0,0 +1,23 @@
+import io
+from typing import AsyncGenerator, AsyncIterator
+
+
+class AsyncBytesIO(io.BytesIO):
+    """
+    Adapter, który sprawia, że zwykłe BytesIO ma asynchroniczną metodę read.
+    Dzięki temu LocalBlobStorage (który oczekuje await) nie zgłupieje.
+    """
+    async def read(self, size=-1):
+        return super().read(size)
+
+
+async def slice_stream(stream: AsyncIterator[bytes], start: int, end: int) -> AsyncGenerator[bytes, None]:
+    """Bajty start..end (włącznie) ze strumienia, który da się czytać tylko od początku."""
+    position = 0
+    async for data in stream:
+        data_start, position = position, position + len(data)
+        if position <= start:
+            continue
+        yield data[max(start - data_start, 0):end - data_start + 1]
+        if position > end:
+            break
@@ -0,0 +1,137 @@
+import zipfile
+from datetime import datetime
+from typing import AsyncGenerator, AsyncIterator, Callable, Iterable, Optional
+from posixpath import dirname
+from src.common.utils.entropy_utils import shannon_entropy
+from src.common.utils.hash_utils import offload
+
+# Tyle pierwszych bajtów pliku wystarcza, żeby odróżnić tekst od zip/jpeg/mp4
+PROBE_SIZE = 64 * 1024
+# ZIP nie zapisze daty sprzed 1980
+MIN_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+class ZipEntry:
+    """Pozycja archiwum: katalog (open_stream = None) albo plik czytany strumieniowo dopiero przy zapisie."""
+
+    def __init__(
+        self,
+        path: str,
+        modified: datetime,
+        size_bytes: int = 0,
+        open_stream: Optional[Callable[[], AsyncIterator[bytes]]] = None,
+    ):
+        self.path = path
+        self.modified = modified
+        self.size_bytes = size_bytes
+        self.open_stream = open_stream
+
+    @property
+    def is_dir(self) -> bool:
+        return self.open_stream is None
+
+
+class _Sink:
+    """Wyjście ZipFile bez seek - bajty czekają tu tylko do najbliższego drain()."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _zip_info(entry: ZipEntry, compress: bool) -> zipfile.ZipInfo:
+    modified = entry.modified.timetuple()[:6] if entry.modified else MIN_DATE_TIME
+    info = zipfile.ZipInfo(entry.path + "/" if entry.is_dir else entry.path, date_time=max(modified, MIN_DATE_TIME))
+    info.external_attr = (0o40755 << 16) | 0x10 if entry.is_dir else 0o644 << 16
+    info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    # Znany rozmiar pozwala ZipFile samemu zdecydować o nagłówkach ZIP64 (pliki > 4 GB)
+    info.file_size = entry.size_bytes
+    return info
+
+
+async def stream_zip(entries: Iterable[ZipEntry], max_entropy: float = 7.5) -> AsyncGenerator[bytes, None]:
+    """
+    Archiwum ZIP składane w locie, bez plików tymczasowych i bez seek.
+    Rozmiary i CRC idą w deskryptorach danych za treścią, więc pierwszy plik wysyłamy,
+    zanim kolejne zostaną otwarte; w pamięci jest naraz najwyżej jeden kawałek strumienia.
+    Każdy plik jest deflate albo stored - zależnie od entropii początku treści.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, mode="w") as archive:
+        for entry in entries:
+            if entry.is_dir:
+                archive.writestr(_zip_info(entry, compress=False), b"")
+                if chunk := sink.drain():
+                    yield chunk
+                continue
+
+            stream = entry.open_stream()
+            try:
+                # Pierwszy niepusty kawałek decyduje o kompresji i od razu trafia do archiwum
+                data = await anext(stream, None)
+                while data == b"":
+                    data = await anext(stream, None)
+                info = _zip_info(entry, compress=shannon_entropy((data or b"")[:PROBE_SIZE]) <= max_entropy)
+                with archive.open(info, mode="w") as dest:
+                    while data is not None:
+                        # CRC i deflate zwalniają GIL - duże kawałki liczymy w puli wątków
+                        await offload(dest.write, data)
+                        if chunk := sink.drain():
+                            yield chunk
+                        data = await anext(stream, None)
+            finally:
+                await stream.aclose()
+            if chunk := sink.drain():
+                yield chunk
+    # Katalog centralny
+    yield sink.drain()
+
+
+def _skip_member(name: str) -> bool:
+    # Ścieżki absolutne i wyjścia poza archiwum (zip slip) oraz śmieci z macOS
+    return name.startswith("/") or ".." in name or "__MACOSX" in name or ".DS_Store" in name
+
+
+def plan_zip_import(members: Iterable[zipfile.ZipInfo]) -> tuple[list[str], list[tuple[str, str, zipfile.ZipInfo]]]:
+    """
+    Plan importu z samego katalogu centralnego, zanim ruszymy treść i bazę.
+    Zwraca ścieżki folderów (rodzic zawsze przed dzieckiem) i pliki jako (ścieżka folderu, nazwa, ZipInfo).
+    "" to folder-kontener archiwum; powtórzone wpisy liczą się raz.
+    """
+    folders: set[str] = set()
+    files: dict[str, tuple[str, str, zipfile.ZipInfo]] = {}
+    for member in members:
+        if _skip_member(member.filename):
+            continue
+        path = "/".join(part for part in member.filename.split("/") if part)
+        if not path:
+            continue
+        folder = path if member.is_dir() else dirname(path)
+        # Foldery pośrednie powstają także wtedy, gdy archiwum nie ma dla nich własnych wpisów
+        while folder and folder not in folders:
+            folders.add(folder)
+            folder = dirname(folder)
+        if not member.is_dir():
+            files.setdefault(path, (dirname(path), path.rsplit("/", 1)[-1], member))
+    return sorted(folders, key=lambda f: (f.count("/"), f)), [files[path] for path in sorted(files)]
+
+
+def with_parent_folders(folder_paths: Iterable[str]) -> set[str]:
+    """Ścieżki folderów razem ze wszystkimi folderami nad nimi (bez "" - folderu-kontenera archiwum)."""
+    closure: set[str] = set()
+    for folder in folder_paths:
+        while folder and folder not in closure:
+            closure.add(folder)
+            folder = dirname(folder)
+    return closure
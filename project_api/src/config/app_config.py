@@ -24,6 +24,13 @@ class Settings(BaseSettings):
     s3_region: str | None = None
     aws_access_key_id: str
     aws_secret_access_key: str
+    s3_endpoint_url: str | None = None  # np. MinIO / lokalny zamiennik S3
+    s3_multipart_part_size_mb: int = 8
+    s3_multipart_concurrency: int = 4
+    s3_max_pool_connections: int = 50  # pula keep-alive wspólnego klienta S3
+    # Pobieranie przez przekierowanie 302 na presigned GET zamiast przepuszczania bajtów przez API
+    s3_download_redirect: bool = False
+    s3_presigned_url_ttl_s: int = 300
 
     #cookies
     refresh_cookie_name: str = "refresh_token"
@@ -38,6 +45,61 @@ class Settings(BaseSettings):
     # Local storage path
     local_storage_path:str = "./local_storage_data"
     max_file_upload_size_mb: int = 500  # 500 MB
+    hash_worker_threads: int = 4  # pula wątków do SHA-256 uploadów; 0 = hashowanie w pętli zdarzeń
+    cpu_worker_processes: int = 2  # pula procesów do obliczeń trzymających GIL (granice CDC); 0 = w pętli zdarzeń
+
+    # Surowe bloby z dysku wysyła sam serwer (sendfile) - tylko gdy serwer ASGI obsługuje pathsend, inaczej generator
+    download_sendfile: bool = True
+
+    # Cache treści popularnych blobów w pamięci procesu (LRU + TinyLFU); 0 = wyłączony
+    blob_cache_mb: int = 0
+    blob_cache_max_object_kb: int = 4096
+
+    # Kompresja blobów w storage (zlib); treść o entropii powyżej progu zostaje surowa
+    blob_compression: bool = False
+    blob_compression_level: int = 6
+    blob_compression_max_entropy: float = 7.5  # bity na bajt w próbce z początku pliku
+
+    # Content-defined chunking: bloby jako manifest kawałków adresowanych treścią
+    blob_chunking: bool = False
+    cdc_min_chunk_kb: int = 256
+    cdc_avg_chunk_kb: int = 1024
+    cdc_max_chunk_kb: int = 4096
+    blob_gc_interval_hours: int = 24  # co ile sprzątać kawałki bez odwołań; 0 = bez sprzątania
+    blob_gc_min_age_hours: int = 24  # młodszych obiektów GC nie rusza (uploady w toku)
+
+    # Starsze wersje plików jako delty względem następnej wersji (kompaktacja w tle po uploadzie)
+    version_delta_compaction: bool = False
+    version_delta_min_size_kb: int = 64
+    version_delta_max_ratio: float = 0.5  # delta większa niż ten ułamek wersji - zostaje pełna kopia
+
+    # Admission control uploadów: bajty w locie na proces i na użytkownika (0 = bez limitu)
+    upload_admission_max_mb: int = 2048
+    upload_admission_max_user_mb: int = 1024
+    upload_admission_queue_timeout_s: float = 10.0  # tyle żądanie czeka w kolejce, zanim dostanie 503
+    upload_admission_retry_after_s: int = 5
+
+    # Batch uploads (POST /files/batch)
+    max_batch_upload_files: int = 5000
+    batch_upload_stage_concurrency: int = 8
+
+    # Import ZIP (POST /files/zip): tyle członków archiwum rozpakowujemy i hashujemy naraz
+    zip_import_workers: int = 4
+    # Import idzie w tle paczkami - każda paczka plików to jedna transakcja razem z zapisem postępu
+    zip_import_batch_entries: int = 1000
+    # Zadanie bez zapisu postępu ani heartbeatu przez tyle sekund uznajemy za porzucone - przejmuje je inny proces
+    zip_import_lease_s: int = 600
+
+    # Listing folderu (GET /files/): strony po kursorze; całość jednym żądaniem (all=true) tylko dla małych folderów
+    list_page_size: int = 200
+    list_max_page_size: int = 1000
+    list_unpaginated_max_items: int = 5000
+
+    # Resumable (chunked) uploads
+    upload_chunk_size_mb: int = 8
+    max_upload_chunk_size_mb: int = 64
+    min_upload_chunk_size_mb: int = 1  # mniejszy może być tylko ostatni kawałek (albo jedyny)
+    upload_session_ttl_hours: int = 24  # porzucone sesje i ich kawałki usuwane po tym czasie; 0 = nigdy
 
     # Rate limiting
     STANDARD_RATE_LIMIT: str = "2000/minute" # Adjusted for local testing change in dev
@@ -0,0 +1,95 @@
+from src.application.auth_service import AuthService
+from src.application.file_service import FileService
+from src.application.logbook_service import LogbookService
+from src.application.refresh_token_service import RefreshTokenService
+from src.application.session_service import SessionService
+from src.application.abstraction.IFileStorage import IBlobStorage
+from src.common.utils.hash_utils import shutdown_executor
+from src.common.utils.process_utils import shutdown_pool
+from src.config.app_config import Settings
+from src.infrastructure.security.password import PasswordHasher
+from src.infrastructure.security.token_hasher import TokenHasher
+from src.infrastructure.storage.S3BlobStorage import S3BlobStorage
+from src.infrastructure.storage.LocalBlobStorage import LocalBlobStorage
+from src.infrastructure.storage.ChunkedBlobStorage import ChunkedBlobStorage
+from src.infrastructure.storage.CompressedBlobStorage import CompressedBlobStorage
+from src.infrastructure.storage.CachedBlobStorage import BlobCache, CachedBlobStorage
+
+
+class AppContainer:
+    """
+    Współdzielone instancje storage i usług - budowane raz na proces zamiast w każdym żądaniu.
+    Usługi są bezstanowe (stan żądania niesie UoW), więc jedna instancja obsługuje wszystkie żądania.
+    Lifespan aplikacji woła startup()/shutdown(); poza nim (testy na ASGITransport, skrypty)
+    kontener buduje się przy pierwszym użyciu, a zasoby asynchroniczne zostają w trybie per wywołanie.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._built = False
+
+    def build(self) -> "AppContainer":
+        if self._built:
+            return self
+        settings = self.settings
+        self.password_hasher = PasswordHasher()
+        self.token_hasher = TokenHasher(settings.token_pepper)
+        self.logsvc = LogbookService()
+        self.session_svc = SessionService()
+        self.refresh_token_svc = RefreshTokenService(hasher=self.token_hasher)
+        self.auth_service = AuthService(
+            self.password_hasher, self.logsvc, self.refresh_token_svc, self.session_svc, self.token_hasher
+        )
+        # Jeden cache na proces - wspólny dla wszystkich żądań
+        self.blob_cache = BlobCache(
+            max_bytes=settings.blob_cache_mb * 1024 * 1024,
+            max_object_bytes=settings.blob_cache_max_object_kb * 1024,
+        )
+        self.s3_storage = S3BlobStorage(
+            bucket=settings.s3_bucket,
+            region=settings.s3_region,
+            aws_access_key_id=settings.aws_access_key_id,
+            aws_secret_access_key=settings.aws_secret_access_key,
+            endpoint_url=settings.s3_endpoint_url,
+            part_size=settings.s3_multipart_part_size_mb * 1024 * 1024,
+            max_concurrency=settings.s3_multipart_concurrency,
+            max_pool_connections=settings.s3_max_pool_connections,
+        ) if settings.storage_type == "s3" else None
+        self.storage = self._build_storage()
+        self.file_service = FileService(self.logsvc, self.storage)
+        self._built = True
+        return self
+
+    def _build_storage(self) -> IBlobStorage:
+        settings = self.settings
+        storage = self.s3_storage or LocalBlobStorage(base_path=settings.local_storage_path)
+        if settings.blob_compression:
+            # Pod chunkingiem - kompresujemy pojedyncze kawałki, a nie strumień przed podziałem
+            storage = CompressedBlobStorage(
+                storage,
+                level=settings.blob_compression_level,
+                max_entropy=settings.blob_compression_max_entropy,
+            )
+        if settings.blob_chunking:
+            storage = ChunkedBlobStorage(
+                storage,
+                min_chunk_size=settings.cdc_min_chunk_kb * 1024,
+                avg_chunk_size=settings.cdc_avg_chunk_kb * 1024,
+                max_chunk_size=settings.cdc_max_chunk_kb * 1024,
+            )
+        if settings.blob_cache_mb > 0:
+            # Na samej górze - w cache ląduje treść już rozpakowana i złożona z kawałków
+            storage = CachedBlobStorage(storage, self.blob_cache)
+        return storage
+
+    async def startup(self) -> None:
+        self.build()
+        if self.s3_storage is not None:
+            # Klient S3 żyje tyle, co proces - połączenia keep-alive są współdzielone między żądaniami
+            await self.s3_storage.open()
+
+    async def shutdown(self) -> None:
+        if self._built and self.s3_storage is not None:
+            await self.s3_storage.close()
+        shutdown_executor()
+        shutdown_pool()
@@ -9,51 +9,48 @@ from src.infrastructure.security.password import PasswordHasher
 from src.application.auth_service import AuthService
 from src.application.logbook_service import LogbookService
 from src.application.file_service import FileService
+from src.application.abstraction.IFileStorage import IBlobStorage
 from src.config.app_config import settings
-from src.infrastructure.storage.S3BlobStorage import S3BlobStorage
-from src.infrastructure.storage.LocalBlobStorage import LocalBlobStorage
+from src.container import AppContainer
+from src.infrastructure.storage.CachedBlobStorage import BlobCache
+
+# Storage i usługi są współdzielone przez proces - startup/shutdown woła lifespan aplikacji.
+# Testy podmieniają pojedyncze zależności przez app.dependency_overrides, jak dotąd.
+container = AppContainer(settings)
 
 
 async def get_uow():
     return SqlAlchemyUoW(async_session_maker)
 
-def get_hasher():
-    return PasswordHasher()
+def get_hasher() -> PasswordHasher:
+    return container.build().password_hasher
+
+def get_logsvc() -> LogbookService:
+    return container.build().logsvc
 
-def get_logsvc():
-    return LogbookService()
+def get_token_hasher() -> TokenHasher:
+    return container.build().token_hasher
 
-def get_token_hasher():
-    return TokenHasher(settings.token_pepper)
 
+def get_refresh_token_svc() -> RefreshTokenService:
+    return container.build().refresh_token_svc
 
-def get_refresh_token_svc(hasher: TokenHasher = Depends(get_token_hasher)):
-    return RefreshTokenService(
-        hasher=hasher
-    )
 
+def get_session_svc() -> SessionService:
+    return container.build().session_svc
 
-def get_session_svc():
-    return SessionService()
+def get_auth_service() -> AuthService:
+    return container.build().auth_service
 
-def get_auth_service(
-    hasher: PasswordHasher = Depends(get_hasher),
-    logsvc: LogbookService = Depends(get_logsvc),
-    refresh_token_svc: RefreshTokenService = Depends(get_refresh_token_svc),
-    session_svc: SessionService = Depends(get_session_svc),
-    token_hasher: TokenHasher = Depends(get_token_hasher)
-):
-    return AuthService(hasher, logsvc, refresh_token_svc, session_svc, token_hasher)
+def get_storage() -> IBlobStorage:
+    return container.build().storage
 
-def get_storage():
-    if settings.storage_type == "s3":
-        return S3BlobStorage(
-            bucket=settings.s3_bucket,
-            region=settings.s3_region,
-            aws_access_key_id=settings.aws_access_key_id,
-            aws_secret_access_key=settings.aws_secret_access_key,
-        )
-    return LocalBlobStorage()
+def get_blob_cache() -> BlobCache:
+    return container.build().blob_cache
 
-def get_filesvc(logsvc: LogbookService = Depends(get_logsvc), storage = Depends(get_storage)):
-    return FileService(logsvc, storage)
+def get_filesvc(storage: IBlobStorage = Depends(get_storage)) -> FileService:
+    services = container.build()
+    if storage is services.storage:
+        return services.file_service
+    # Podmieniony storage (override w testach) - usługa na czas żądania
+    return FileService(services.logsvc, storage)
@@ -4,7 +4,9 @@ from .file_version import FileVersion
 from .logbook import LogBook
 
 from .session import Session
+from .upload_session import UploadSession
 from .user import User
+from .zip_import_job import ZipImportJob
 
 __all__ = [
     "Blob",
@@ -12,5 +14,7 @@ __all__ = [
     "FileVersion",
     "LogBook",
     "Session",
+    "UploadSession",
     "User",
+    "ZipImportJob",
 ]
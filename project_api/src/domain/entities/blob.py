@@ -1,7 +1,7 @@
 from __future__ import annotations
 import uuid
 from typing import TYPE_CHECKING, List
-from sqlalchemy import BigInteger, Text, TIMESTAMP, text
+from sqlalchemy import BigInteger, ForeignKey, Index, String, Text, TIMESTAMP, text
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID, CHAR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -12,11 +12,23 @@ if TYPE_CHECKING:
 
 class Blob(Base):
     __tablename__ = "blobs"
+    __table_args__ = (
+        # Jeden wiersz na treść - deduplikacja szuka po hashu, a dwa równoległe uploady tej samej treści
+        # nie założą dwóch blobów
+        Index("uq_blobs_sha256", "sha256", unique=True),
+        Index(
+            "ix_blobs_delta_base_id", "delta_base_id",
+            postgresql_where=text("delta_base_id IS NOT NULL"), sqlite_where=text("delta_base_id IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    sha256: Mapped[str] = mapped_column(CHAR(64), nullable=False, unique=False)
+    sha256: Mapped[str] = mapped_column(CHAR(64), nullable=False)
     size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
     storage_path: Mapped[str] = mapped_column(Text, nullable=False)
+    codec: Mapped[str | None] = mapped_column(String(16), nullable=True)  # None = surowe bajty, np. "zlib"
+    # Ustawione = w storage leży tylko delta względem tego bloba (następnej wersji), a nie pełna treść
+    delta_base_id: Mapped[uuid.UUID | None] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("blobs.id", ondelete="RESTRICT"), nullable=True)
     created_at: Mapped[str] = mapped_column(TIMESTAMP(timezone=True), nullable=False, server_default=text("now()"))
 
     file_versions: Mapped[List["FileVersion"]] = relationship(back_populates="blob", cascade="all, delete-orphan")
@@ -1,7 +1,7 @@
 from __future__ import annotations
 import uuid
 from typing import TYPE_CHECKING, Optional, List
-from sqlalchemy import String, TIMESTAMP, text, ForeignKey
+from sqlalchemy import Index, String, TIMESTAMP, text, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.infrastructure.db.base import Base
@@ -12,7 +12,21 @@ if TYPE_CHECKING:
 
 class File(Base):
     __tablename__ = "files"
-    
+    __table_args__ = (
+        # Nazwy rodzeństwa są unikalne. W korzeniu parent_folder_id to NULL, a NULL-e w indeksie unikalnym
+        # się nie zderzają - korzeń pilnuje osobny indeks częściowy
+        Index("uq_files_owner_parent_name", "owner_id", "parent_folder_id", "name", unique=True),
+        Index(
+            "uq_files_owner_root_name", "owner_id", "name", unique=True,
+            postgresql_where=text("parent_folder_id IS NULL"), sqlite_where=text("parent_folder_id IS NULL"),
+        ),
+        # Porządek listingu (foldery najpierw, nazwa, id) prosto z indeksu - strona kursora czyta tylko limit wierszy
+        Index("ix_files_owner_parent_listing", "owner_id", "parent_folder_id", text("is_folder DESC"), "name", "id"),
+        # Klucze obce bez indeksu to skan tabeli przy każdym usunięciu rodzica albo wersji
+        Index("ix_files_parent_folder_id", "parent_folder_id"),
+        Index("ix_files_current_version_id", "current_version_id"),
+    )
+
     id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     owner_id: Mapped[Optional[uuid.UUID]] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     name: Mapped[str] = mapped_column(String(512), nullable=False)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 import uuid
 from typing import TYPE_CHECKING, Optional, List
-from sqlalchemy import Integer, TIMESTAMP, text, ForeignKey, UniqueConstraint
+from sqlalchemy import Index, Integer, TIMESTAMP, text, ForeignKey, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.infrastructure.db.base import Base
@@ -13,7 +13,10 @@ if TYPE_CHECKING:
 
 class FileVersion(Base):
     __tablename__ = "file_versions"
-    __table_args__ = (UniqueConstraint("file_id", "version_no", name="uq_file_versions_file_ver"),)
+    __table_args__ = (
+        UniqueConstraint("file_id", "version_no", name="uq_file_versions_file_ver"),
+        Index("ix_file_versions_blob_id", "blob_id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     file_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("files.id", ondelete="CASCADE"), nullable=False)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING, Optional
-from sqlalchemy import TIMESTAMP, text, ForeignKey, Enum as SAEnum
+from sqlalchemy import Index, TIMESTAMP, text, ForeignKey, Enum as SAEnum
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID, INET, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.infrastructure.db.base import Base
@@ -14,6 +14,14 @@ if TYPE_CHECKING:
     from src.domain.entities.file_version import FileVersion
 class LogBook(Base):
     __tablename__ = "logbook"
+    __table_args__ = (
+        # Historia użytkownika od najnowszych; file_id - żeby usunięcie pliku nie skanowało całego dziennika
+        Index("ix_logbook_user_occurred_at", "user_id", "occurred_at"),
+        Index(
+            "ix_logbook_file_id", "file_id",
+            postgresql_where=text("file_id IS NOT NULL"), sqlite_where=text("file_id IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     occurred_at: Mapped[str] = mapped_column(TIMESTAMP(timezone=True), nullable=False, server_default=text("now()"))
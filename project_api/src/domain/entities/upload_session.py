@@ -0,0 +1,40 @@
+from __future__ import annotations
+import uuid
+from typing import TYPE_CHECKING, Optional
+from sqlalchemy import BigInteger, Integer, String, TIMESTAMP, text, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from src.infrastructure.db.base import Base
+
+if TYPE_CHECKING:
+    from src.domain.entities.user import User
+
+class UploadSession(Base):
+    """
+    Wznawialny upload pliku w kawałkach. Same kawałki trzyma storage (IBlobStorage),
+    tu jest tylko to, czego potrzeba do utworzenia pliku przy commit.
+    """
+    __tablename__ = "upload_sessions"
+
+    id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    owner_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    file_name: Mapped[str] = mapped_column(String(512), nullable=False)
+    mime_type: Mapped[Optional[str]] = mapped_column(String(255))
+    parent_folder_id: Mapped[Optional[uuid.UUID]] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("files.id", ondelete="CASCADE"), nullable=True)
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    chunk_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[str] = mapped_column(TIMESTAMP(timezone=True), nullable=False, server_default=text("now()"))
+
+    owner: Mapped["User"] = relationship()
+
+    @property
+    def chunk_count(self) -> int:
+        return -(-self.size_bytes // self.chunk_size)
+
+    def expected_chunk_size(self, chunk_no: int) -> int:
+        if chunk_no == self.chunk_count - 1:
+            return self.size_bytes - chunk_no * self.chunk_size
+        return self.chunk_size
+
+    def __repr__(self) -> str:
+        return f"UploadSession(id={self.id}, owner_id={self.owner_id}, file_name={self.file_name}, size_bytes={self.size_bytes})"
@@ -0,0 +1,46 @@
+from __future__ import annotations
+import uuid
+from typing import TYPE_CHECKING, Optional
+from sqlalchemy import BigInteger, Integer, String, Text, TIMESTAMP, text, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, JSONB
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from src.infrastructure.db.base import Base
+
+if TYPE_CHECKING:
+    from src.domain.entities.user import User
+
+class ZipImportJob(Base):
+    """
+    Zadanie importu archiwum ZIP w tle. Samo archiwum trzyma storage (save_import_archive, osobno od kawałków uploadu),
+    tu jest postęp zatwierdzany razem z każdą paczką plików - po restarcie import rusza od ostatniej paczki.
+    worker_token wskazuje pracownika, który aktualnie prowadzi zadanie; zapis postępu z innym tokenem nie przechodzi.
+    updated_at to jego heartbeat - zadanie bez zapisu dłużej niż zip_import_lease_s może przejąć inny proces.
+    """
+    __tablename__ = "zip_import_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    owner_id: Mapped[uuid.UUID] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    parent_folder_id: Mapped[Optional[uuid.UUID]] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("files.id", ondelete="CASCADE"), nullable=True)
+    root_folder_id: Mapped[Optional[uuid.UUID]] = mapped_column(PG_UUID(as_uuid=True), ForeignKey("files.id", ondelete="SET NULL"), nullable=True)
+    archive_name: Mapped[str] = mapped_column(String(512), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="queued", index=True)
+    worker_token: Mapped[Optional[uuid.UUID]] = mapped_column(PG_UUID(as_uuid=True), nullable=True)
+    entries_total: Mapped[int] = mapped_column(Integer, nullable=False)
+    entries_processed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    bytes_written: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    dedup_hits: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    errors: Mapped[list] = mapped_column(JSONB, nullable=False, default=list)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[str] = mapped_column(TIMESTAMP(timezone=True), nullable=False, server_default=text("now()"))
+    updated_at: Mapped[str] = mapped_column(TIMESTAMP(timezone=True), nullable=False, server_default=text("now()"))
+    finished_at: Mapped[Optional[str]] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+
+    owner: Mapped["User"] = relationship()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def __repr__(self) -> str:
+        return f"ZipImportJob(id={self.id}, owner_id={self.owner_id}, status={self.status}, entries_processed={self.entries_processed}/{self.entries_total})"
@@ -1,6 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.domain.entities.blob import Blob
+from src.domain.entities.file import File
+from src.domain.entities.file_version import FileVersion
 from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from uuid import UUID
+from src.infrastructure.repositories.file_repo import IN_CLAUSE_CHUNK
 
 
 class BlobRepo:
@@ -11,6 +18,65 @@ class BlobRepo:
         stmnt = select(Blob).where(Blob.sha256 == sha256_hash)
         result = await self.session.execute(stmnt)
         return result.scalar_one_or_none()
+
+    async def get_by_hash_for_owner(self, sha256_hash: str, owner_id: UUID) -> Blob | None:
+        """Blob o danym hashu, ale tylko jeśli wskazuje na niego jakaś wersja pliku należącego do właściciela."""
+        stmnt = (
+            select(Blob)
+            .join(FileVersion, FileVersion.blob_id == Blob.id)
+            .join(File, File.id == FileVersion.file_id)
+            .where(Blob.sha256 == sha256_hash, File.owner_id == owner_id)
+            .limit(1)
+        )
+        result = await self.session.execute(stmnt)
+        return result.scalars().first()
+
+    async def get_by_id(self, blob_id: UUID) -> Blob | None:
+        return await self.session.get(Blob, blob_id)
+
+    async def is_current_anywhere(self, blob_id: UUID) -> bool:
+        """Czy blob jest bieżącą wersją jakiegokolwiek pliku (takich nie zamieniamy na deltę)."""
+        stmnt = (
+            select(File.id)
+            .join(FileVersion, FileVersion.id == File.current_version_id)
+            .where(FileVersion.blob_id == blob_id)
+            .limit(1)
+        )
+        result = await self.session.execute(stmnt)
+        return result.first() is not None
+
+    async def list_content_hashes(self) -> list[tuple[str, str | None]]:
+        """(sha256, sha256 bazy delty albo None) każdego bloba - z tego wynikają klucze treści w storage."""
+        base = aliased(Blob)
+        stmnt = select(Blob.sha256, base.sha256).outerjoin(base, base.id == Blob.delta_base_id)
+        result = await self.session.execute(stmnt)
+        return [tuple(row) for row in result.all()]
+
     async def add(self, blob: Blob) -> None:
         self.session.add(blob)
-        return None
\ No newline at end of file
+        return None
+
+    async def get_by_hashes(self, sha256_hashes: list[str]) -> dict[str, Blob]:
+        blobs = {}
+        # Paczkami - import archiwum potrafi zapytać o dziesiątki tysięcy hashy naraz
+        for i in range(0, len(sha256_hashes), IN_CLAUSE_CHUNK):
+            stmnt = select(Blob).where(Blob.sha256.in_(sha256_hashes[i:i + IN_CLAUSE_CHUNK]))
+            result = await self.session.execute(stmnt)
+            blobs.update((blob.sha256, blob) for blob in result.scalars().all())
+        return blobs
+
+    async def add_many(self, rows: list[dict]) -> dict[str, UUID]:
+        """
+        Jeden wielowierszowy INSERT zamiast session.add per blob. Hash, który w międzyczasie zapisał ktoś inny,
+        jest pomijany (ON CONFLICT DO NOTHING na sha256) - zwraca sha256 -> id bloba, który faktycznie jest w bazie.
+        """
+        if not rows:
+            return {}
+        insert = pg_insert if self.session.get_bind().dialect.name == "postgresql" else sqlite_insert
+        await self.session.execute(insert(Blob).on_conflict_do_nothing(index_elements=["sha256"]), rows)
+        hashes = [row["sha256"] for row in rows]
+        ids = {}
+        for i in range(0, len(hashes), IN_CLAUSE_CHUNK):
+            stmnt = select(Blob.sha256, Blob.id).where(Blob.sha256.in_(hashes[i:i + IN_CLAUSE_CHUNK]))
+            ids.update((row.sha256, row.id) for row in (await self.session.execute(stmnt)).all())
+        return ids
@@ -1,4 +1,4 @@
-from sqlalchemy import select, desc, asc, update
+from sqlalchemy import select, desc, asc, update, insert, literal, tuple_, or_, and_
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -6,6 +6,12 @@ from src.domain.entities.file import File
 from typing import Optional, Sequence
 from uuid import UUID
 from src.domain.entities.file_version import FileVersion
+from src.domain.entities.blob import Blob
+
+# Tyle wartości naraz w IN (...) - daleko od limitów parametrów Postgresa i SQLite
+IN_CLAUSE_CHUNK = 1000
+# Bezpiecznik rekurencji po rodzicach - zapętlony łańcuch parent_folder_id nie zawiesi zapytania
+MAX_FOLDER_DEPTH = 1000
 
 class FileRepo:
     def __init__(self, session: AsyncSession):
@@ -43,6 +49,37 @@ class FileRepo:
         return result.scalars().all()
     
 
+    async def list_page(
+        self,
+        owner_id: UUID,
+        folder_id: Optional[UUID],
+        limit: int,
+        after: Optional[tuple[bool, str, UUID]] = None,
+    ) -> list:
+        """
+        Strona zawartości folderu w stałym porządku (foldery najpierw, potem nazwa, potem id) - stronicowanie
+        po kluczu: następna strona zaczyna się za ostatnim wierszem poprzedniej, bez OFFSET-u.
+        Jedno zapytanie z rozmiarem bieżącej wersji; wiersze: (id, name, is_folder, mime_type, size_bytes).
+        """
+        stmnt = (
+            select(File.id, File.name, File.is_folder, File.mime_type, Blob.size_bytes)
+            .outerjoin(FileVersion, FileVersion.id == File.current_version_id)
+            .outerjoin(Blob, Blob.id == FileVersion.blob_id)
+            .where(File.owner_id == owner_id, File.parent_folder_id == folder_id)
+            .order_by(desc(File.is_folder), asc(File.name), asc(File.id))
+            .limit(limit)
+        )
+        if after is not None:
+            is_folder, name, file_id = after
+            later = tuple_(File.name, File.id) > tuple_(literal(name), literal(file_id, File.id.type))
+            if is_folder:
+                # Po folderach idą jeszcze wszystkie pliki
+                stmnt = stmnt.where(or_(File.is_folder.is_(False), and_(File.is_folder.is_(True), later)))
+            else:
+                stmnt = stmnt.where(File.is_folder.is_(False), later)
+        result = await self.session.execute(stmnt)
+        return result.all()
+
     async def get_folder_content(self, user_id:str, folder_id: Optional[UUID]) -> Sequence[File]:
         stmnt = (
             select(File)
@@ -108,4 +145,96 @@ class FileRepo:
             
         )
         result = await self.session.execute(stmnt)
-        return None
\ No newline at end of file
+        return None
+
+    async def get_by_names_in_folder(self, owner_id: UUID, names: list[str], parent_id: Optional[UUID]) -> list[File]:
+        if not names:
+            return []
+        stmnt = (
+            select(File)
+            .options(selectinload(File.current_version))
+            .where(File.owner_id == owner_id, File.name.in_(names), File.parent_folder_id == parent_id)
+        )
+        result = await self.session.execute(stmnt)
+        return result.scalars().all()
+
+    async def get_children(self, owner_id: UUID, parent_ids: list[UUID]) -> list:
+        """
+        Zawartość wielu folderów naraz, bez ładowania encji.
+        Wiersze: (id, parent_folder_id, name, is_folder, version_no bieżącej wersji | None).
+        """
+        rows = []
+        for i in range(0, len(parent_ids), IN_CLAUSE_CHUNK):
+            stmnt = (
+                select(File.id, File.parent_folder_id, File.name, File.is_folder, FileVersion.version_no)
+                .outerjoin(FileVersion, FileVersion.id == File.current_version_id)
+                .where(File.owner_id == owner_id, File.parent_folder_id.in_(parent_ids[i:i + IN_CLAUSE_CHUNK]))
+            )
+            rows += (await self.session.execute(stmnt)).all()
+        return rows
+
+    async def add_many(self, rows: list[dict]) -> None:
+        if rows:
+            await self.session.execute(insert(File), rows)
+        return None
+
+    async def update_many(self, rows: list[dict]) -> None:
+        """Bulk UPDATE po kluczu głównym - każdy słownik musi zawierać "id"."""
+        if rows:
+            await self.session.execute(update(File), rows)
+        return None
+
+    async def get_ancestors(self, owner_id: UUID, folder_id: UUID) -> list:
+        """
+        Folder i wszystkie foldery nad nim jednym zapytaniem (rekurencyjne CTE w górę po parent_folder_id),
+        bez wersji i blobów. Wiersze: (id, name, parent_folder_id) od korzenia do folderu;
+        pusta lista, gdy folderu nie ma, nie należy do użytkownika albo nie jest folderem.
+        """
+        chain = (
+            select(File.id, File.name, File.parent_folder_id, literal(0).label("depth"))
+            .where(File.id == folder_id, File.owner_id == owner_id, File.is_folder.is_(True))
+            .cte("ancestors", recursive=True)
+        )
+        chain = chain.union_all(
+            select(File.id, File.name, File.parent_folder_id, (chain.c.depth + 1).label("depth"))
+            .join(chain, File.id == chain.c.parent_folder_id)
+            .where(File.owner_id == owner_id, chain.c.depth < MAX_FOLDER_DEPTH)
+        )
+        stmnt = select(chain.c.id, chain.c.name, chain.c.parent_folder_id).order_by(desc(chain.c.depth))
+        result = await self.session.execute(stmnt)
+        return result.all()
+
+    async def get_subtree(self, owner_id: UUID, folder_id: UUID) -> list:
+        """
+        Folder i wszystko pod nim jednym zapytaniem (rekurencyjne CTE), razem z bieżącą wersją i blobem.
+        Wiersze: (id, parent_folder_id, name, is_folder, created_at, uploaded_at, Blob | None); folder startowy jako pierwszy.
+        """
+        tree = (
+            select(
+                File.id, File.parent_folder_id, File.name, File.is_folder, File.created_at, File.current_version_id,
+                literal(0).label("depth"),
+            )
+            .where(File.id == folder_id, File.owner_id == owner_id)
+            .cte("subtree", recursive=True)
+        )
+        # Limit głębokości jak w get_ancestors - cykl w parent_folder_id nie zapętli zapytania
+        tree = tree.union_all(
+            select(
+                File.id, File.parent_folder_id, File.name, File.is_folder, File.created_at, File.current_version_id,
+                (tree.c.depth + 1).label("depth"),
+            )
+            .join(tree, File.parent_folder_id == tree.c.id)
+            .where(File.owner_id == owner_id, tree.c.depth < MAX_FOLDER_DEPTH)
+        )
+        stmnt = (
+            select(
+                tree.c.id, tree.c.parent_folder_id, tree.c.name, tree.c.is_folder, tree.c.created_at,
+                FileVersion.uploaded_at, Blob,
+            )
+            .outerjoin(FileVersion, FileVersion.id == tree.c.current_version_id)
+            .outerjoin(Blob, Blob.id == FileVersion.blob_id)
+        )
+        result = await self.session.execute(stmnt)
+        rows = result.all()
+        rows.sort(key=lambda row: row.id != folder_id)
+        return rows
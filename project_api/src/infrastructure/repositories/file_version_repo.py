@@ -1,4 +1,4 @@
-from sqlalchemy import select
+from sqlalchemy import select, insert
 from src.domain.entities.file_version import FileVersion
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
@@ -31,4 +31,8 @@ class FileVersionRepo:
         result = await self.session.execute(stmt)
         file_version = result.scalar_one_or_none()
         return file_version.version_no if file_version else None
-    
\ No newline at end of file
+
+    async def add_many(self, rows: list[dict]) -> None:
+        if rows:
+            await self.session.execute(insert(FileVersion), rows)
+        return None
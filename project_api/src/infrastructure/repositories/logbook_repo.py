@@ -1,3 +1,4 @@
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.domain.entities.logbook import LogBook
 
@@ -7,3 +8,7 @@ class LogbookRepo:
 
     async def add(self, log: LogBook) -> None:
         self.session.add(log)
+
+    async def add_many(self, rows: list[dict]) -> None:
+        if rows:
+            await self.session.execute(insert(LogBook), rows)
@@ -0,0 +1,32 @@
+from datetime import datetime
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.domain.entities.upload_session import UploadSession
+from typing import Optional
+from uuid import UUID
+
+
+class UploadSessionRepo:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add(self, upload_session: UploadSession) -> None:
+        self.session.add(upload_session)
+        return None
+
+    async def get_by_id(self, upload_id: UUID) -> Optional[UploadSession]:
+        stmt = select(UploadSession).where(UploadSession.id == upload_id)
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def list_created_before(self, cutoff: datetime) -> list[UUID]:
+        """Sesje założone przed cutoff - porzucone, jeśli do tej pory nikt ich nie zatwierdził."""
+        stmt = select(UploadSession.id).where(UploadSession.created_at < cutoff)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def delete_by_id(self, upload_id: UUID) -> bool:
+        """Usuwa sesję jednym DELETE; False, gdy ktoś inny zdążył ją usunąć (commit albo abort)."""
+        stmt = delete(UploadSession).where(UploadSession.id == upload_id)
+        result = await self.session.execute(stmt)
+        return result.rowcount > 0
@@ -0,0 +1,60 @@
+from datetime import datetime
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.common.utils.time_utils import utcnow
+from src.domain.entities.zip_import_job import ZipImportJob
+from typing import Optional
+from uuid import UUID
+
+
+class ZipImportJobRepo:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add(self, job: ZipImportJob) -> None:
+        self.session.add(job)
+        return None
+
+    async def get_by_id(self, job_id: UUID) -> Optional[ZipImportJob]:
+        stmt = select(ZipImportJob).where(ZipImportJob.id == job_id)
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def list_stale(self, updated_before: datetime) -> list[tuple[UUID, Optional[UUID]]]:
+        """
+        (id, worker_token) niedokończonych zadań bez zapisu od updated_before - kandydaci do przejęcia.
+        Pracownik odświeża updated_at (postęp, heartbeat), więc zadanie żywego pracownika tu nie trafia.
+        """
+        stmt = (
+            select(ZipImportJob.id, ZipImportJob.worker_token)
+            .where(ZipImportJob.status.in_(("queued", "running")), ZipImportJob.updated_at < updated_before)
+            .order_by(ZipImportJob.created_at)
+        )
+        result = await self.session.execute(stmt)
+        return [(row.id, row.worker_token) for row in result.all()]
+
+    async def claim(self, job_id: UUID, expected_token: Optional[UUID], token: UUID) -> bool:
+        """
+        Przejmuje zadanie, jeśli nikt nie zrobił tego w międzyczasie (compare-and-set na worker_token).
+        Z dwóch pracowników, którzy zobaczyli ten sam token, przejmie je tylko jeden.
+        """
+        current = ZipImportJob.worker_token.is_(None) if expected_token is None else ZipImportJob.worker_token == expected_token
+        stmt = (
+            update(ZipImportJob)
+            .where(ZipImportJob.id == job_id, ZipImportJob.status.in_(("queued", "running")), current)
+            .values(worker_token=token, status="running", updated_at=utcnow())
+            .returning(ZipImportJob.id)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
+    async def update_owned(self, job_id: UUID, token: UUID, **values) -> bool:
+        """Zapis postępu albo wyniku - tylko przez pracownika, który trzyma zadanie. Zwraca, czy się udało."""
+        stmt = (
+            update(ZipImportJob)
+            .where(ZipImportJob.id == job_id, ZipImportJob.worker_token == token)
+            .values(updated_at=utcnow(), **values)
+            .returning(ZipImportJob.id)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none() is not None
@@ -0,0 +1,228 @@
+from collections import OrderedDict
+from typing import BinaryIO, AsyncGenerator, Optional
+from src.application.abstraction.IFileStorage import IBlobStorage
+
+# Licznik w szkicu mieści się w 4 bitach - wyżej niczego już nie rozróżniamy
+MAX_FREQUENCY = 15
+# Nieparzyste mnożniki 64-bit - każdy wiersz szkicu miesza hash klucza inaczej
+SKETCH_SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+SKETCH_DEPTH = len(SKETCH_SEEDS)
+MASK64 = (1 << 64) - 1
+
+
+class FrequencySketch:
+    """
+    Count-Min sketch częstości dostępów (TinyLFU): kilka bajtów na klucz zamiast słownika z historią.
+    Po sample_size zliczeniach wszystkie liczniki są połowione, więc dawna popularność wygasa.
+    """
+
+    def __init__(self, width: int):
+        self.width = 1 << max(width - 1, 1).bit_length()
+        self._table = bytearray(SKETCH_DEPTH * self.width)
+        self.sample_size = 10 * self.width
+        self._additions = 0
+
+    def _indexes(self, key: str):
+        h = hash(key) & MASK64
+        for row, seed in enumerate(SKETCH_SEEDS):
+            x = (h * seed) & MASK64
+            yield row * self.width + ((x ^ (x >> 32)) & (self.width - 1))
+
+    def increment(self, key: str) -> None:
+        for i in self._indexes(key):
+            if self._table[i] < MAX_FREQUENCY:
+                self._table[i] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._table = bytearray(count >> 1 for count in self._table)
+            self._additions //= 2
+
+    def estimate(self, key: str) -> int:
+        return min(self._table[i] for i in self._indexes(key))
+
+
+class BlobCache:
+    """
+    Cache treści blobów w pamięci z limitem bajtów: LRU z filtrem wstępu TinyLFU.
+    Nowy blob wypiera najdawniej używane tylko wtedy, gdy nie jest od nich rzadziej pobierany,
+    więc jednorazowy przegląd wielu plików nie wymiata popularnych.
+    Bez blokad - wszystkie operacje są synchroniczne i wykonują się w pętli zdarzeń.
+    """
+
+    def __init__(self, max_bytes: int, max_object_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_object_bytes = min(max_object_bytes, max_bytes)
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        # Szerokość szkicu szacowana na typowy mały blob (4 KB) - z zapasem dla kluczy spoza cache
+        self._sketch = FrequencySketch(max(max_bytes // 4096, 1024))
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        self._sketch.increment(key)
+        data = self._entries.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> bool:
+        """Wstawia treść, jeśli mieści się w limitach i wygrywa z ofiarami; zwraca, czy trafiła do cache."""
+        size = len(data)
+        if key in self._entries or size > self.max_object_bytes:
+            return False
+
+        victims, freed = [], 0
+        frequency = self._sketch.estimate(key)
+        for victim in self._entries:
+            if self.size_bytes - freed + size <= self.max_bytes:
+                break
+            if self._sketch.estimate(victim) > frequency:
+                self.rejections += 1
+                return False
+            victims.append(victim)
+            freed += len(self._entries[victim])
+
+        for victim in victims:
+            self.invalidate(victim)
+            self.evictions += 1
+        self._entries[key] = data
+        self.size_bytes += size
+        return True
+
+    def invalidate(self, key: str) -> None:
+        data = self._entries.pop(key, None)
+        if data is not None:
+            self.size_bytes -= len(data)
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "max_object_bytes": self.max_object_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "rejections": self.rejections,
+        }
+
+
+class CachedBlobStorage(IBlobStorage):
+    """
+    Dekorator IBlobStorage trzymający treść popularnych blobów w pamięci (BlobCache).
+    Blob pod danym SHA-256 nigdy się nie zmienia, więc wpis unieważnia dopiero delete.
+    Jedna instancja na proces, zbudowana przez AppContainer razem z całym stosem storage - wszystkie żądania
+    korzystają z niej i z jej BlobCache.
+    """
+
+    def __init__(self, inner: IBlobStorage, cache: BlobCache):
+        self.inner = inner
+        self.cache = cache
+
+    async def save(self, file_stream: BinaryIO, file_hash: str) -> str:
+        return await self.inner.save(file_stream, file_hash)
+
+    async def stage(self, file_stream: BinaryIO) -> str:
+        return await self.inner.stage(file_stream)
+
+    async def stored_bytes(self, staging_id: str) -> Optional[int]:
+        return await self.inner.stored_bytes(staging_id)
+
+    async def staged_codec(self, staging_id: str) -> Optional[str]:
+        return await self.inner.staged_codec(staging_id)
+
+    def codec_for(self, head: bytes) -> Optional[str]:
+        return self.inner.codec_for(head)
+
+    async def promote(self, staging_id: str, file_hash: str) -> str:
+        return await self.inner.promote(staging_id, file_hash)
+
+    async def discard(self, staging_id: str) -> None:
+        await self.inner.discard(staging_id)
+
+    async def write_chunk(self, upload_id: str, chunk_no: int, file_stream: BinaryIO) -> int:
+        return await self.inner.write_chunk(upload_id, chunk_no, file_stream)
+
+    async def list_chunks(self, upload_id: str) -> dict[int, int]:
+        return await self.inner.list_chunks(upload_id)
+
+    async def read_chunks(self, upload_id: str, chunk_count: int) -> AsyncGenerator[bytes, None]:
+        async for data in self.inner.read_chunks(upload_id, chunk_count):
+            yield data
+
+    async def delete_chunks(self, upload_id: str) -> None:
+        await self.inner.delete_chunks(upload_id)
+
+    async def save_import_archive(self, job_id: str, file_stream: BinaryIO) -> int:
+        return await self.inner.save_import_archive(job_id, file_stream)
+
+    async def read_import_archive(self, job_id: str) -> AsyncGenerator[bytes, None]:
+        async for data in self.inner.read_import_archive(job_id):
+            yield data
+
+    async def delete_import_archive(self, job_id: str) -> None:
+        await self.inner.delete_import_archive(job_id)
+
+    async def get(self, file_hash: str, codec: Optional[str] = None) -> AsyncGenerator[bytes, None]:
+        cached = self.cache.get(file_hash)
+        if cached is not None:
+            yield cached
+            return
+
+        # Zbieramy kopię, dopóki blob mieści się w limicie obiektu; przerwany odczyt nie trafia do cache
+        buffer: Optional[bytearray] = bytearray()
+        async for data in self.inner.get(file_hash, codec):
+            if buffer is not None:
+                if len(buffer) + len(data) > self.cache.max_object_bytes:
+                    buffer = None
+                else:
+                    buffer += data
+            yield data
+        if buffer is not None:
+            self.cache.put(file_hash, bytes(buffer))
+
+    async def get_range(self, file_hash: str, start: int, end: int, codec: Optional[str] = None) -> AsyncGenerator[bytes, None]:
+        # Zakresy nie zapełniają cache (to zwykle wznawianie dużych plików), ale korzystają z niego
+        cached = self.cache.get(file_hash)
+        if cached is not None:
+            yield cached[start:end + 1]
+            return
+        async for data in self.inner.get_range(file_hash, start, end, codec):
+            yield data
+
+    async def local_path(self, file_hash: str, codec: Optional[str] = None) -> Optional[str]:
+        return await self.inner.local_path(file_hash, codec)
+
+    async def presigned_url(
+        self, file_hash: str, filename: str, media_type: str, expires_in: int, codec: Optional[str] = None
+    ) -> Optional[str]:
+        return await self.inner.presigned_url(file_hash, filename, media_type, expires_in, codec)
+
+    async def list_blobs(self) -> AsyncGenerator[tuple[str, Optional[str], float], None]:
+        async for blob in self.inner.list_blobs():
+            yield blob
+
+    async def modified_at(self, file_hash: str, codec: Optional[str] = None) -> Optional[float]:
+        return await self.inner.modified_at(file_hash, codec)
+
+    async def touch(self, file_hash: str, codec: Optional[str] = None) -> None:
+        await self.inner.touch(file_hash, codec)
+
+    async def collect_garbage(self, live: set[str], min_age_s: float) -> int:
+        # Usuwane są tylko obiekty spoza live - pod takimi kluczami nikt nie czyta, więc cache nie trzyma nic żywego
+        return await self.inner.collect_garbage(live, min_age_s)
+
+    async def delete(self, file_hash: str) -> None:
+        self.cache.invalidate(file_hash)
+        await self.inner.delete(file_hash)
+
+    async def exists(self, file_hash: str, codec: Optional[str] = None) -> bool:
+        return await self.inner.exists(file_hash, codec)
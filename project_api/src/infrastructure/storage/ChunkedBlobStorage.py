@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import BinaryIO, AsyncGenerator, Optional
+from src.application.abstraction.IFileStorage import IBlobStorage
+from src.common.utils.stream_utils import AsyncBytesIO
+from src.common.utils.cdc_utils import ContentDefinedChunker
+from src.common.utils.hash_utils import hash_update
+
+class ChunkedBlobStorage(IBlobStorage):
+    """
+    Dekorator IBlobStorage z deduplikacją poniżej poziomu pliku.
+    Treść dzielona jest na kawałki wyznaczane treścią (CDC), każdy kawałek leży w storage
+    pod własnym SHA-256, a pod "<hash pliku>.manifest" - lista kawałków (hash, rozmiar, kodek) do złożenia przy odczycie.
+    Bloby zapisane wcześniej w całości (bez manifestu) czytają się jak dotąd.
+    delete usuwa tylko manifest - kawałki bez odwołań zwalnia dopiero collect_garbage (mark-and-sweep).
+    """
+    MANIFEST_SUFFIX = ".manifest"
+
+    def __init__(self, inner: IBlobStorage, min_chunk_size: int, avg_chunk_size: int, max_chunk_size: int):
+        self.inner = inner
+        self.min_chunk_size = min_chunk_size
+        self.avg_chunk_size = avg_chunk_size
+        self.max_chunk_size = max_chunk_size
+        # staging_id -> bajty faktycznie dopisane do storage (nowe kawałki + manifest)
+        self._stored_bytes: dict[str, int] = {}
+
+    def _manifest_key(self, file_hash: str) -> str:
+        return f"{file_hash}{self.MANIFEST_SUFFIX}"
+
+    async def _save_chunk(self, chunk: bytes) -> tuple[str, Optional[str], bool]:
+        hasher = hashlib.sha256()
+        await hash_update(hasher, chunk)
+        chunk_hash = hasher.hexdigest()
+        # Kodek zależy tylko od treści, więc save zapisze kawałek dokładnie pod tym, co sprawdzamy
+        codec = self.inner.codec_for(chunk)
+        if await self.inner.exists(chunk_hash, codec):
+            # Kawałek mógł zostać bez odwołań - świeży czas modyfikacji chroni go przed GC, zanim manifest trafi do bazy
+            await self.inner.touch(chunk_hash, codec)
+            return chunk_hash, codec, False
+        await self.inner.save(AsyncBytesIO(chunk), chunk_hash)
+        return chunk_hash, codec, True
+
+    async def save(self, file_stream: BinaryIO, file_hash: str) -> str:
+        staging_id = await self.stage(file_stream)
+        return await self.promote(staging_id, file_hash)
+
+    async def stage(self, file_stream: BinaryIO) -> str:
+        chunker = ContentDefinedChunker(self.min_chunk_size, self.avg_chunk_size, self.max_chunk_size)
+        entries: list[list] = []
+        stored_bytes = 0
+
+        async def store(chunks: list[bytes]) -> None:
+            nonlocal stored_bytes
+            # Kawałki z jednego odczytu zapisujemy równolegle (S3: osobne PUT-y), kolejność zostaje w manifeście
+            for chunk, (chunk_hash, codec, is_new) in zip(chunks, await asyncio.gather(*map(self._save_chunk, chunks))):
+                entries.append([chunk_hash, len(chunk), codec])
+                if is_new:
+                    stored_bytes += len(chunk)
+
+        # Kawałki już zapisane przy przerwanym uploadzie zostają - są współdzielone i adresowane treścią
+        while data := await file_stream.read(self.max_chunk_size):
+            # Granice kawałków liczy pula procesów - pętla zdarzeń obsługuje w tym czasie inne żądania
+            await store(await chunker.feed_async(data))
+        await store(chunker.flush())
+
+        manifest = json.dumps({"chunks": entries}).encode()
+        staging_id = await self.inner.stage(AsyncBytesIO(manifest))
+        self._stored_bytes[staging_id] = stored_bytes + len(manifest)
+        return staging_id
+
+    async def stored_bytes(self, staging_id: str) -> Optional[int]:
+        return self._stored_bytes.get(staging_id)
+
+    async def staged_codec(self, staging_id: str) -> Optional[str]:
+        return await self.inner.staged_codec(staging_id)
+
+    def codec_for(self, head: bytes) -> Optional[str]:
+        return self.inner.codec_for(head)
+
+    async def promote(self, staging_id: str, file_hash: str) -> str:
+        self._stored_bytes.pop(staging_id, None)
+        codec = await self.inner.staged_codec(staging_id)
+        storage_path = await self.inner.promote(staging_id, self._manifest_key(file_hash))
+        # Manifest już istniał (osierocony) - promote go nie nadpisał, więc odświeżamy go przed GC
+        await self.inner.touch(self._manifest_key(file_hash), codec)
+        return storage_path
+
+    async def discard(self, staging_id: str) -> None:
+        self._stored_bytes.pop(staging_id, None)
+        await self.inner.discard(staging_id)
+
+    async def write_chunk(self, upload_id: str, chunk_no: int, file_stream: BinaryIO) -> int:
+        return await self.inner.write_chunk(upload_id, chunk_no, file_stream)
+
+    async def list_chunks(self, upload_id: str) -> dict[int, int]:
+        return await self.inner.list_chunks(upload_id)
+
+    async def read_chunks(self, upload_id: str, chunk_count: int) -> AsyncGenerator[bytes, None]:
+        async for data in self.inner.read_chunks(upload_id, chunk_count):
+            yield data
+
+    async def delete_chunks(self, upload_id: str) -> None:
+        await self.inner.delete_chunks(upload_id)
+
+    async def save_import_archive(self, job_id: str, file_stream: BinaryIO) -> int:
+        return await self.inner.save_import_archive(job_id, file_stream)
+
+    async def read_import_archive(self, job_id: str) -> AsyncGenerator[bytes, None]:
+        async for data in self.inner.read_import_archive(job_id):
+            yield data
+
+    async def delete_import_archive(self, job_id: str) -> None:
+        await self.inner.delete_import_archive(job_id)
+
+    async def _read_manifest(self, file_hash: str, codec: Optional[str]) -> Optional[list]:
+        # Blob zapisany w całości przed włączeniem chunkingu nie ma manifestu
+        manifest_key = self._manifest_key(file_hash)
+        if not await self.inner.exists(manifest_key, codec):
+            return None
+        manifest = b"".join([data async for data in self.inner.get(manifest_key, codec)])
+        return json.loads(manifest)["chunks"]
+
+    async def get(self, file_hash: str, codec: Optional[str] = None) -> AsyncGenerator[bytes, None]:
+        entries = await self._read_manifest(file_hash, codec)
+        if entries is None:
+            async for data in self.inner.get(file_hash, codec):
+                yield data
+            return
+
+        for chunk_hash, _, chunk_codec in entries:
+            async for data in self.inner.get(chunk_hash, chunk_codec):
+                yield data
+
+    async def get_range(self, file_hash: str, start: int, end: int, codec: Optional[str] = None) -> AsyncGenerator[bytes, None]:
+        entries = await self._read_manifest(file_hash, codec)
+        if entries is None:
+            async for data in self.inner.get_range(file_hash, start, end, codec):
+                yield data
+            return
+
+        # Z manifestu wiadomo, gdzie zaczyna się każdy kawałek - czytamy tylko te, które nachodzą na zakres
+        offset = 0
+        for chunk_hash, size, chunk_codec in entries:
+            chunk_start, chunk_end = offset, offset + size - 1
+            offset += size
+            if chunk_end < start:
+                continue
+            if chunk_start > end:
+                break
+            if start <= chunk_start and chunk_end <= end:
+                stream = self.inner.get(chunk_hash, chunk_codec)
+            else:
+                stream = self.inner.get_range(
+                    chunk_hash, max(start - chunk_start, 0), min(end, chunk_end) - chunk_start, chunk_codec
+                )
+            async for data in stream:
+                yield data
+
+    async def local_path(self, file_hash: str, codec: Optional[str] = None) -> Optional[str]:
+        if await self.inner.exists(self._manifest_key(file_hash), codec):
+            return None
+        return await self.inner.local_path(file_hash, codec)
+
+    async def presigned_url(
+        self, file_hash: str, filename: str, media_type: str, expires_in: int, codec: Optional[str] = None
+    ) -> Optional[str]:
+        if await self.inner.exists(self._manifest_key(file_hash), codec):
+            return None
+        return await self.inner.presigned_url(file_hash, filename, media_type, expires_in, codec)
+
+    async def delete(self, file_hash: str) -> None:
+        # Kawałki mogą należeć też do innych blobów - usuwamy tylko manifest (i ewentualną kopię w całości),
+        # kawałki bez odwołań sprząta collect_garbage
+        await self.inner.delete(self._manifest_key(file_hash))
+        await self.inner.delete(file_hash)
+
+    async def collect_garbage(self, live: set[str], min_age_s: float) -> int:
+        """
+        Mark-and-sweep: zaznacza kawałki z manifestów blobów z live, usuwa resztę (osierocone kawałki
+        i manifesty) starszą niż min_age_s. Zapisy w toku są młodsze, a ponownie użyte kawałki i manifesty
+        dostają touch, więc przed usunięciem sprawdzamy jeszcze raz czas modyfikacji.
+        """
+        cutoff = time.time() - min_age_s
+        manifests, others = [], []
+        async for key, codec, mtime in self.inner.list_blobs():
+            (manifests if key.endswith(self.MANIFEST_SUFFIX) else others).append((key, codec, mtime))
+
+        referenced = set(live)
+        garbage = []
+        for key, codec, mtime in manifests:
+            file_hash = key[:-len(self.MANIFEST_SUFFIX)]
+            if file_hash not in live:
+                garbage.append((key, codec, mtime))
+                continue
+            entries = await self._read_manifest(file_hash, codec)
+            referenced.update(chunk_hash for chunk_hash, _, _ in entries or [])
+        garbage += [(key, codec, mtime) for key, codec, mtime in others if key not in referenced]
+
+        removed = 0
+        for key, codec, mtime in garbage:
+            if mtime > cutoff:
+                continue
+            modified_at = await self.inner.modified_at(key, codec)
+            if modified_at is None or modified_at > cutoff:
+                continue
+            await self.inner.delete(key)
+            removed += 1
+        return removed
+
+    async def exists(self, file_hash: str, codec: Optional[str] = None) -> bool:
+        return await self.inner.exists(self._manifest_key(file_hash), codec) or await self.inner.exists(file_hash, codec)
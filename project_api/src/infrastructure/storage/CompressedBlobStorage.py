@@ -0,0 +1,193 @@
+import zlib
+from typing import BinaryIO, AsyncGenerator, Optional
+from src.application.abstraction.IFileStorage import IBlobStorage
+from src.common.utils.entropy_utils import shannon_entropy
+from src.common.utils.hash_utils import offload
+from src.common.utils.stream_utils import slice_stream
+
+READ_SIZE = 1024 * 1024 # 1MB
+# Tyle pierwszych bajtów wystarcza, żeby odróżnić tekst od zip/jpeg/mp4
+PROBE_SIZE = 64 * 1024
+
+
+class _PrefixedReader:
+    """Strumień z już odczytanym początkiem doklejonym z powrotem na przód."""
+
+    def __init__(self, head: bytes, stream: BinaryIO):
+        self._head = head
+        self._stream = stream
+        self.size_bytes = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        if self._head:
+            data, self._head = self._head, b""
+        else:
+            data = await self._stream.read(size)
+        self.size_bytes += len(data)
+        return data
+
+
+class _CompressingReader:
+    """Strumieniowa kompresja zlib: read(size) zwraca skompresowane bajty, b"" dopiero na końcu."""
+
+    def __init__(self, head: bytes, stream: BinaryIO, level: int):
+        self._upstream = _PrefixedReader(head, stream)
+        self._compressor = zlib.compressobj(level)
+        self._buffer = bytearray()
+        self._eof = False
+        self.size_bytes = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            data = await self._upstream.read(READ_SIZE)
+            if data:
+                self._buffer += await offload(self._compressor.compress, data)
+            else:
+                self._buffer += self._compressor.flush()
+                self._eof = True
+
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self.size_bytes += len(data)
+        return data
+
+
+class CompressedBlobStorage(IBlobStorage):
+    """
+    Dekorator IBlobStorage z przezroczystą kompresją zlib.
+    Treść o niskiej entropii (tekst, CSV, JSON) trafia pod "<hash>.zlib" skompresowana w locie,
+    a treść już skompresowana (zip, jpeg, mp4) - bez zmian pod "<hash>".
+    Kodek zapisany przy blobie (Blob.codec, w manifeście - przy kawałku) wraca w odczycie,
+    więc storage nie musi sprawdzać, pod którym kluczem leży treść.
+    """
+    CODEC = "zlib"
+
+    def __init__(self, inner: IBlobStorage, level: int = 6, max_entropy: float = 7.5):
+        self.inner = inner
+        self.level = level
+        self.max_entropy = max_entropy
+        # staging_id -> (kodek albo None, bajty zapisane w storage)
+        self._staged: dict[str, tuple[Optional[str], int]] = {}
+
+    @staticmethod
+    def _key(file_hash: str, codec: Optional[str]) -> str:
+        return f"{file_hash}.{codec}" if codec else file_hash
+
+    def codec_for(self, head: bytes) -> Optional[str]:
+        return None if shannon_entropy(head[:PROBE_SIZE]) > self.max_entropy else self.CODEC
+
+    async def _encoder(self, file_stream: BinaryIO):
+        head = await file_stream.read(READ_SIZE)
+        if self.codec_for(head) is None:
+            return None, _PrefixedReader(head, file_stream)
+        return self.CODEC, _CompressingReader(head, file_stream, self.level)
+
+    async def save(self, file_stream: BinaryIO, file_hash: str) -> str:
+        codec, reader = await self._encoder(file_stream)
+        return await self.inner.save(reader, self._key(file_hash, codec))
+
+    async def stage(self, file_stream: BinaryIO) -> str:
+        codec, reader = await self._encoder(file_stream)
+        staging_id = await self.inner.stage(reader)
+        self._staged[staging_id] = (codec, reader.size_bytes)
+        return staging_id
+
+    async def stored_bytes(self, staging_id: str) -> Optional[int]:
+        staged = self._staged.get(staging_id)
+        return staged[1] if staged else None
+
+    async def staged_codec(self, staging_id: str) -> Optional[str]:
+        staged = self._staged.get(staging_id)
+        return staged[0] if staged else None
+
+    async def promote(self, staging_id: str, file_hash: str) -> str:
+        codec, _ = self._staged.pop(staging_id, (None, 0))
+        return await self.inner.promote(staging_id, self._key(file_hash, codec))
+
+    async def discard(self, staging_id: str) -> None:
+        self._staged.pop(staging_id, None)
+        await self.inner.discard(staging_id)
+
+    async def write_chunk(self, upload_id: str, chunk_no: int, file_stream: BinaryIO) -> int:
+        return await self.inner.write_chunk(upload_id, chunk_no, file_stream)
+
+    async def list_chunks(self, upload_id: str) -> dict[int, int]:
+        return await self.inner.list_chunks(upload_id)
+
+    async def read_chunks(self, upload_id: str, chunk_count: int) -> AsyncGenerator[bytes, None]:
+        async for data in self.inner.read_chunks(upload_id, chunk_count):
+            yield data
+
+    async def delete_chunks(self, upload_id: str) -> None:
+        await self.inner.delete_chunks(upload_id)
+
+    async def save_import_archive(self, job_id: str, file_stream: BinaryIO) -> int:
+        return await self.inner.save_import_archive(job_id, file_stream)
+
+    async def read_import_archive(self, job_id: str) -> AsyncGenerator[bytes, None]:
+        async for data in self.inner.read_import_archive(job_id):
+            yield data
+
+    async def delete_import_archive(self, job_id: str) -> None:
+        await self.inner.delete_import_archive(job_id)
+
+    async def get(self, file_hash: str, codec: Optional[str] = None) -> AsyncGenerator[bytes, None]:
+        if codec is None:
+            async for data in self.inner.get(file_hash):
+                yield data
+            return
+
+        decompressor = zlib.decompressobj()
+        async for data in self.inner.get(self._key(file_hash, codec)):
+            # max_length ogranicza pamięć przy bardzo dobrze skompresowanych danych
+            while data:
+                out = await offload(lambda d: decompressor.decompress(d, READ_SIZE), data)
+                if out:
+                    yield out
+                data = decompressor.unconsumed_tail
+        if tail := decompressor.flush():
+            yield tail
+
+    async def get_range(self, file_hash: str, start: int, end: int, codec: Optional[str] = None) -> AsyncGenerator[bytes, None]:
+        if codec is None:
+            async for data in self.inner.get_range(file_hash, start, end):
+                yield data
+            return
+        # zlib nie pozwala skoczyć w środek strumienia - rozpakowujemy od początku i odcinamy
+        async for data in slice_stream(self.get(file_hash, codec), start, end):
+            yield data
+
+    async def local_path(self, file_hash: str, codec: Optional[str] = None) -> Optional[str]:
+        if codec is not None:
+            return None
+        return await self.inner.local_path(file_hash)
+
+    async def presigned_url(
+        self, file_hash: str, filename: str, media_type: str, expires_in: int, codec: Optional[str] = None
+    ) -> Optional[str]:
+        if codec is not None:
+            return None
+        return await self.inner.presigned_url(file_hash, filename, media_type, expires_in)
+
+    async def list_blobs(self) -> AsyncGenerator[tuple[str, Optional[str], float], None]:
+        suffix = f".{self.CODEC}"
+        async for key, _, mtime in self.inner.list_blobs():
+            if key.endswith(suffix):
+                yield key[:-len(suffix)], self.CODEC, mtime
+            else:
+                yield key, None, mtime
+
+    async def modified_at(self, file_hash: str, codec: Optional[str] = None) -> Optional[float]:
+        return await self.inner.modified_at(self._key(file_hash, codec))
+
+    async def touch(self, file_hash: str, codec: Optional[str] = None) -> None:
+        await self.inner.touch(self._key(file_hash, codec))
+
+    async def delete(self, file_hash: str) -> None:
+        await self.inner.delete(self._key(file_hash, self.CODEC))
+        await self.inner.delete(file_hash)
+
+    async def exists(self, file_hash: str, codec: Optional[str] = None) -> bool:
+        return await self.inner.exists(self._key(file_hash, codec))
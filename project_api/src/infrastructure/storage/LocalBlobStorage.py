@@ -1,8 +1,10 @@
+import asyncio
 import os
 import shutil
 import aiofiles # pip install aiofiles
 from pathlib import Path
-from typing import BinaryIO, AsyncGenerator
+from uuid import uuid4
+from typing import BinaryIO, AsyncGenerator, Optional
 from src.application.abstraction.IFileStorage import IBlobStorage
 
 class LocalBlobStorage(IBlobStorage):
@@ -15,6 +17,10 @@ class LocalBlobStorage(IBlobStorage):
         prefix2 = file_hash[2:4]
         return self.base_path / prefix1 / prefix2 / file_hash
 
+    def _get_staging_path(self, staging_id: str) -> Path:
+        # Staging leży pod base_path, więc os.replace przy promocji jest atomowy (ten sam filesystem)
+        return self.base_path / ".staging" / staging_id
+
     async def save(self, file_stream: BinaryIO, file_hash: str) -> str:
         target_path = self._get_path(file_hash)
         if target_path.exists():
@@ -28,7 +34,108 @@ class LocalBlobStorage(IBlobStorage):
         
         return str(target_path)
 
-    async def get(self, file_hash: str) -> AsyncGenerator[bytes, None]:
+    async def stage(self, file_stream: BinaryIO) -> str:
+        staging_id = uuid4().hex
+        staging_path = self._get_staging_path(staging_id)
+        staging_path.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            async with aiofiles.open(staging_path, 'wb') as f:
+                while chunk := await file_stream.read(1024 * 1024): # 1MB chunks
+                    await f.write(chunk)
+        except BaseException:
+            staging_path.unlink(missing_ok=True)
+            raise
+
+        return staging_id
+
+    async def promote(self, staging_id: str, file_hash: str) -> str:
+        staging_path = self._get_staging_path(staging_id)
+        target_path = self._get_path(file_hash)
+        if target_path.exists():
+            staging_path.unlink(missing_ok=True)
+            return str(target_path)
+
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staging_path, target_path)
+        return str(target_path)
+
+    async def discard(self, staging_id: str) -> None:
+        self._get_staging_path(staging_id).unlink(missing_ok=True)
+
+    def _get_upload_dir(self, upload_id: str) -> Path:
+        return self.base_path / ".uploads" / upload_id
+
+    async def write_chunk(self, upload_id: str, chunk_no: int, file_stream: BinaryIO) -> int:
+        upload_dir = self._get_upload_dir(upload_id)
+        upload_dir.mkdir(parents=True, exist_ok=True)
+        chunk_path = upload_dir / f"{chunk_no:08d}"
+        # Piszemy obok i podmieniamy - przerwany PUT nie zostawi uciętego kawałka
+        tmp_path = upload_dir / f"{chunk_no:08d}.{uuid4().hex}.part"
+
+        size_bytes = 0
+        try:
+            async with aiofiles.open(tmp_path, 'wb') as f:
+                while chunk := await file_stream.read(1024 * 1024): # 1MB chunks
+                    size_bytes += len(chunk)
+                    await f.write(chunk)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        os.replace(tmp_path, chunk_path)
+        return size_bytes
+
+    async def list_chunks(self, upload_id: str) -> dict[int, int]:
+        upload_dir = self._get_upload_dir(upload_id)
+        if not upload_dir.exists():
+            return {}
+        return {
+            int(entry.name): entry.stat().st_size
+            for entry in upload_dir.iterdir()
+            if entry.name.isdigit()
+        }
+
+    async def read_chunks(self, upload_id: str, chunk_count: int) -> AsyncGenerator[bytes, None]:
+        upload_dir = self._get_upload_dir(upload_id)
+        for chunk_no in range(chunk_count):
+            async with aiofiles.open(upload_dir / f"{chunk_no:08d}", 'rb') as f:
+                while chunk := await f.read(1024 * 1024): # 1MB chunks
+                    yield chunk
+
+    async def delete_chunks(self, upload_id: str) -> None:
+        shutil.rmtree(self._get_upload_dir(upload_id), ignore_errors=True)
+
+    def _get_import_path(self, job_id: str) -> Path:
+        return self.base_path / ".imports" / job_id
+
+    async def save_import_archive(self, job_id: str, file_stream: BinaryIO) -> int:
+        archive_path = self._get_import_path(job_id)
+        archive_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = archive_path.with_name(f"{job_id}.{uuid4().hex}.part")
+
+        size_bytes = 0
+        try:
+            async with aiofiles.open(tmp_path, 'wb') as f:
+                while chunk := await file_stream.read(1024 * 1024): # 1MB chunks
+                    size_bytes += len(chunk)
+                    await f.write(chunk)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        os.replace(tmp_path, archive_path)
+        return size_bytes
+
+    async def read_import_archive(self, job_id: str) -> AsyncGenerator[bytes, None]:
+        async with aiofiles.open(self._get_import_path(job_id), 'rb') as f:
+            while chunk := await f.read(1024 * 1024): # 1MB chunks
+                yield chunk
+
+    async def delete_import_archive(self, job_id: str) -> None:
+        self._get_import_path(job_id).unlink(missing_ok=True)
+
+    async def get(self, file_hash: str, codec: Optional[str] = None) -> AsyncGenerator[bytes, None]:
         target_path = self._get_path(file_hash)
         if not target_path.exists():
             raise FileNotFoundError(f"Blob {file_hash} not found")
@@ -37,9 +144,52 @@ class LocalBlobStorage(IBlobStorage):
             while chunk := await f.read(1024 * 1024): # 1MB chunks
                 yield chunk
 
+    async def get_range(self, file_hash: str, start: int, end: int, codec: Optional[str] = None) -> AsyncGenerator[bytes, None]:
+        target_path = self._get_path(file_hash)
+        if not target_path.exists():
+            raise FileNotFoundError(f"Blob {file_hash} not found")
+
+        remaining = end - start + 1
+        async with aiofiles.open(target_path, 'rb') as f:
+            await f.seek(start)
+            while remaining > 0 and (chunk := await f.read(min(remaining, 1024 * 1024))): # 1MB chunks
+                remaining -= len(chunk)
+                yield chunk
+
     async def delete(self, file_hash: str) -> None:
         target_path = self._get_path(file_hash)
         if target_path.exists():
-            os.remove(target_path)    
-    async def exists(self, file_hash: str) -> bool:
+            os.remove(target_path)
+
+    def _scan(self, prefix_dir: Path) -> list[tuple[str, float]]:
+        return [
+            (entry.name, entry.stat().st_mtime)
+            for sub_dir in prefix_dir.iterdir() if sub_dir.is_dir()
+            for entry in sub_dir.iterdir() if entry.is_file()
+        ]
+
+    async def list_blobs(self) -> AsyncGenerator[tuple[str, Optional[str], float], None]:
+        # Katalogi z kropką (.staging, .uploads) to nie bloby
+        for prefix_dir in sorted(self.base_path.iterdir()):
+            if prefix_dir.is_dir() and not prefix_dir.name.startswith("."):
+                for name, mtime in await asyncio.to_thread(self._scan, prefix_dir):
+                    yield name, None, mtime
+
+    async def modified_at(self, file_hash: str, codec: Optional[str] = None) -> Optional[float]:
+        try:
+            return self._get_path(file_hash).stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    async def touch(self, file_hash: str, codec: Optional[str] = None) -> None:
+        try:
+            os.utime(self._get_path(file_hash))
+        except FileNotFoundError:
+            pass
+
+    async def local_path(self, file_hash: str, codec: Optional[str] = None) -> Optional[str]:
+        target_path = self._get_path(file_hash)
+        return str(target_path) if target_path.is_file() else None
+
+    async def exists(self, file_hash: str, codec: Optional[str] = None) -> bool:
         return self._get_path(file_hash).exists()
\ No newline at end of file
@@ -1,27 +1,232 @@
+import asyncio
 import aioboto3
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Optional
+from urllib.parse import quote
+from uuid import uuid4
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from src.application.abstraction.IFileStorage import IBlobStorage
 
+# S3 wymaga, żeby każda część multipart poza ostatnią miała co najmniej 5 MiB
+MIN_PART_SIZE = 5 * 1024 * 1024
+
 class S3BlobStorage(IBlobStorage):
-    def __init__(self, bucket: str, region: str, aws_access_key_id: str, aws_secret_access_key: str):
+    def __init__(
+        self,
+        bucket: str,
+        region: str,
+        aws_access_key_id: str,
+        aws_secret_access_key: str,
+        endpoint_url: str | None = None,
+        part_size: int = 8 * 1024 * 1024,
+        max_concurrency: int = 4,
+        max_pool_connections: int = 50,
+    ):
         self.bucket = bucket
         self.region = region
+        self.endpoint_url = endpoint_url
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.max_concurrency = max(max_concurrency, 1)
         self._session = aioboto3.Session(
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
             region_name=region,
         )
+        # Pula keep-alive musi pomieścić części multipart wszystkich równoległych uploadów
+        self._config = Config(max_pool_connections=max(max_pool_connections, 1), tcp_keepalive=True)
+        self._shared_client = None
+        self._exit_stack: AsyncExitStack | None = None
+
+    async def open(self) -> None:
+        """
+        Otwiera jednego klienta S3 na cały proces (lifespan aplikacji): wspólna pula połączeń
+        i sesje TLS zamiast nowego klienta przy każdej operacji.
+        """
+        if self._shared_client is not None:
+            return
+        stack = AsyncExitStack()
+        self._shared_client = await stack.enter_async_context(self._new_client())
+        self._exit_stack = stack
+
+    async def close(self) -> None:
+        """Zamyka wspólnego klienta i jego pulę; kolejne operacje wracają do klienta per wywołanie."""
+        if self._exit_stack is None:
+            return
+        stack, self._exit_stack, self._shared_client = self._exit_stack, None, None
+        await stack.aclose()
+
+    def _new_client(self):
+        return self._session.client("s3", endpoint_url=self.endpoint_url, config=self._config)
+
+    @asynccontextmanager
+    async def _client(self):
+        if self._shared_client is not None:
+            # Klienta zamyka dopiero close() - tu tylko go wypożyczamy
+            yield self._shared_client
+            return
+        # Bez open() (skrypty, testy) - klient na czas jednej operacji, jak dotąd
+        async with self._new_client() as s3:
+            yield s3
+
+    @staticmethod
+    async def _read_part(file_stream, size: int) -> bytes:
+        # read(n) może zwrócić mniej niż n przed końcem strumienia - dobieramy do pełnej części
+        buffer = bytearray()
+        while len(buffer) < size:
+            chunk = await file_stream.read(size - len(buffer))
+            if not chunk:
+                break
+            buffer += chunk
+        return bytes(buffer)
+
+    async def _put_stream(self, s3, key: str, file_stream) -> int:
+        """
+        Wysyła strumień pod klucz bez trzymania całości w RAM.
+        Małe pliki idą jednym put_object, większe jako multipart: części po part_size,
+        maksymalnie max_concurrency naraz, więc szczyt pamięci to ~part_size * max_concurrency.
+        Zwraca liczbę wysłanych bajtów.
+        """
+        first_part = await self._read_part(file_stream, self.part_size)
+        if len(first_part) < self.part_size:
+            await s3.put_object(Bucket=self.bucket, Key=key, Body=first_part)
+            return len(first_part)
+
+        multipart = await s3.create_multipart_upload(Bucket=self.bucket, Key=key)
+        upload_id = multipart["UploadId"]
+        window = asyncio.Semaphore(self.max_concurrency)
+        tasks: list[asyncio.Task] = []
+
+        async def upload_part(part_no: int, body: bytes) -> dict:
+            try:
+                response = await s3.upload_part(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=part_no, Body=body
+                )
+                return {"PartNumber": part_no, "ETag": response["ETag"]}
+            finally:
+                window.release()
+
+        size_bytes = 0
+        try:
+            # Miejsce w oknie obejmuje czytanie części i jej wysyłkę - pierwsza część już jest w pamięci
+            await window.acquire()
+            part, part_no = first_part, 1
+            while part:
+                size_bytes += len(part)
+                tasks.append(asyncio.create_task(upload_part(part_no, part)))
+                del part
+                # Kolejną część czytamy dopiero, gdy zwolni się miejsce w oknie
+                await window.acquire()
+                failed = [t for t in tasks if t.done() and t.exception()]
+                if failed:
+                    raise failed[0].exception()
+                part = await self._read_part(file_stream, self.part_size)
+                part_no += 1
+
+            parts = await asyncio.gather(*tasks)
+            await s3.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await s3.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            except ClientError:
+                pass  # nie przykrywamy pierwotnego błędu; osierocone części sprząta lifecycle bucketu
+            raise
+        return size_bytes
 
-    def _client(self):
-        return self._session.client("s3")
+    @staticmethod
+    def _staging_key(staging_id: str) -> str:
+        return f"staging/{staging_id}"
+
+    @staticmethod
+    def _chunk_prefix(upload_id: str) -> str:
+        return f"uploads/{upload_id}/"
 
     async def save(self, file_stream, file_hash: str) -> str:
         async with self._client() as s3:
-            content = await file_stream.read()
-            await s3.put_object(Bucket=self.bucket, Key=file_hash, Body=content)
+            await self._put_stream(s3, file_hash, file_stream)
         return file_hash
 
-    async def get(self, file_hash: str):
+    async def stage(self, file_stream) -> str:
+        staging_id = uuid4().hex
+        async with self._client() as s3:
+            await self._put_stream(s3, self._staging_key(staging_id), file_stream)
+        return staging_id
+
+    async def promote(self, staging_id: str, file_hash: str) -> str:
+        staging_key = self._staging_key(staging_id)
+        async with self._client() as s3:
+            # copy_object jest po stronie serwera - bajty nie wracają do procesu API
+            await s3.copy_object(
+                Bucket=self.bucket,
+                Key=file_hash,
+                CopySource={"Bucket": self.bucket, "Key": staging_key},
+            )
+            await s3.delete_object(Bucket=self.bucket, Key=staging_key)
+        return file_hash
+
+    async def discard(self, staging_id: str) -> None:
+        async with self._client() as s3:
+            await s3.delete_object(Bucket=self.bucket, Key=self._staging_key(staging_id))
+
+    async def write_chunk(self, upload_id: str, chunk_no: int, file_stream) -> int:
+        async with self._client() as s3:
+            return await self._put_stream(s3, f"{self._chunk_prefix(upload_id)}{chunk_no:08d}", file_stream)
+
+    async def list_chunks(self, upload_id: str) -> dict[int, int]:
+        prefix = self._chunk_prefix(upload_id)
+        chunks = {}
+        async with self._client() as s3:
+            paginator = s3.get_paginator("list_objects_v2")
+            async for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+                for obj in page.get("Contents", []):
+                    chunks[int(obj["Key"][len(prefix):])] = obj["Size"]
+        return chunks
+
+    async def read_chunks(self, upload_id: str, chunk_count: int):
+        prefix = self._chunk_prefix(upload_id)
+        async with self._client() as s3:
+            for chunk_no in range(chunk_count):
+                obj = await s3.get_object(Bucket=self.bucket, Key=f"{prefix}{chunk_no:08d}")
+                async for chunk in obj["Body"].iter_chunks(chunk_size=1024 * 64):
+                    if chunk:
+                        yield chunk
+
+    async def delete_chunks(self, upload_id: str) -> None:
+        chunk_nos = await self.list_chunks(upload_id)
+        if not chunk_nos:
+            return
+        prefix = self._chunk_prefix(upload_id)
+        keys = [{"Key": f"{prefix}{chunk_no:08d}"} for chunk_no in sorted(chunk_nos)]
+        async with self._client() as s3:
+            # delete_objects przyjmuje maksymalnie 1000 kluczy na wywołanie
+            for i in range(0, len(keys), 1000):
+                await s3.delete_objects(Bucket=self.bucket, Delete={"Objects": keys[i:i + 1000]})
+
+    @staticmethod
+    def _import_key(job_id: str) -> str:
+        return f"imports/{job_id}"
+
+    async def save_import_archive(self, job_id: str, file_stream) -> int:
+        async with self._client() as s3:
+            return await self._put_stream(s3, self._import_key(job_id), file_stream)
+
+    async def read_import_archive(self, job_id: str):
+        async with self._client() as s3:
+            obj = await s3.get_object(Bucket=self.bucket, Key=self._import_key(job_id))
+            async for chunk in obj["Body"].iter_chunks(chunk_size=1024 * 64):
+                if chunk:
+                    yield chunk
+
+    async def delete_import_archive(self, job_id: str) -> None:
+        async with self._client() as s3:
+            await s3.delete_object(Bucket=self.bucket, Key=self._import_key(job_id))
+
+    async def get(self, file_hash: str, codec: Optional[str] = None):
         async with self._client() as s3:
             obj = await s3.get_object(Bucket=self.bucket, Key=file_hash)
             body = obj["Body"]  #
@@ -30,11 +235,62 @@ class S3BlobStorage(IBlobStorage):
                 if chunk:  
                     yield chunk
 
+    async def get_range(self, file_hash: str, start: int, end: int, codec: Optional[str] = None):
+        async with self._client() as s3:
+            obj = await s3.get_object(Bucket=self.bucket, Key=file_hash, Range=f"bytes={start}-{end}")
+            async for chunk in obj["Body"].iter_chunks(chunk_size=1024 * 64):
+                if chunk:
+                    yield chunk
+
+    async def presigned_url(
+        self, file_hash: str, filename: str, media_type: str, expires_in: int, codec: Optional[str] = None
+    ) -> str:
+        async with self._client() as s3:
+            # Podpis liczony lokalnie - bez zapytania do S3
+            return await s3.generate_presigned_url(
+                "get_object",
+                Params={
+                    "Bucket": self.bucket,
+                    "Key": file_hash,
+                    "ResponseContentDisposition": f"attachment; filename*=utf-8''{quote(filename)}",
+                    "ResponseContentType": media_type,
+                },
+                ExpiresIn=expires_in,
+            )
+
     async def delete(self, file_hash: str) -> None:
         async with self._client() as s3:
             await s3.delete_object(Bucket=self.bucket, Key=file_hash)
 
-    async def exists(self, file_hash: str) -> bool:
+    async def list_blobs(self):
+        async with self._client() as s3:
+            paginator = s3.get_paginator("list_objects_v2")
+            # Delimiter pomija staging/ i uploads/ - bloby leżą w korzeniu bucketu
+            async for page in paginator.paginate(Bucket=self.bucket, Delimiter="/"):
+                for obj in page.get("Contents", []):
+                    yield obj["Key"], None, obj["LastModified"].timestamp()
+
+    async def modified_at(self, file_hash: str, codec: Optional[str] = None) -> Optional[float]:
+        async with self._client() as s3:
+            try:
+                head = await s3.head_object(Bucket=self.bucket, Key=file_hash)
+            except ClientError as e:
+                if e.response["Error"].get("Code") in ("404", "NoSuchKey", "NotFound"):
+                    return None
+                raise
+        return head["LastModified"].timestamp()
+
+    async def touch(self, file_hash: str, codec: Optional[str] = None) -> None:
+        # Kopia na siebie z REPLACE to jedyny sposób na nowy LastModified (kopia po stronie S3, do 5 GB)
+        async with self._client() as s3:
+            await s3.copy_object(
+                Bucket=self.bucket,
+                Key=file_hash,
+                CopySource={"Bucket": self.bucket, "Key": file_hash},
+                MetadataDirective="REPLACE",
+            )
+
+    async def exists(self, file_hash: str, codec: Optional[str] = None) -> bool:
         async with self._client() as s3:
             try:
                 await s3.head_object(Bucket=self.bucket, Key=file_hash)
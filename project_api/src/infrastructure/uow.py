@@ -9,6 +9,8 @@ from src.infrastructure.repositories.refresh_token_repo import RefreshTokenRepo
 from src.infrastructure.repositories.file_repo import FileRepo
 from src.infrastructure.repositories.blob_repository import BlobRepo
 from src.infrastructure.repositories.file_version_repo import FileVersionRepo
+from src.infrastructure.repositories.upload_session_repo import UploadSessionRepo
+from src.infrastructure.repositories.zip_import_job_repo import ZipImportJobRepo
 
 class SqlAlchemyUoW:
     def __init__(
@@ -20,7 +22,9 @@ class SqlAlchemyUoW:
         refresh_token_repo_factory: Callable[[AsyncSession], RefreshTokenRepo] = RefreshTokenRepo,
         file_repo_factory: Callable[[AsyncSession], FileRepo] = FileRepo,
         blob_repo_factory: Callable[[AsyncSession], BlobRepo] = BlobRepo,
-        file_version_repo_factory: Callable[[AsyncSession], FileVersionRepo] = FileVersionRepo
+        file_version_repo_factory: Callable[[AsyncSession], FileVersionRepo] = FileVersionRepo,
+        upload_session_repo_factory: Callable[[AsyncSession], UploadSessionRepo] = UploadSessionRepo,
+        zip_import_job_repo_factory: Callable[[AsyncSession], ZipImportJobRepo] = ZipImportJobRepo
 
 
     ):
@@ -32,6 +36,8 @@ class SqlAlchemyUoW:
         self._file_repo_factory = file_repo_factory
         self._blob_repo_factory = blob_repo_factory
         self._file_version_repo_factory = file_version_repo_factory
+        self._upload_session_repo_factory = upload_session_repo_factory
+        self._zip_import_job_repo_factory = zip_import_job_repo_factory
         self.session: AsyncSession | None = None
         self.users: UserRepo | None = None
         self.logbook: LogbookRepo | None = None
@@ -40,8 +46,25 @@ class SqlAlchemyUoW:
         self.user_session: SessionRepo | None = None
         self.refresh_token: RefreshTokenRepo | None = None
         self.files: FileRepo | None = None
+        self.upload_sessions: UploadSessionRepo | None = None
+        self.zip_import_jobs: ZipImportJobRepo | None = None
         self._tx = None
 
+    def fork(self) -> "SqlAlchemyUoW":
+        """Osobny uow z tymi samymi fabrykami - dla pracy w tle, która biegnie obok transakcji tego uow."""
+        return SqlAlchemyUoW(
+            self._session_factory,
+            user_repo_factory=self._user_repo_factory,
+            user_session_repo_factory=self._user_session_repo_factory,
+            logbook_repo_factory=self._logbook_repo_factory,
+            refresh_token_repo_factory=self._refresh_token_repo_factory,
+            file_repo_factory=self._file_repo_factory,
+            blob_repo_factory=self._blob_repo_factory,
+            file_version_repo_factory=self._file_version_repo_factory,
+            upload_session_repo_factory=self._upload_session_repo_factory,
+            zip_import_job_repo_factory=self._zip_import_job_repo_factory,
+        )
+
     async def __aenter__(self) -> "SqlAlchemyUoW":
         self.session = self._session_factory()
         self.users = self._user_repo_factory(self.session)
@@ -51,6 +74,8 @@ class SqlAlchemyUoW:
         self.refresh_token = self._refresh_token_repo_factory(self.session)
         self.files = self._file_repo_factory(self.session)
         self.file_versions = self._file_version_repo_factory(self.session)
+        self.upload_sessions = self._upload_session_repo_factory(self.session)
+        self.zip_import_jobs = self._zip_import_job_repo_factory(self.session)
         self._tx = self.session.begin()
         await self._tx.__aenter__()
         return self
@@ -1,6 +1,16 @@
 from src.api.routers.auth import limiter, router as auth_controller
 from src.api.routers.files import router as files_controller
+from src.api.routers.uploads import router as uploads_controller
+from src.api.routers.metrics import router as metrics_controller
+from src.api.upload_admission import UploadAdmissionMiddleware, upload_admission
+from src.config.app_config import settings
 from src.config.logging import configure_logging
+from src.deps import container
+from src.infrastructure.db.session import async_session_maker
+from src.infrastructure.uow import SqlAlchemyUoW
+from contextlib import asynccontextmanager, suppress
+import asyncio
+import logging
 from fastapi import FastAPI
 # IMPORT CORSMiddleware
 from fastapi.middleware.cors import CORSMiddleware 
@@ -9,12 +19,59 @@ configure_logging("DEBUG")
 
 STANDARD_PREFIX = "/api/v1"
 
+
+# Co tyle sekund szukamy porzuconych sesji uploadu (same wygasają po upload_session_ttl_hours)
+UPLOAD_SESSION_SWEEP_INTERVAL_S = 3600
+
+
+async def run_periodically(job, interval_s: float) -> None:
+    """Sprzątanie w tle co interval_s; błąd jednego przebiegu trafia tylko do logów."""
+    while True:
+        try:
+            await job(SqlAlchemyUoW(async_session_maker))
+        except Exception:
+            logging.exception(f"Periodic job {job.__name__} failed")
+        await asyncio.sleep(interval_s)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Storage, usługi i klient S3 budowane raz na proces
+    await container.startup()
+    # Importy ZIP porzucone przez martwy proces (wygasła dzierżawa) ruszają od ostatniej zatwierdzonej paczki
+    tasks = [asyncio.create_task(
+        run_periodically(container.file_service.resume_zip_import_jobs, settings.zip_import_lease_s)
+    )]
+    # Tylko chunking zostawia obiekty bez odwołań (kawałki usuniętych manifestów)
+    if settings.blob_chunking and settings.blob_gc_interval_hours > 0:
+        tasks.append(asyncio.create_task(
+            run_periodically(container.file_service.collect_blob_garbage, settings.blob_gc_interval_hours * 3600)
+        ))
+    if settings.upload_session_ttl_hours > 0:
+        tasks.append(asyncio.create_task(
+            run_periodically(container.file_service.expire_upload_sessions, UPLOAD_SESSION_SWEEP_INTERVAL_S)
+        ))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        await container.shutdown()
+
+
 app = FastAPI(
     title="Cloud Drive API",
     description="A robust REST API for cloud storage service with file versioning, rate limiting, and S3 support.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
+# Limit bajtów uploadów w locie - przed parsowaniem multipartu, które spooluje body na dysk.
+# Dodany przed CORS, żeby odpowiedź 503 też dostała nagłówki CORS
+app.add_middleware(UploadAdmissionMiddleware, controller=upload_admission, prefix=STANDARD_PREFIX)
+
 # --- ADD THIS SECTION ---
 # This allows your React app to talk to the backend
 origins = [
@@ -29,12 +86,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", "ETag", "Last-Modified", "Content-Range", "Content-Disposition"],
 )
 # ------------------------
 
 app.include_router(auth_controller, prefix=STANDARD_PREFIX)
 app.state.limiter = limiter
+app.include_router(uploads_controller, prefix=STANDARD_PREFIX)
 app.include_router(files_controller, prefix=STANDARD_PREFIX)
+app.include_router(metrics_controller, prefix=STANDARD_PREFIX)
 
 @app.get("/ping")
 async def ping():
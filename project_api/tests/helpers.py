@@ -1,6 +1,7 @@
 """
 Test helpers for common testing operations.
 """
+import hashlib
 import uuid
 from typing import Optional
 from src.infrastructure.uow import SqlAlchemyUoW
@@ -9,6 +10,7 @@ from src.infrastructure.security.access_token import (
     create_access_token,
     create_refresh_token,
 )
+from src.common.utils.stream_utils import AsyncBytesIO
 from tests.seeds import TestDataSeed
 
 
@@ -25,6 +27,25 @@ class AuthTestHelper:
         """Create a valid refresh token for testing."""
         return create_refresh_token(user_id=user_id)
 
+    @staticmethod
+    def override_current_user(user: User) -> None:
+        """Authenticate every request as user (the app fixture clears dependency_overrides)."""
+        from src.main import app
+        from src.api.auto_auth import current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[current_user] = fake_current_user
+
+    @staticmethod
+    async def login_as_seed_user(uow: SqlAlchemyUoW, email: str = "test@example.com") -> User:
+        """Seed a user and authenticate every request as them."""
+        user = await TestDataSeed(uow).seed_user(email=email)
+        AuthTestHelper.override_current_user(user)
+        return user
+
 
 class FileTestHelper:
     """Helper methods for file testing."""
@@ -65,6 +86,25 @@ class FileTestHelper:
         return structure
 
 
+class StorageTestHelper:
+    """Helper methods for blob storage testing."""
+
+    @staticmethod
+    async def collect(gen) -> bytes:
+        """Join an async stream of bytes into one bytes object."""
+        return b"".join([chunk async for chunk in gen])
+
+    @staticmethod
+    async def put(storage, content: bytes) -> tuple[str, Optional[str], Optional[int]]:
+        """Stage and promote content under its SHA-256; returns (hash, codec, stored bytes)."""
+        file_hash = hashlib.sha256(content).hexdigest()
+        staging_id = await storage.stage(AsyncBytesIO(content))
+        codec = await storage.staged_codec(staging_id)
+        stored_bytes = await storage.stored_bytes(staging_id)
+        await storage.promote(staging_id, file_hash)
+        return file_hash, codec, stored_bytes
+
+
 class RequestHelper:
     """Helper methods for building test requests."""
     
@@ -56,13 +56,13 @@ class TestDataSeed:
     
     async def seed_blob(
         self,
-        sha256: str = "test_hash_123",
+        sha256: Optional[str] = None,
         size_bytes: int = 1024,
         storage_path: str = "local_storage_data/test/blob",
     ) -> Blob:
-        """Seed a blob into the database."""
+        """Seed a blob into the database; without sha256 every blob gets its own (blobs.sha256 is unique)."""
         blob = BlobFactory.create(
-            sha256=sha256,
+            sha256=sha256 or uuid.uuid4().hex * 2,
             size_bytes=size_bytes,
             storage_path=storage_path,
         )
@@ -0,0 +1,60 @@
+"""
+Tests for the application-wide service container.
+"""
+import pytest
+import sys
+from pathlib import Path
+from httpx import AsyncClient
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.main import app
+from src.common.utils import hash_utils
+from src.config.app_config import settings
+from src.container import AppContainer
+from src.deps import container, get_auth_service, get_filesvc, get_storage
+from src.infrastructure.storage.CachedBlobStorage import CachedBlobStorage
+from src.infrastructure.storage.LocalBlobStorage import LocalBlobStorage
+
+
+@pytest.mark.asyncio
+class TestAppContainer:
+    """Tests for building shared instances once per process."""
+
+    async def test_builds_once_with_configured_storage(self, tmp_path):
+        """Services are built once; the storage chain uses LOCAL_STORAGE_PATH and the configured wrappers."""
+        services = AppContainer(settings.model_copy(update={
+            "storage_type": "local",
+            "local_storage_path": str(tmp_path / "blobs"),
+            "blob_cache_mb": 1,
+        }))
+
+        await services.startup()
+        assert services.build() is services
+        storage = services.storage
+        auth_service = services.auth_service
+        services.build()
+        assert services.storage is storage
+        assert services.auth_service is auth_service
+        assert isinstance(storage, CachedBlobStorage)
+        assert isinstance(storage.inner, LocalBlobStorage)
+        assert storage.inner.base_path == tmp_path / "blobs"
+
+        await hash_utils.offload(len, b"x" * hash_utils.INLINE_HASH_THRESHOLD)
+        await services.shutdown()
+        assert hash_utils._executor is None
+
+    async def test_lifespan_shares_instances(self):
+        """Inside the app lifespan every dependency call hands out the same instance."""
+        async with app.router.lifespan_context(app):
+            assert get_storage() is get_storage() is container.storage
+            assert get_filesvc(get_storage()) is container.file_service
+            assert get_auth_service() is get_auth_service()
+
+    async def test_storage_override_still_applies(self, client: AsyncClient, tmp_path):
+        """Overriding get_storage gives the file service the substitute storage."""
+        substitute = LocalBlobStorage(base_path=str(tmp_path))
+        assert get_filesvc(substitute).storage is substitute
+        assert get_filesvc(substitute) is not container.file_service
@@ -0,0 +1,155 @@
+"""
+Tests for the files hierarchy indexes: query plans of the hot repository queries and the uniqueness constraints.
+"""
+import pytest
+import sys
+import uuid
+from pathlib import Path
+from sqlalchemy import event, update
+from sqlalchemy.exc import IntegrityError
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.domain.entities.blob import Blob
+from src.domain.entities.file import File
+from src.infrastructure.repositories.file_repo import MAX_FOLDER_DEPTH
+from src.infrastructure.uow import SqlAlchemyUoW
+from tests.seeds import TestDataSeed
+
+
+async def _query_plans(session_engine, uow: SqlAlchemyUoW, call) -> list[str]:
+    """Runs a repository call and returns the EXPLAIN QUERY PLAN of every statement it executed."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(session_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with uow:
+            await call()
+    finally:
+        event.remove(session_engine.sync_engine, "before_cursor_execute", capture)
+
+    plans = []
+    async with session_engine.connect() as conn:
+        for statement, parameters in statements:
+            rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)).all()
+            plans.append(" | ".join(row[-1] for row in rows))
+    assert plans
+    return plans
+
+
+@pytest.mark.asyncio
+class TestQueryPlans:
+    """Hot repository queries are answered from indexes - no table scans, no sorting."""
+
+    async def test_folder_listing_pages_come_from_listing_index(self, session_engine, sqlite_uow: SqlAlchemyUoW):
+        """Every page of a folder listing walks ix_files_owner_parent_listing in order, at root and after a cursor."""
+        owner_id, folder_id, last_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        calls = [
+            lambda: sqlite_uow.files.list_page(owner_id, None, 200),
+            lambda: sqlite_uow.files.list_page(owner_id, folder_id, 200),
+            lambda: sqlite_uow.files.list_page(owner_id, folder_id, 200, (True, "photos", last_id)),
+            lambda: sqlite_uow.files.list_page(owner_id, folder_id, 200, (False, "IMG_0001.jpg", last_id)),
+        ]
+        for call in calls:
+            [plan] = await _query_plans(session_engine, sqlite_uow, call)
+            assert "SEARCH files USING INDEX ix_files_owner_parent_listing" in plan
+            assert "SCAN files" not in plan
+            assert "TEMP B-TREE" not in plan
+
+    async def test_name_and_parent_lookups_use_hierarchy_indexes(self, session_engine, sqlite_uow: SqlAlchemyUoW):
+        """Lookups by name (uploads, batch) use uq_files_owner_parent_name; lookups by parent (ZIP import, subtree) seek on it."""
+        owner_id, folder_id = uuid.uuid4(), uuid.uuid4()
+        for call in (
+            lambda: sqlite_uow.files.get_by_owner_and_name(owner_id, "report.pdf", folder_id),
+            lambda: sqlite_uow.files.get_by_owner_and_name(owner_id, "report.pdf", None),
+            lambda: sqlite_uow.files.get_by_names_in_folder(owner_id, ["a.txt", "b.txt"], folder_id),
+        ):
+            plans = await _query_plans(session_engine, sqlite_uow, call)
+            assert "SEARCH files USING INDEX uq_files_owner_parent_name (owner_id=? AND parent_folder_id=? AND name=?)" in plans[0]
+
+        # Both hierarchy indexes start with (owner_id, parent_folder_id); either one is a seek
+        for call in (
+            lambda: sqlite_uow.files.get_children(owner_id, [folder_id, uuid.uuid4()]),
+            lambda: sqlite_uow.files.get_subtree(owner_id, folder_id),
+        ):
+            [plan] = await _query_plans(session_engine, sqlite_uow, call)
+            assert "(owner_id=? AND parent_folder_id=?)" in plan
+            assert "SCAN files" not in plan
+
+    async def test_dedup_and_version_lookups_use_indexes(self, session_engine, sqlite_uow: SqlAlchemyUoW):
+        """Hash lookups use uq_blobs_sha256; blob and version lookups never scan file_versions or files."""
+        owner_id, blob_id, file_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+        for call in (
+            lambda: sqlite_uow.blobs.get_by_hashes(["a" * 64, "b" * 64]),
+            lambda: sqlite_uow.blobs.get_by_hash_for_owner("a" * 64, owner_id),
+        ):
+            plans = await _query_plans(session_engine, sqlite_uow, call)
+            assert all("SEARCH blobs USING INDEX uq_blobs_sha256" in plan for plan in plans)
+
+        [plan] = await _query_plans(session_engine, sqlite_uow, lambda: sqlite_uow.blobs.is_current_anywhere(blob_id))
+        assert "SEARCH file_versions USING INDEX ix_file_versions_blob_id" in plan
+        assert "SEARCH files USING INDEX ix_files_current_version_id" in plan
+
+        for call in (
+            lambda: sqlite_uow.file_versions.list_by_file_id(file_id),
+            lambda: sqlite_uow.file_versions.get_highest_version_no(file_id),
+        ):
+            [plan] = await _query_plans(session_engine, sqlite_uow, call)
+            assert "SEARCH file_versions USING INDEX" in plan
+            assert "SCAN" not in plan
+
+    async def test_sibling_names_and_hashes_are_unique(self, sqlite_uow: SqlAlchemyUoW):
+        """The database rejects a second sibling with the same name (root included) and a second blob per hash."""
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+        folder = await seed.seed_folder(owner_id=user.id, name="docs")
+        await seed.seed_file(owner_id=user.id, name="report.pdf", parent_folder_id=folder.id)
+        await seed.seed_file(owner_id=user.id, name="report.pdf")
+        blob = await seed.seed_blob()
+
+        def row(name, parent_folder_id):
+            return {"id": uuid.uuid4(), "owner_id": user.id, "name": name, "parent_folder_id": parent_folder_id}
+
+        for rows in ([row("report.pdf", folder.id)], [row("report.pdf", None)], [row("docs", None)]):
+            with pytest.raises(IntegrityError):
+                async with sqlite_uow:
+                    await sqlite_uow.files.add_many(rows)
+
+        with pytest.raises(IntegrityError):
+            async with sqlite_uow:
+                sqlite_uow.session.add(Blob(id=uuid.uuid4(), sha256=blob.sha256, size_bytes=1, storage_path="other"))
+
+        # The bulk insert skips a hash that is already stored and hands back the stored blob's id
+        async with sqlite_uow:
+            stored = await sqlite_uow.blobs.add_many([
+                {"id": uuid.uuid4(), "sha256": blob.sha256, "size_bytes": 1, "storage_path": "other"},
+            ])
+        assert stored == {blob.sha256: blob.id}
+
+        # The same name in another folder or for another owner is fine
+        archive = await seed.seed_folder(owner_id=user.id, name="archive")
+        other = await seed.seed_user(email="other@example.com")
+        async with sqlite_uow:
+            await sqlite_uow.files.add_many([row("report.pdf", archive.id), {**row("report.pdf", None), "owner_id": other.id}])
+
+    async def test_recursive_queries_stop_on_parent_cycle(self, sqlite_uow: SqlAlchemyUoW):
+        """A parent_folder_id cycle cannot make the ancestor or subtree CTE recurse forever."""
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+        a = await seed.seed_folder(owner_id=user.id, name="a")
+        b = await seed.seed_folder(owner_id=user.id, name="b", parent_folder_id=a.id)
+        async with sqlite_uow:
+            await sqlite_uow.session.execute(update(File).where(File.id == a.id).values(parent_folder_id=b.id))
+
+        async with sqlite_uow:
+            ancestors = await sqlite_uow.files.get_ancestors(user.id, a.id)
+            subtree = await sqlite_uow.files.get_subtree(user.id, a.id)
+        assert len(ancestors) == MAX_FOLDER_DEPTH + 1
+        assert len(subtree) == MAX_FOLDER_DEPTH + 1
+        assert subtree[0].id == a.id
@@ -42,7 +42,7 @@ class TestFileDownload:
         
         try:
             # Mock function to return file content
-            async def mock_get(self, file_hash: str):
+            async def mock_get(self, file_hash: str, codec=None):
                 yield b"test content here"
             
             # Upload a file first
@@ -159,7 +159,7 @@ class TestFileDownload:
         
         try:
             # Mock function to return file content
-            async def mock_get(self, file_hash: str):
+            async def mock_get(self, file_hash: str, codec=None):
                 yield b"PDF content here"
             
             # Upload PDF file
@@ -202,7 +202,7 @@ class TestFileDownload:
         
         try:
             # Mock function to return file content
-            async def mock_get(self, file_hash: str):
+            async def mock_get(self, file_hash: str, codec=None):
                 # Return different content based on hash for realism
                 yield b"file content for hash " + file_hash.encode()[:10]
             
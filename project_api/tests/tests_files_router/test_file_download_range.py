@@ -0,0 +1,294 @@
+"""
+Tests for HTTP Range and conditional requests on file downloads.
+"""
+import asyncio
+import hashlib
+from datetime import datetime
+import os
+import pytest
+import pytest_asyncio
+import sys
+from pathlib import Path
+from httpx import AsyncClient
+from unittest.mock import patch
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.main import app
+from src.api.downloads import parse_range
+from src.config.app_config import settings
+from src.application.errors import RangeNotSatisfiableError
+from src.infrastructure.uow import SqlAlchemyUoW
+from tests.seeds import TestDataSeed
+
+
+def test_parse_range():
+    """Single, open-ended and suffix ranges; anything else falls back to the full body."""
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=-500", 100) == (0, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("items=0-9", 100) is None
+    assert parse_range("bytes=9-0", 100) is None
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_range("bytes=100-", 100)
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_range("bytes=-0", 100)
+
+
+class _LocalBlob:
+    """Stand-in for BlobReader whose content sits in a raw file on local disk."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    async def local_path(self):
+        return str(self.path)
+
+    def __aiter__(self):
+        async def read():
+            yield self.path.read_bytes()
+        return read()
+
+
+async def _respond(path: Path, extensions: dict, headers: list) -> tuple:
+    from types import SimpleNamespace
+    from starlette.requests import Request
+    from src.api.downloads import build_download_response
+
+    content = path.read_bytes()
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": headers, "extensions": extensions}
+    version = SimpleNamespace(
+        blob=SimpleNamespace(size_bytes=len(content), sha256=hashlib.sha256(content).hexdigest()),
+        uploaded_at=datetime(2026, 1, 1),
+    )
+    response = await build_download_response(Request(scope), _LocalBlob(path), version, "a.bin", "application/octet-stream")
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    await response(scope, receive, send)
+    return response, messages
+
+
+@pytest.mark.asyncio
+async def test_file_response_only_when_server_supports_pathsend(tmp_path):
+    """Raw local blobs go out as FileResponse (sendfile, Starlette ranges) only for servers with pathsend."""
+    from starlette.responses import FileResponse
+
+    path = tmp_path / "blob"
+    path.write_bytes(bytes(range(256)) * 4)
+
+    response, messages = await _respond(path, {}, [])
+    assert not isinstance(response, FileResponse)
+    assert b"".join(m.get("body", b"") for m in messages) == path.read_bytes()
+
+    response, messages = await _respond(path, {"http.response.pathsend": {}}, [])
+    assert isinstance(response, FileResponse)
+    assert messages[1] == {"type": "http.response.pathsend", "path": str(path)}
+
+    response, messages = await _respond(path, {"http.response.pathsend": {}}, [(b"range", b"bytes=0-4,100-104")])
+    assert messages[0]["status"] == 206
+    assert dict(messages[0]["headers"])[b"content-range"].startswith(b"multipart/byteranges")
+
+
+@pytest.mark.asyncio
+class TestFileDownloadRange:
+    """Tests for partial content responses."""
+
+    @pytest_asyncio.fixture
+    async def uploaded(self, client: AsyncClient, sqlite_uow: SqlAlchemyUoW):
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+        content = os.urandom(200 * 1024)
+        response = await client.post("/api/v1/files/", files={"file": ("video.bin", content)})
+        assert response.status_code == 201
+        try:
+            yield response.json()["id"], content
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_full_download_advertises_ranges(self, client: AsyncClient, uploaded):
+        """Without Range the whole file comes back with validators and Accept-Ranges."""
+        file_id, content = uploaded
+
+        response = await client.get(f"/api/v1/files/{file_id}/download")
+
+        assert response.status_code == 200
+        assert response.content == content
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["etag"].strip('"') == hashlib.sha256(content).hexdigest()
+        assert "last-modified" in response.headers
+
+    async def test_range_returns_partial_content(self, client: AsyncClient, uploaded):
+        """A byte range gives 206 with only the requested bytes."""
+        file_id, content = uploaded
+
+        response = await client.get(f"/api/v1/files/{file_id}/download", headers={"Range": "bytes=1000-70999"})
+
+        assert response.status_code == 206
+        assert response.content == content[1000:71000]
+        assert response.headers["content-range"] == f"bytes 1000-70999/{len(content)}"
+        assert response.headers["content-length"] == "70000"
+
+    async def test_suffix_range(self, client: AsyncClient, uploaded):
+        """bytes=-N returns the last N bytes."""
+        file_id, content = uploaded
+
+        response = await client.get(f"/api/v1/files/{file_id}/download", headers={"Range": "bytes=-100"})
+
+        assert response.status_code == 206
+        assert response.content == content[-100:]
+
+    async def test_unsatisfiable_range(self, client: AsyncClient, uploaded):
+        """A range starting past the end gives 416 with the full size in Content-Range."""
+        file_id, content = uploaded
+
+        response = await client.get(
+            f"/api/v1/files/{file_id}/download", headers={"Range": f"bytes={len(content)}-"}
+        )
+
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(content)}"
+
+    async def test_if_range(self, client: AsyncClient, uploaded):
+        """Range is honoured only when If-Range still matches the current version."""
+        file_id, content = uploaded
+        full = await client.get(f"/api/v1/files/{file_id}/download")
+
+        for validator in (full.headers["etag"], full.headers["last-modified"]):
+            response = await client.get(
+                f"/api/v1/files/{file_id}/download",
+                headers={"Range": "bytes=0-9", "If-Range": validator},
+            )
+            assert response.status_code == 206
+            assert response.content == content[:10]
+
+        response = await client.get(
+            f"/api/v1/files/{file_id}/download",
+            headers={"Range": "bytes=0-9", "If-Range": '"stale-etag"'},
+        )
+        assert response.status_code == 200
+        assert response.content == content
+
+    async def test_local_blob_bypasses_storage_stream(self, client: AsyncClient, uploaded, monkeypatch):
+        """Without pathsend (uvicorn, httpx) raw local blobs stream through storage; with the fast path off too."""
+        file_id, content = uploaded
+
+        with patch("src.api.downloads.FileResponse") as file_response:
+            response = await client.get(f"/api/v1/files/{file_id}/download")
+            ranged = await client.get(f"/api/v1/files/{file_id}/download", headers={"Range": "bytes=5-9"})
+        file_response.assert_not_called()
+        assert response.content == content
+        assert ranged.status_code == 206
+        assert ranged.content == content[5:10]
+
+        monkeypatch.setattr(settings, "download_sendfile", False)
+        response = await client.get(f"/api/v1/files/{file_id}/download", headers={"Range": "bytes=5-9"})
+        assert response.status_code == 206
+        assert response.content == content[5:10]
+
+    async def test_version_download_range(self, client: AsyncClient, uploaded):
+        """Version downloads support ranges too."""
+        file_id, content = uploaded
+        versions = (await client.get(f"/api/v1/files/{file_id}/versions")).json()
+
+        response = await client.get(
+            f"/api/v1/files/{file_id}/versions/{versions[0]['id']}/download",
+            headers={"Range": "bytes=10-19"},
+        )
+
+        assert response.status_code == 206
+        assert response.content == content[10:20]
+
+
+@pytest.mark.asyncio
+class TestConditionalDownload:
+    """Tests for ETag / Last-Modified revalidation."""
+
+    @pytest_asyncio.fixture
+    async def uploaded(self, client: AsyncClient, sqlite_uow: SqlAlchemyUoW):
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+        response = await client.post("/api/v1/files/", files={"file": ("notes.txt", b"cached content")})
+        assert response.status_code == 201
+        try:
+            yield response.json()["id"]
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_if_none_match_returns_304_without_storage(self, client: AsyncClient, uploaded):
+        """A matching ETag gives 304 and the blob is never read."""
+        full = await client.get(f"/api/v1/files/{uploaded}/download")
+        assert full.headers["cache-control"] == "private, no-cache"
+
+        with patch("src.infrastructure.storage.LocalBlobStorage.LocalBlobStorage.get") as mock_get:
+            for if_none_match in (full.headers["etag"], f'"other", W/{full.headers["etag"]}', "*"):
+                response = await client.get(
+                    f"/api/v1/files/{uploaded}/download", headers={"If-None-Match": if_none_match}
+                )
+                assert response.status_code == 304
+                assert response.content == b""
+                assert response.headers["etag"] == full.headers["etag"]
+        mock_get.assert_not_called()
+
+        response = await client.get(f"/api/v1/files/{uploaded}/download", headers={"If-None-Match": '"other"'})
+        assert response.status_code == 200
+        assert response.content == b"cached content"
+
+    async def test_if_modified_since(self, client: AsyncClient, uploaded):
+        """If-Modified-Since at or after Last-Modified gives 304, an older date the full file."""
+        full = await client.get(f"/api/v1/files/{uploaded}/download")
+
+        response = await client.get(
+            f"/api/v1/files/{uploaded}/download", headers={"If-Modified-Since": full.headers["last-modified"]}
+        )
+        assert response.status_code == 304
+
+        response = await client.get(
+            f"/api/v1/files/{uploaded}/download", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}
+        )
+        assert response.status_code == 200
+
+        # If-None-Match wins over If-Modified-Since
+        response = await client.get(
+            f"/api/v1/files/{uploaded}/download",
+            headers={"If-None-Match": '"other"', "If-Modified-Since": full.headers["last-modified"]},
+        )
+        assert response.status_code == 200
+
+    async def test_version_download_is_immutable(self, client: AsyncClient, uploaded):
+        """Version downloads may be cached for a long time."""
+        versions = (await client.get(f"/api/v1/files/{uploaded}/versions")).json()
+
+        response = await client.get(f"/api/v1/files/{uploaded}/versions/{versions[0]['id']}/download")
+
+        assert response.status_code == 200
+        assert "immutable" in response.headers["cache-control"]
+        assert "max-age=31536000" in response.headers["cache-control"]
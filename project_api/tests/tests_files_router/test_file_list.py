@@ -156,3 +156,123 @@ class TestFileList:
                 assert "error" in data
         finally:
             app.dependency_overrides.clear()
+
+    async def test_breadcrumbs_of_deep_folder_in_one_query(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+        session_engine,
+    ):
+        """The breadcrumb path runs from the root to the opened folder, and its cost does not grow with depth."""
+        from sqlalchemy import event
+
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+        folders = []
+        for depth in range(12):
+            parent = folders[-1].id if folders else None
+            folders.append(await seed.seed_folder(owner_id=user.id, name=f"level{depth}", parent_folder_id=parent))
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+
+        statements = []
+
+        def count(*args):
+            statements.append(args[2])
+
+        event.listen(session_engine.sync_engine, "before_cursor_execute", count)
+        try:
+            response = await client.get("/api/v1/files/", params={"folder_id": str(folders[0].id)})
+            assert response.status_code == 200
+            shallow = len(statements)
+
+            statements.clear()
+            response = await client.get("/api/v1/files/", params={"folder_id": str(folders[-1].id)})
+            assert response.status_code == 200
+            assert response.json()["breadcrumbs"] == [{"id": str(f.id), "name": f.name} for f in folders]
+            assert len(statements) == shallow
+
+            # Another user's folder is not found, even through the breadcrumb query
+            async def other_user():
+                return UserFromToken(id=uuid.uuid4(), email="other@example.com", display_name="Other")
+
+            app.dependency_overrides[real_current_user] = other_user
+            response = await client.get("/api/v1/files/", params={"folder_id": str(folders[-1].id)})
+            assert response.status_code == 404
+        finally:
+            event.remove(session_engine.sync_engine, "before_cursor_execute", count)
+            app.dependency_overrides.clear()
+
+    async def test_keyset_pages_cover_folder_in_stable_order(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+        monkeypatch,
+    ):
+        """Following next_cursor visits every child once, folders first and then by name; all=true is capped."""
+        from src.config.app_config import settings
+
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+        parent = await seed.seed_folder(owner_id=user.id, name="camera")
+        for name in ("b-dir", "a-dir", "c-dir"):
+            await seed.seed_folder(owner_id=user.id, name=name, parent_folder_id=parent.id)
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+
+        try:
+            contents = {f"IMG_{i:03d}.jpg": b"x" * (i + 1) for i in (7, 3, 5, 1, 6, 2, 4)}
+            for name, content in contents.items():
+                response = await client.post(
+                    "/api/v1/files/", files={"file": (name, content)}, data={"parent_id": str(parent.id)}
+                )
+                assert response.status_code == 201
+
+            pages, cursor = [], None
+            while True:
+                params = {"folder_id": str(parent.id), "limit": 3}
+                if cursor:
+                    params["cursor"] = cursor
+                response = await client.get("/api/v1/files/", params=params)
+                assert response.status_code == 200
+                data = response.json()
+                assert data["breadcrumbs"] == [{"id": str(parent.id), "name": "camera"}]
+                pages.append(data["items"])
+                cursor = data["next_cursor"]
+                if cursor is None:
+                    break
+
+            assert [len(page) for page in pages] == [3, 3, 3, 1]
+            items = [item for page in pages for item in page]
+            assert [item["name"] for item in items] == ["a-dir", "b-dir", "c-dir"] + sorted(contents)
+            assert all(item["size_bytes"] == len(contents[item["name"]]) for item in items if not item["is_folder"])
+
+            response = await client.get("/api/v1/files/", params={"folder_id": str(parent.id), "all": "true"})
+            assert response.status_code == 200
+            assert [item["name"] for item in response.json()["items"]] == [item["name"] for item in items]
+            assert response.json()["next_cursor"] is None
+
+            # A cursor only works for the folder it came from, and garbage is rejected
+            first = await client.get("/api/v1/files/", params={"folder_id": str(parent.id), "limit": 3})
+            response = await client.get("/api/v1/files/", params={"cursor": first.json()["next_cursor"]})
+            assert response.status_code == 400
+            response = await client.get("/api/v1/files/", params={"folder_id": str(parent.id), "cursor": "not-a-cursor"})
+            assert response.status_code == 400
+
+            monkeypatch.setattr(settings, "list_unpaginated_max_items", 5)
+            response = await client.get("/api/v1/files/", params={"folder_id": str(parent.id), "all": "true"})
+            assert response.status_code == 400
+        finally:
+            app.dependency_overrides.clear()
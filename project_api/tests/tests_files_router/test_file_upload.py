@@ -155,3 +155,35 @@ class TestFileUpload:
                 assert "error" in data
         finally:
             app.dependency_overrides.clear()
+
+    async def test_upload_reports_storage_savings(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """A new blob is stored in full; re-uploading the same content stores nothing."""
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+        content = b"savings" * 100
+
+        try:
+            first = await client.post("/api/v1/files/", files={"file": ("a.bin", content)})
+            assert first.status_code == 201
+            assert first.json()["stored_bytes"] == len(content)
+            assert first.json()["saved_bytes"] == 0
+
+            second = await client.post("/api/v1/files/", files={"file": ("b.bin", content)})
+            assert second.status_code == 201
+            assert second.json()["deduplicated"] is True
+            assert second.json()["stored_bytes"] == 0
+            assert second.json()["saved_bytes"] == len(content)
+        finally:
+            app.dependency_overrides.clear()
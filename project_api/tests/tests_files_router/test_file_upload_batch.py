@@ -0,0 +1,211 @@
+"""
+Tests for the batch (multi-file) upload endpoint.
+"""
+import pytest
+import sys
+import uuid
+from pathlib import Path
+from httpx import AsyncClient
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.main import app
+from src.infrastructure.uow import SqlAlchemyUoW
+from tests.seeds import TestDataSeed
+from tests.helpers import AuthTestHelper
+
+
+@pytest.mark.asyncio
+class TestFileUploadBatch:
+    """Tests for POST /files/batch."""
+
+    async def test_batch_upload_creates_files_and_versions(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """Many files land in one request; duplicates dedup, repeated names become versions."""
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+        folder = await seed.seed_folder(owner_id=user.id, name="batch")
+        AuthTestHelper.override_current_user(user)
+
+        try:
+            response = await client.post(
+                "/api/v1/files/",
+                data={"parent_id": str(folder.id)},
+                files={"file": ("existing.txt", b"v1")},
+            )
+            assert response.status_code == 201
+
+            response = await client.post(
+                "/api/v1/files/batch",
+                data={"parent_id": str(folder.id)},
+                files=[
+                    ("files", ("a.txt", b"same", "text/plain")),
+                    ("files", ("b.txt", b"same", "text/plain")),
+                    ("files", ("existing.txt", b"v2", "text/plain")),
+                    ("files", ("a.txt", b"a again", "text/plain")),
+                ],
+            )
+            assert response.status_code == 201
+            data = response.json()
+            assert data["count"] == 4
+            by_position = [(f["name"], f["version"], f["deduplicated"]) for f in data["files"]]
+            assert by_position == [
+                ("a.txt", 1, False),
+                ("b.txt", 1, True),
+                ("existing.txt", 2, False),
+                ("a.txt", 2, False),
+            ]
+
+            listing = await client.get("/api/v1/files/", params={"folder_id": str(folder.id)})
+            items = {item["name"]: item for item in listing.json()["items"]}
+            assert set(items) == {"a.txt", "b.txt", "existing.txt"}
+            assert items["a.txt"]["size_bytes"] == len(b"a again")
+
+            versions = await client.get(f"/api/v1/files/{items['existing.txt']['id']}/versions")
+            assert sorted(v["version_no"] for v in versions.json()) == [1, 2]
+
+            download = await client.get(f"/api/v1/files/{items['existing.txt']['id']}/download")
+            assert download.content == b"v2"
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_batch_upload_invalid_parent_rolls_back(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """A bad parent folder rejects the whole batch and nothing is created."""
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+        AuthTestHelper.override_current_user(user)
+
+        try:
+            response = await client.post(
+                "/api/v1/files/batch",
+                data={"parent_id": str(uuid.uuid4())},
+                files=[("files", ("a.txt", b"a")), ("files", ("b.txt", b"b"))],
+            )
+            assert response.status_code == 404
+
+            listing = await client.get("/api/v1/files/")
+            assert listing.json()["items"] == []
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_batch_upload_requires_files(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """An empty batch is a client error."""
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+        AuthTestHelper.override_current_user(user)
+
+        try:
+            response = await client.post("/api/v1/files/batch", data={"parent_id": ""})
+            assert response.status_code == 400
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_upload_over_existing_folder_name_conflicts(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """A file cannot take the name of a sibling folder - single and batch uploads answer 409 and create nothing."""
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+        await seed.seed_folder(owner_id=user.id, name="report")
+        AuthTestHelper.override_current_user(user)
+
+        try:
+            response = await client.post("/api/v1/files/", files={"file": ("report", b"single")})
+            assert response.status_code == 409
+
+            response = await client.post(
+                "/api/v1/files/batch",
+                files=[("files", ("a.txt", b"a")), ("files", ("report", b"batch"))],
+            )
+            assert response.status_code == 409
+
+            listing = await client.get("/api/v1/files/")
+            assert [(item["name"], item["is_folder"]) for item in listing.json()["items"]] == [("report", True)]
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_concurrent_writers_reuse_blob_and_get_409_on_names(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+        monkeypatch,
+    ):
+        """A hash or name taken between the check and the INSERT: the blob is shared, a name clash is 409, not 500."""
+        from sqlalchemy import func, select
+        from src.domain.entities.blob import Blob
+        from src.infrastructure.repositories.blob_repository import BlobRepo
+        from src.infrastructure.repositories.file_repo import FileRepo
+
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+        AuthTestHelper.override_current_user(user)
+
+        async def nothing_yet(self, *args, **kwargs):
+            return {} if isinstance(self, BlobRepo) else []
+
+        try:
+            response = await client.post("/api/v1/files/", files={"file": ("taken.txt", b"shared")})
+            assert response.status_code == 201
+
+            # Both lookups miss, as if the other writer committed right after them
+            monkeypatch.setattr(BlobRepo, "get_by_hashes", nothing_yet)
+            response = await client.post("/api/v1/files/batch", files=[("files", ("new.txt", b"shared"))])
+            assert response.status_code == 201
+
+            monkeypatch.setattr(FileRepo, "get_by_names_in_folder", nothing_yet)
+            response = await client.post("/api/v1/files/batch", files=[("files", ("taken.txt", b"v2"))])
+            assert response.status_code == 409
+
+            async with sqlite_uow:
+                assert await sqlite_uow.session.scalar(select(func.count()).select_from(Blob)) == 1
+            listing = await client.get("/api/v1/files/")
+            sizes = {item["name"]: item["size_bytes"] for item in listing.json()["items"]}
+            assert sizes == {"new.txt": 6, "taken.txt": 6}
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_name_taken_concurrently_is_409(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+        monkeypatch,
+    ):
+        """Upload, create folder and rename map a sibling inserted after their name check to 409."""
+        from src.infrastructure.repositories.file_repo import FileRepo
+
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+        await seed.seed_file(owner_id=user.id, name="taken")
+        other = await seed.seed_file(owner_id=user.id, name="other")
+        AuthTestHelper.override_current_user(user)
+
+        async def not_found(self, *args, **kwargs):
+            return None
+
+        for lookup in ("get_by_owner_and_name", "get_by_name_and_parent", "get_by_name_in_folder"):
+            monkeypatch.setattr(FileRepo, lookup, not_found)
+
+        try:
+            response = await client.post("/api/v1/files/", files={"file": ("taken", b"data")})
+            assert response.status_code == 409
+            response = await client.post("/api/v1/files/folders", json={"folder_name": "taken"})
+            assert response.status_code == 409
+            response = await client.patch(f"/api/v1/files/{other.id}/rename", json={"new_name": "taken"})
+            assert response.status_code == 409
+        finally:
+            app.dependency_overrides.clear()
@@ -0,0 +1,130 @@
+"""
+Tests for the upload-by-hash (dedup pre-check) endpoint.
+"""
+import hashlib
+import pytest
+import sys
+from pathlib import Path
+from httpx import AsyncClient
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.main import app
+from src.infrastructure.uow import SqlAlchemyUoW
+from tests.seeds import TestDataSeed
+from tests.helpers import AuthTestHelper
+
+
+@pytest.mark.asyncio
+class TestFileUploadByHash:
+    """Tests for POST /files/by-hash."""
+
+    async def test_upload_by_hash_reuses_own_blob(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """Known content lands in another folder without sending bytes."""
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+        folder = await seed.seed_folder(owner_id=user.id, name="copies")
+        content = b"installer bytes"
+        AuthTestHelper.override_current_user(user)
+
+        try:
+            response = await client.post("/api/v1/files/", files={"file": ("setup.exe", content)})
+            assert response.status_code == 201
+
+            response = await client.post("/api/v1/files/by-hash", json={
+                "file_name": "setup.exe",
+                "sha256": hashlib.sha256(content).hexdigest(),
+                "size_bytes": len(content),
+                "parent_folder_id": str(folder.id),
+            })
+            assert response.status_code == 201
+            data = response.json()
+            assert data["name"] == "setup.exe"
+            assert data["version"] == 1
+            assert data["deduplicated"] is True
+
+            listing = await client.get("/api/v1/files/", params={"folder_id": str(folder.id)})
+            assert [item["size_bytes"] for item in listing.json()["items"]] == [len(content)]
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_upload_by_hash_unknown_content(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """Unknown hash or mismatching size asks the client to upload bytes."""
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+        content = b"known"
+        AuthTestHelper.override_current_user(user)
+
+        try:
+            await client.post("/api/v1/files/", files={"file": ("a.txt", content)})
+
+            response = await client.post("/api/v1/files/by-hash", json={
+                "file_name": "b.txt",
+                "sha256": hashlib.sha256(b"other").hexdigest(),
+                "size_bytes": 5,
+            })
+            assert response.status_code == 404
+
+            response = await client.post("/api/v1/files/by-hash", json={
+                "file_name": "b.txt",
+                "sha256": hashlib.sha256(content).hexdigest(),
+                "size_bytes": len(content) + 1,
+            })
+            assert response.status_code == 404
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_upload_by_hash_ignores_other_users_blobs(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """Knowing the hash of another user's file does not grant access to it."""
+        seed = TestDataSeed(sqlite_uow)
+        owner = await seed.seed_user(email="owner@example.com")
+        other = await seed.seed_user(email="other@example.com")
+        content = b"secret report"
+
+        try:
+            AuthTestHelper.override_current_user(owner)
+            await client.post("/api/v1/files/", files={"file": ("report.pdf", content)})
+
+            AuthTestHelper.override_current_user(other)
+            response = await client.post("/api/v1/files/by-hash", json={
+                "file_name": "report.pdf",
+                "sha256": hashlib.sha256(content).hexdigest(),
+                "size_bytes": len(content),
+            })
+            assert response.status_code == 404
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_upload_by_hash_invalid_hash(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """Malformed SHA-256 is rejected by validation."""
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+        AuthTestHelper.override_current_user(user)
+
+        try:
+            response = await client.post("/api/v1/files/by-hash", json={
+                "file_name": "x.txt",
+                "sha256": "not-a-hash",
+                "size_bytes": 1,
+            })
+            assert response.status_code == 422
+        finally:
+            app.dependency_overrides.clear()
@@ -42,7 +42,7 @@ class TestFileVersionDownload:
         
         try:
             # Mock function to return file content
-            async def mock_get(self, file_hash: str):
+            async def mock_get(self, file_hash: str, codec=None):
                 yield b"version 1 content"
             
             # Upload a file first
@@ -125,7 +125,7 @@ class TestFileVersionDownload:
         
         try:
             # Mock function to return file content
-            async def mock_get(self, file_hash: str):
+            async def mock_get(self, file_hash: str, codec=None):
                 yield b"file content"
             
             # Upload a file first
@@ -171,7 +171,7 @@ class TestFileVersionDownload:
         
         try:
             # Mock function to return file content
-            async def mock_get(self, file_hash: str):
+            async def mock_get(self, file_hash: str, codec=None):
                 yield b"owner's file content"
             
             # Owner uploads file
@@ -224,7 +224,7 @@ class TestFileVersionDownload:
         
         try:
             # Mock function to return file content
-            async def mock_get(self, file_hash: str):
+            async def mock_get(self, file_hash: str, codec=None):
                 yield b"PDF version 1 content"
             
             # Upload PDF file
@@ -275,7 +275,7 @@ class TestFileVersionDownload:
         
         try:
             # Mock function to return file content based on hash
-            async def mock_get(self, file_hash: str):
+            async def mock_get(self, file_hash: str, codec=None):
                 yield b"version content: " + file_hash.encode()[:10]
             
             # Upload initial file
@@ -336,7 +336,7 @@ class TestFileVersionDownload:
         
         try:
             # Mock function to return file content
-            async def mock_get(self, file_hash: str):
+            async def mock_get(self, file_hash: str, codec=None):
                 yield b"PDF content binary data"
             
             # Upload PDF file
@@ -0,0 +1,130 @@
+"""
+Tests for streaming ZIP download of a folder.
+"""
+import io
+import os
+import zipfile
+import pytest
+import pytest_asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+from httpx import AsyncClient
+from sqlalchemy import select
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.main import app
+from src.common.utils.zip_utils import ZipEntry, stream_zip
+from src.domain.entities.logbook import LogBook
+from src.infrastructure.uow import SqlAlchemyUoW
+from tests.seeds import TestDataSeed
+
+
+async def _stream(data: bytes, size: int = 64 * 1024):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+@pytest.mark.asyncio
+async def test_stream_zip_picks_compression_per_entry():
+    """Text is deflated, random bytes are stored, and the archive is emitted before later entries are opened."""
+    text, noise = b"line of text\n" * 50_000, os.urandom(200_000)
+    opened = []
+
+    def opener(name, data):
+        def open_stream():
+            opened.append(name)
+            return _stream(data)
+        return open_stream
+
+    entries = [
+        ZipEntry("docs", datetime(2024, 5, 1)),
+        ZipEntry("docs/a.txt", datetime(2024, 5, 1), len(text), opener("a", text)),
+        ZipEntry("docs/b.bin", datetime(2024, 5, 1), len(noise), opener("b", noise)),
+    ]
+    stream = stream_zip(entries)
+    first = await anext(stream)
+    assert first.startswith(b"PK\x03\x04")
+    assert opened == []
+
+    archive = zipfile.ZipFile(io.BytesIO(first + b"".join([chunk async for chunk in stream])))
+    assert archive.testzip() is None
+    assert archive.getinfo("docs/a.txt").compress_type == zipfile.ZIP_DEFLATED
+    assert archive.getinfo("docs/b.bin").compress_type == zipfile.ZIP_STORED
+    assert archive.read("docs/a.txt") == text
+    assert archive.read("docs/b.bin") == noise
+
+
+@pytest.mark.asyncio
+class TestFolderDownloadZip:
+    """Tests for GET /files/{folder_id}/download-zip."""
+
+    @pytest_asyncio.fixture
+    async def user(self, sqlite_uow: SqlAlchemyUoW):
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+        try:
+            yield user
+        finally:
+            app.dependency_overrides.clear()
+
+    async def _folder(self, client: AsyncClient, name: str, parent_id=None) -> str:
+        response = await client.post("/api/v1/files/folders", json={"folder_name": name, "parent_folder_id": parent_id})
+        assert response.status_code == 201
+        return response.json()["id"]
+
+    async def _upload(self, client: AsyncClient, name: str, content: bytes, parent_id=None) -> str:
+        data = {"parent_id": parent_id} if parent_id else {}
+        response = await client.post("/api/v1/files/", files={"file": (name, content)}, data=data)
+        assert response.status_code == 201
+        return response.json()["id"]
+
+    async def test_download_nested_folder(self, client: AsyncClient, sqlite_uow: SqlAlchemyUoW, user):
+        """The whole subtree lands in the archive with its paths; one logbook row covers it."""
+        project = await self._folder(client, "Project")
+        src = await self._folder(client, "src", project)
+        await self._folder(client, "empty", project)
+        readme = b"# Project\n" * 1000
+        code = os.urandom(50_000)
+        await self._upload(client, "README.md", readme, project)
+        await self._upload(client, "main.bin", code, src)
+        await self._upload(client, "outside.txt", b"not in the archive")
+
+        response = await client.get(f"/api/v1/files/{project}/download-zip")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        assert "Project.zip" in response.headers["content-disposition"]
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert sorted(archive.namelist()) == [
+            "Project/", "Project/README.md", "Project/empty/", "Project/src/", "Project/src/main.bin",
+        ]
+        assert archive.read("Project/README.md") == readme
+        assert archive.read("Project/src/main.bin") == code
+
+        async with sqlite_uow:
+            details = (await sqlite_uow.session.execute(select(LogBook.details))).scalars().all()
+        zip_logs = [d for d in details if (d or {}).get("archive") == "zip"]
+        assert len(zip_logs) == 1
+        assert zip_logs[0]["file_count"] == 2
+
+    async def test_only_folders_can_be_zipped(self, client: AsyncClient, user):
+        """A plain file gives 400, an unknown id 404."""
+        file_id = await self._upload(client, "single.txt", b"content")
+
+        response = await client.get(f"/api/v1/files/{file_id}/download-zip")
+        assert response.status_code == 400
+
+        response = await client.get("/api/v1/files/00000000-0000-0000-0000-000000000000/download-zip")
+        assert response.status_code == 404
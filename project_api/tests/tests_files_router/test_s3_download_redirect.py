@@ -0,0 +1,138 @@
+"""
+Tests for presigned-URL redirects on S3 downloads (against a local moto S3 server).
+"""
+import socket
+import pytest
+import pytest_asyncio
+import sys
+from pathlib import Path
+from httpx import AsyncClient
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+moto_server = pytest.importorskip("moto.server")
+
+from src.main import app
+from src.config.app_config import settings
+from src.deps import get_storage
+from src.infrastructure.storage.CompressedBlobStorage import CompressedBlobStorage
+from src.infrastructure.storage.S3BlobStorage import S3BlobStorage
+from src.infrastructure.uow import SqlAlchemyUoW
+from tests.seeds import TestDataSeed
+
+BUCKET = "test-downloads"
+
+
+@pytest.fixture(scope="module")
+def s3_endpoint():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = moto_server.ThreadedMotoServer(ip_address="127.0.0.1", port=port)
+    server.start()
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.stop()
+
+
+@pytest_asyncio.fixture
+async def s3_storage(s3_endpoint):
+    storage = S3BlobStorage(
+        bucket=BUCKET,
+        region="us-east-1",
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+        endpoint_url=s3_endpoint,
+    )
+    # Like the app lifespan: one shared client for the whole test
+    await storage.open()
+    try:
+        async with storage._client() as s3:
+            await s3.create_bucket(Bucket=BUCKET)
+        yield storage
+    finally:
+        await storage.close()
+
+
+@pytest.mark.asyncio
+class TestS3DownloadRedirect:
+    """Tests for the 302-to-presigned-GET download mode."""
+
+    async def _login(self, sqlite_uow: SqlAlchemyUoW) -> None:
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+
+    async def test_download_redirects_to_presigned_url(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+        s3_storage: S3BlobStorage,
+        monkeypatch,
+    ):
+        """The API answers 302; the presigned URL serves the bytes with the original filename and type."""
+        monkeypatch.setattr(settings, "s3_download_redirect", True)
+        await self._login(sqlite_uow)
+        app.dependency_overrides[get_storage] = lambda: s3_storage
+        content = b"%PDF-1.4 quarterly report"
+
+        try:
+            response = await client.post(
+                "/api/v1/files/", files={"file": ("raport kwartalny.pdf", content, "application/pdf")}
+            )
+            assert response.status_code == 201
+            file_id = response.json()["id"]
+
+            response = await client.get(f"/api/v1/files/{file_id}/download")
+            assert response.status_code == 302
+            assert response.headers["cache-control"] == "no-store"
+            location = response.headers["location"]
+
+            async with AsyncClient() as s3_client:
+                s3_response = await s3_client.get(location)
+            assert s3_response.status_code == 200
+            assert s3_response.content == content
+            assert s3_response.headers["content-type"] == "application/pdf"
+            assert s3_response.headers["content-disposition"] == "attachment; filename*=utf-8''raport%20kwartalny.pdf"
+
+            # With redirects off the API proxies the bytes as before
+            monkeypatch.setattr(settings, "s3_download_redirect", False)
+            response = await client.get(f"/api/v1/files/{file_id}/download")
+            assert response.status_code == 200
+            assert response.content == content
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_compressed_blob_is_proxied(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+        s3_storage: S3BlobStorage,
+        monkeypatch,
+    ):
+        """A blob stored compressed cannot be handed to the client as-is, so the API streams it."""
+        monkeypatch.setattr(settings, "s3_download_redirect", True)
+        await self._login(sqlite_uow)
+        storage = CompressedBlobStorage(s3_storage)
+        app.dependency_overrides[get_storage] = lambda: storage
+        content = b"id,name,amount\n" + b"1,alice,10\n" * 5000
+
+        try:
+            response = await client.post("/api/v1/files/", files={"file": ("data.csv", content)})
+            assert response.status_code == 201
+
+            response = await client.get(f"/api/v1/files/{response.json()['id']}/download")
+            assert response.status_code == 200
+            assert response.content == content
+        finally:
+            app.dependency_overrides.clear()
@@ -0,0 +1,138 @@
+"""
+Tests for upload admission control (bytes in flight).
+"""
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+from httpx import AsyncClient
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.main import app
+from src.api.upload_admission import UploadAdmissionController, upload_admission
+from src.infrastructure.uow import SqlAlchemyUoW
+from tests.seeds import TestDataSeed
+
+
+@pytest.mark.asyncio
+class TestUploadAdmissionController:
+    """Tests for the admission controller itself."""
+
+    async def test_queued_request_admitted_after_release(self):
+        """A request over the process limit waits and is admitted once bytes are released."""
+        controller = UploadAdmissionController(max_bytes=100, max_user_bytes=0, queue_timeout=5)
+        assert await controller.acquire("a", 80)
+
+        waiter = asyncio.create_task(controller.acquire("b", 50))
+        await asyncio.sleep(0.01)
+        assert controller.snapshot()["queued"] == 1
+
+        await controller.release("a", 80)
+        assert await waiter
+        assert controller.snapshot()["bytes_in_flight"] == 50
+
+    async def test_rejects_after_queue_timeout(self):
+        """Without free capacity the request is rejected after the queue timeout."""
+        controller = UploadAdmissionController(max_bytes=0, max_user_bytes=100, queue_timeout=0.01)
+        assert await controller.acquire("a", 100)
+
+        assert not await controller.acquire("a", 1)
+        # Limit per użytkownik nie blokuje innych użytkowników
+        assert await controller.acquire("b", 100)
+        assert controller.snapshot()["rejected_total"] == 1
+
+    async def test_oversized_upload_takes_whole_budget(self):
+        """An upload larger than the limit is charged the limit, so it can still run alone."""
+        controller = UploadAdmissionController(max_bytes=100, max_user_bytes=50, queue_timeout=0)
+
+        assert controller.cost(10_000) == 50
+        assert controller.cost(10) == 10
+
+
+@pytest.mark.asyncio
+class TestUploadAdmissionMiddleware:
+    """Tests for the middleware in front of upload routes."""
+
+    async def test_upload_rejected_with_retry_after(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+        monkeypatch,
+    ):
+        """When the budget is taken, uploads get 503 + Retry-After and other routes still work."""
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+        monkeypatch.setattr(upload_admission, "max_bytes", 1024)
+        monkeypatch.setattr(upload_admission, "queue_timeout", 0.01)
+        await upload_admission.acquire("ip:someone-else", 1024)
+        held = True
+
+        try:
+            response = await client.post("/api/v1/files/", files={"file": ("a.txt", b"content")})
+            assert response.status_code == 503
+            assert int(response.headers["retry-after"]) > 0
+
+            listing = await client.get("/api/v1/files/")
+            assert listing.status_code == 200
+
+            metrics = (await client.get("/api/v1/metrics/uploads")).json()
+            assert metrics["bytes_in_flight"] == 1024
+            assert metrics["rejected_total"] >= 1
+
+            await upload_admission.release("ip:someone-else", 1024)
+            held = False
+            response = await client.post("/api/v1/files/", files={"file": ("a.txt", b"content")})
+            assert response.status_code == 201
+            assert upload_admission.snapshot()["bytes_in_flight"] == 0
+        finally:
+            if held:
+                await upload_admission.release("ip:someone-else", 1024)
+            app.dependency_overrides.clear()
+
+    async def test_upload_metrics_require_login(self, client: AsyncClient):
+        """Upload metrics are not served to anonymous callers."""
+        response = await client.get("/api/v1/metrics/uploads")
+        assert response.status_code == 401
+
+    async def test_budget_released_before_background_tasks(self):
+        """The budget is returned once the response is sent, not after the background work that follows it."""
+        from src.api.upload_admission import UploadAdmissionMiddleware
+
+        controller = UploadAdmissionController(max_bytes=1024, max_user_bytes=0, queue_timeout=0)
+        in_flight_during_background = []
+
+        async def endpoint(scope, receive, send):
+            await send({"type": "http.response.start", "status": 201, "headers": []})
+            await send({"type": "http.response.body", "body": b"{}"})
+            # Like Starlette BackgroundTasks: runs after the response is sent, inside the same app call
+            in_flight_during_background.append(controller.snapshot()["bytes_in_flight"])
+
+        async def receive():
+            return {"type": "http.request", "body": b"content", "more_body": False}
+
+        async def send(message):
+            pass
+
+        middleware = UploadAdmissionMiddleware(endpoint, controller, prefix="/api/v1")
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/api/v1/files/",
+            "headers": [(b"content-length", b"7")],
+            "client": ("127.0.0.1", 1234),
+        }
+        await middleware(scope, receive, send)
+
+        assert in_flight_during_background == [0]
+        assert controller.snapshot()["bytes_in_flight"] == 0
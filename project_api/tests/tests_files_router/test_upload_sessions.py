@@ -0,0 +1,259 @@
+"""
+Tests for resumable (chunked) upload sessions.
+"""
+import os
+import pytest
+import sys
+from pathlib import Path
+import uuid
+from httpx import AsyncClient
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.main import app
+from src.infrastructure.uow import SqlAlchemyUoW
+from tests.helpers import AuthTestHelper
+
+UPLOADS_URL = "/api/v1/files/uploads/"
+MB = 1024 * 1024
+
+
+@pytest.mark.asyncio
+class TestUploadSessions:
+    """Tests for the create / put chunk / status / commit flow."""
+
+    async def test_chunked_upload_out_of_order_and_commit(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """Chunks sent in any order are assembled into one file version."""
+        await AuthTestHelper.login_as_seed_user(sqlite_uow)
+        content = os.urandom(3 * MB) + b"tail"
+        chunk_size = MB
+
+        try:
+            response = await client.post(UPLOADS_URL, json={
+                "file_name": "big.bin",
+                "size_bytes": len(content),
+                "chunk_size": chunk_size,
+            })
+            assert response.status_code == 201
+            session = response.json()
+            assert session["chunk_count"] == 4
+            upload_id = session["upload_id"]
+
+            for chunk_no in (3, 1, 0, 2):
+                chunk = content[chunk_no * chunk_size:(chunk_no + 1) * chunk_size]
+                response = await client.put(f"{UPLOADS_URL}{upload_id}/chunks/{chunk_no}", content=chunk)
+                assert response.status_code == 200
+                assert response.json()["size_bytes"] == len(chunk)
+
+            response = await client.get(f"{UPLOADS_URL}{upload_id}")
+            assert response.status_code == 200
+            status = response.json()
+            assert [c["chunk_no"] for c in status["received_chunks"]] == [0, 1, 2, 3]
+            assert [c["offset"] for c in status["received_chunks"]] == [0, MB, 2 * MB, 3 * MB]
+            assert status["received_bytes"] == len(content)
+
+            response = await client.post(f"{UPLOADS_URL}{upload_id}/commit")
+            assert response.status_code == 201
+            data = response.json()
+            assert data["name"] == "big.bin"
+            assert data["version"] == 1
+
+            # Sesja po commicie już nie istnieje
+            response = await client.get(f"{UPLOADS_URL}{upload_id}")
+            assert response.status_code == 404
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_commit_incomplete_upload(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """Commit with missing chunks returns 409 and the session stays resumable."""
+        await AuthTestHelper.login_as_seed_user(sqlite_uow)
+
+        try:
+            response = await client.post(UPLOADS_URL, json={
+                "file_name": "partial.bin",
+                "size_bytes": MB + 10,
+                "chunk_size": MB,
+            })
+            upload_id = response.json()["upload_id"]
+            await client.put(f"{UPLOADS_URL}{upload_id}/chunks/0", content=b"a" * MB)
+
+            response = await client.post(f"{UPLOADS_URL}{upload_id}/commit")
+            assert response.status_code == 409
+
+            # Retry of the missing chunk completes the upload
+            await client.put(f"{UPLOADS_URL}{upload_id}/chunks/1", content=b"b" * 10)
+            response = await client.post(f"{UPLOADS_URL}{upload_id}/commit")
+            assert response.status_code == 201
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_chunk_with_wrong_size_rejected(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """A chunk larger than the session chunk size is rejected."""
+        await AuthTestHelper.login_as_seed_user(sqlite_uow)
+
+        try:
+            response = await client.post(UPLOADS_URL, json={
+                "file_name": "x.bin",
+                "size_bytes": 2 * MB,
+                "chunk_size": MB,
+            })
+            upload_id = response.json()["upload_id"]
+
+            response = await client.put(f"{UPLOADS_URL}{upload_id}/chunks/0", content=b"a" * (MB + 1))
+            assert response.status_code == 400
+
+            response = await client.put(f"{UPLOADS_URL}{upload_id}/chunks/5", content=b"a" * MB)
+            assert response.status_code == 400
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_chunk_size_below_minimum_rejected(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """Chunks below the minimum are rejected unless the whole file fits in one chunk."""
+        await AuthTestHelper.login_as_seed_user(sqlite_uow)
+
+        try:
+            response = await client.post(UPLOADS_URL, json={
+                "file_name": "tiny-chunks.bin",
+                "size_bytes": 2 * MB,
+                "chunk_size": 64 * 1024,
+            })
+            assert response.status_code == 400
+
+            response = await client.post(UPLOADS_URL, json={
+                "file_name": "small.bin",
+                "size_bytes": 100,
+                "chunk_size": 100,
+            })
+            assert response.status_code == 201
+            assert response.json()["chunk_count"] == 1
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_create_session_too_large(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """Declared size above the upload limit is rejected up front."""
+        await AuthTestHelper.login_as_seed_user(sqlite_uow)
+
+        try:
+            response = await client.post(UPLOADS_URL, json={
+                "file_name": "huge.bin",
+                "size_bytes": 1024 * 1024 * 1024 * 10,
+            })
+            assert response.status_code == 413
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_session_of_other_user_not_found(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """Unknown or foreign upload sessions return 404."""
+        await AuthTestHelper.login_as_seed_user(sqlite_uow)
+
+        try:
+            response = await client.get(f"{UPLOADS_URL}{uuid.uuid4()}")
+            assert response.status_code == 404
+
+            response = await client.put(f"{UPLOADS_URL}{uuid.uuid4()}/chunks/0", content=b"abc")
+            assert response.status_code == 404
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_session_finished_concurrently_is_not_committed_twice(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+        monkeypatch,
+    ):
+        """A commit or abort that loses the race for the session gets 404 and creates no file version."""
+        from src.application.file_service import FileService
+
+        await AuthTestHelper.login_as_seed_user(sqlite_uow)
+        real_get_owned = FileService._get_owned_upload_session
+
+        async def get_owned_then_finished_elsewhere(self, uow, user_id, upload_id):
+            upload_session = await real_get_owned(self, uow, user_id, upload_id)
+            # Another request commits the same session right after our ownership check
+            async with uow:
+                await uow.upload_sessions.delete_by_id(upload_id)
+            return upload_session
+
+        try:
+            response = await client.post(UPLOADS_URL, json={"file_name": "race.bin", "size_bytes": 10, "chunk_size": 10})
+            upload_id = response.json()["upload_id"]
+            await client.put(f"{UPLOADS_URL}{upload_id}/chunks/0", content=b"a" * 10)
+
+            monkeypatch.setattr(FileService, "_get_owned_upload_session", get_owned_then_finished_elsewhere)
+            response = await client.post(f"{UPLOADS_URL}{upload_id}/commit")
+            assert response.status_code == 404
+
+            listing = await client.get("/api/v1/files/")
+            assert listing.json()["items"] == []
+
+            response = await client.post(UPLOADS_URL, json={"file_name": "race.bin", "size_bytes": 10, "chunk_size": 10})
+            response = await client.delete(f"{UPLOADS_URL}{response.json()['upload_id']}")
+            assert response.status_code == 404
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_expired_sessions_are_swept_with_their_chunks(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """Sessions older than the TTL are deleted together with their stored chunks; fresh ones stay."""
+        from sqlalchemy import update
+        from src.deps import container
+        from src.domain.entities.upload_session import UploadSession
+        from src.common.utils.time_utils import utcnow
+        from datetime import timedelta
+
+        await AuthTestHelper.login_as_seed_user(sqlite_uow)
+
+        try:
+            upload_ids = []
+            for name in ("abandoned.bin", "fresh.bin"):
+                response = await client.post(UPLOADS_URL, json={"file_name": name, "size_bytes": 10, "chunk_size": 10})
+                upload_ids.append(response.json()["upload_id"])
+                await client.put(f"{UPLOADS_URL}{upload_ids[-1]}/chunks/0", content=b"a" * 10)
+            abandoned, fresh = upload_ids
+
+            async with sqlite_uow:
+                await sqlite_uow.session.execute(
+                    update(UploadSession)
+                    .where(UploadSession.id == uuid.UUID(abandoned))
+                    .values(created_at=utcnow() - timedelta(days=2))
+                )
+
+            service = container.build().file_service
+            assert await service.expire_upload_sessions(sqlite_uow) == 1
+
+            assert (await client.get(f"{UPLOADS_URL}{abandoned}")).status_code == 404
+            assert await service.storage.list_chunks(abandoned) == {}
+            response = await client.get(f"{UPLOADS_URL}{fresh}")
+            assert response.status_code == 200
+            assert response.json()["received_bytes"] == 10
+        finally:
+            app.dependency_overrides.clear()
@@ -0,0 +1,249 @@
+"""
+Tests for delta-encoded file versions.
+"""
+import io
+import os
+import pytest
+import sys
+from pathlib import Path
+from httpx import AsyncClient
+from sqlalchemy import select
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.main import app
+from src.config.app_config import settings
+from src.common.utils.delta_utils import DeltaTooLargeError, apply_delta, encode_delta
+from src.application.file_service import FileService
+from src.common.utils.stream_utils import AsyncBytesIO
+from src.domain.entities.blob import Blob
+from src.infrastructure.uow import SqlAlchemyUoW
+from tests.seeds import TestDataSeed
+
+
+async def _iterate(data: bytes, size: int = 64 * 1024):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def _roundtrip(base: bytes, target: bytes) -> tuple[bytes, int]:
+    delta = io.BytesIO()
+    delta_size = await encode_delta(_iterate(base), _iterate(target), delta, max_size=len(target) + 1024)
+    restored = b"".join([d async for d in apply_delta(io.BytesIO(base), AsyncBytesIO(delta.getvalue()))])
+    return restored, delta_size
+
+
+@pytest.mark.asyncio
+class TestDeltaEncoding:
+    """Tests for the binary delta format."""
+
+    async def test_small_edit_gives_small_delta(self):
+        """A few changed bytes produce a delta far smaller than the version."""
+        base = os.urandom(512 * 1024)
+        target = base[:200_000] + b"patched" + base[200_007:]
+
+        restored, delta_size = await _roundtrip(base, target)
+
+        assert restored == target
+        assert delta_size < 32 * 1024
+
+    async def test_unrelated_content_roundtrips(self):
+        """Without any shared chunks the delta is one insert and still restores exactly."""
+        base, target = os.urandom(100_000), os.urandom(80_000)
+
+        restored, _ = await _roundtrip(base, target)
+
+        assert restored == target
+
+    async def test_delta_too_large(self):
+        """Encoding stops once the delta exceeds its budget."""
+        with pytest.raises(DeltaTooLargeError):
+            await encode_delta(_iterate(os.urandom(50_000)), _iterate(os.urandom(50_000)), io.BytesIO(), max_size=1000)
+
+
+@pytest.mark.asyncio
+class TestVersionCompaction:
+    """Tests for background compaction and on-the-fly rebuild of old versions."""
+
+    async def test_old_versions_become_deltas_and_still_download(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+        monkeypatch,
+    ):
+        """Older versions are stored as deltas after upload; every version downloads intact."""
+        monkeypatch.setattr(settings, "version_delta_compaction", True)
+        monkeypatch.setattr(settings, "version_delta_min_size_kb", 1)
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+
+        v1 = os.urandom(300 * 1024)
+        v2 = v1[:100_000] + b"second" + v1[100_006:]
+        v3 = v2[:250_000] + b"third" + v2[250_005:]
+
+        try:
+            for content in (v1, v2, v3):
+                response = await client.post("/api/v1/files/", files={"file": ("disk.img", content)})
+                assert response.status_code == 201
+            file_id = response.json()["id"]
+
+            async with sqlite_uow:
+                blobs = (await sqlite_uow.session.execute(select(Blob))).scalars().all()
+                by_hash = {b.sha256: b for b in blobs}
+                deltas = [b for b in blobs if b.delta_base_id]
+            assert len(by_hash) == 3
+            assert len(deltas) == 2
+
+            versions = (await client.get(f"/api/v1/files/{file_id}/versions")).json()
+            contents = {v["version_no"]: v for v in versions}
+            for version_no, expected in ((1, v1), (2, v2), (3, v3)):
+                response = await client.get(
+                    f"/api/v1/files/{file_id}/versions/{contents[version_no]['id']}/download"
+                )
+                assert response.status_code == 200
+                assert response.content == expected
+
+            response = await client.get(f"/api/v1/files/{file_id}/download")
+            assert response.content == v3
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_blob_current_elsewhere_stays_full(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+        monkeypatch,
+    ):
+        """An old version whose content is another file's current version is not delta-encoded."""
+        monkeypatch.setattr(settings, "version_delta_compaction", True)
+        monkeypatch.setattr(settings, "version_delta_min_size_kb", 1)
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+
+        shared = os.urandom(64 * 1024)
+        try:
+            await client.post("/api/v1/files/", files={"file": ("copy.bin", shared)})
+            await client.post("/api/v1/files/", files={"file": ("main.bin", shared)})
+            await client.post("/api/v1/files/", files={"file": ("main.bin", shared + b"tail")})
+
+            async with sqlite_uow:
+                blobs = (await sqlite_uow.session.execute(select(Blob))).scalars().all()
+            assert all(b.delta_base_id is None for b in blobs)
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_compressed_deltas_keep_their_own_codec(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+        monkeypatch,
+        tmp_path,
+    ):
+        """With compression on, a delta's row carries the codec it was stored with and old versions still download."""
+        from src.deps import get_storage
+        from src.infrastructure.storage.CompressedBlobStorage import CompressedBlobStorage
+        from src.infrastructure.storage.LocalBlobStorage import LocalBlobStorage
+
+        monkeypatch.setattr(settings, "version_delta_compaction", True)
+        monkeypatch.setattr(settings, "version_delta_min_size_kb", 1)
+        storage = CompressedBlobStorage(LocalBlobStorage(base_path=str(tmp_path)))
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+        app.dependency_overrides[get_storage] = lambda: storage
+
+        v1 = b"".join(b"%d;customer-%d;%d\n" % (i, i % 97, i * 7) for i in range(30_000))
+        v2 = v1[:100_000] + b"edited" + v1[100_006:]
+
+        try:
+            for content in (v1, v2):
+                response = await client.post("/api/v1/files/", files={"file": ("export.csv", content)})
+                assert response.status_code == 201
+            file_id = response.json()["id"]
+
+            async with sqlite_uow:
+                [delta] = (await sqlite_uow.session.execute(select(Blob).where(Blob.delta_base_id.is_not(None)))).scalars().all()
+                base = await sqlite_uow.blobs.get_by_id(delta.delta_base_id)
+            assert base.codec == "zlib"
+            assert await storage.exists(FileService._delta_key(delta.sha256, base.sha256), delta.codec)
+
+            versions = (await client.get(f"/api/v1/files/{file_id}/versions")).json()
+            for version in versions:
+                response = await client.get(f"/api/v1/files/{file_id}/versions/{version['id']}/download")
+                assert response.status_code == 200
+                assert response.content == (v1 if version["version_no"] == 1 else v2)
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_garbage_collection_after_compaction_keeps_every_version(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+        monkeypatch,
+        tmp_path,
+    ):
+        """With chunking on, the sweep after compaction frees the old full copy's chunks, not the deltas."""
+        from src.deps import get_storage
+        from src.infrastructure.storage.ChunkedBlobStorage import ChunkedBlobStorage
+        from src.infrastructure.storage.LocalBlobStorage import LocalBlobStorage
+
+        monkeypatch.setattr(settings, "version_delta_compaction", True)
+        monkeypatch.setattr(settings, "version_delta_min_size_kb", 1)
+        monkeypatch.setattr(settings, "blob_gc_min_age_hours", 0)
+        storage = ChunkedBlobStorage(LocalBlobStorage(base_path=str(tmp_path)), 4 * 1024, 16 * 1024, 64 * 1024)
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+        app.dependency_overrides[get_storage] = lambda: storage
+
+        v1 = os.urandom(300 * 1024)
+        v2 = os.urandom(100 * 1024) + v1[100 * 1024:]
+
+        try:
+            for content in (v1, v2):
+                response = await client.post("/api/v1/files/", files={"file": ("disk.img", content)})
+                assert response.status_code == 201
+            file_id = response.json()["id"]
+
+            removed = await FileService(logbook=None, storage=storage).collect_blob_garbage(sqlite_uow)
+            assert removed > 0
+
+            versions = (await client.get(f"/api/v1/files/{file_id}/versions")).json()
+            for version in versions:
+                response = await client.get(f"/api/v1/files/{file_id}/versions/{version['id']}/download")
+                assert response.status_code == 200
+                assert response.content == (v1 if version["version_no"] == 1 else v2)
+        finally:
+            app.dependency_overrides.clear()
@@ -21,6 +21,20 @@ from src.main import app
 from src.infrastructure.uow import SqlAlchemyUoW
 from tests.seeds import TestDataSeed
 
+def test_plan_zip_import_builds_tree_from_central_directory():
+    """Implicit parents are added parent-first; unsafe, macOS and repeated entries are dropped."""
+    from src.common.utils.zip_utils import plan_zip_import
+
+    members = [zipfile.ZipInfo(name) for name in (
+        "a/b/c.txt", "a/", "x.txt", "a/b/c.txt", "../evil.txt", "d/e/", "__MACOSX/a/._c.txt", "a//z.txt",
+    )]
+
+    folders, files = plan_zip_import(members)
+
+    assert folders == ["a", "d", "a/b", "d/e"]
+    assert [(folder, name) for folder, name, _ in files] == [("a/b", "c.txt"), ("a", "z.txt"), ("", "x.txt")]
+
+
 @pytest.mark.asyncio
 class TestZipUpload:
     """Tests for ZIP file upload endpoint."""
@@ -51,7 +65,7 @@ class TestZipUpload:
             zip_buffer.seek(0)
             
             # Mock the storage and service
-            async def mock_get(self, file_hash: str):
+            async def mock_get(self, file_hash: str, codec=None):
                 yield b"test file content"
             
             with patch("src.infrastructure.storage.LocalBlobStorage.LocalBlobStorage.save") as mock_save, \
@@ -63,9 +77,15 @@ class TestZipUpload:
                     files={"file": ("test.zip", zip_buffer.getvalue(), "application/zip")},
                 )
             
-            assert response.status_code == 200
+            assert response.status_code == 202
             data = response.json()
-            assert "id" in data or "status" in data
+            assert data["status"] == "queued"
+
+            response = await client.get(f"/api/v1/files/zip/jobs/{data['job_id']}")
+            assert response.status_code == 200
+            job = response.json()
+            assert job["status"] == "completed"
+            assert job["entries_processed"] == job["entries_total"] == 2
         finally:
             app.dependency_overrides.clear()
     
@@ -123,7 +143,7 @@ class TestZipUpload:
             zip_buffer.seek(0)
             
             # Mock storage
-            async def mock_get(self, file_hash: str):
+            async def mock_get(self, file_hash: str, codec=None):
                 yield b"test file content"
             
             with patch("src.infrastructure.storage.LocalBlobStorage.LocalBlobStorage.save") as mock_save, \
@@ -136,7 +156,7 @@ class TestZipUpload:
                     files={"file": ("root.zip", zip_buffer.getvalue(), "application/zip")},
                 )
             
-            assert response.status_code == 200
+            assert response.status_code == 202
         finally:
             app.dependency_overrides.clear()
     
@@ -166,7 +186,7 @@ class TestZipUpload:
             zip_buffer.seek(0)
             
             # Mock storage
-            async def mock_get(self, file_hash: str):
+            async def mock_get(self, file_hash: str, codec=None):
                 yield b"test file content"
             
             with patch("src.infrastructure.storage.LocalBlobStorage.LocalBlobStorage.save") as mock_save, \
@@ -180,7 +200,7 @@ class TestZipUpload:
                     files={"file": ("folder.zip", zip_buffer.getvalue(), "application/zip")},
                 )
             
-            assert response.status_code == 200
+            assert response.status_code == 202
         finally:
             app.dependency_overrides.clear()
     
@@ -211,7 +231,7 @@ class TestZipUpload:
             zip_buffer.seek(0)
             
             # Mock storage
-            async def mock_get(self, file_hash: str):
+            async def mock_get(self, file_hash: str, codec=None):
                 yield b"test file content"
             
             with patch("src.infrastructure.storage.LocalBlobStorage.LocalBlobStorage.save") as mock_save, \
@@ -223,7 +243,7 @@ class TestZipUpload:
                     files={"file": ("nested.zip", zip_buffer.getvalue(), "application/zip")},
                 )
             
-            assert response.status_code == 200
+            assert response.status_code == 202
         finally:
             app.dependency_overrides.clear()
     
@@ -252,7 +272,7 @@ class TestZipUpload:
             zip_buffer.seek(0)
             
             # Mock storage
-            async def mock_get(self, file_hash: str):
+            async def mock_get(self, file_hash: str, codec=None):
                 yield b"test file content"
             
             with patch("src.infrastructure.storage.LocalBlobStorage.LocalBlobStorage.save") as mock_save, \
@@ -265,7 +285,7 @@ class TestZipUpload:
                 )
             
             # Empty ZIP should still process (may or may not create files)
-            assert response.status_code == 200
+            assert response.status_code == 202
         finally:
             app.dependency_overrides.clear()
     
@@ -379,7 +399,7 @@ class TestZipUpload:
             zip_buffer.seek(0)
             
             # Mock storage
-            async def mock_get(self, file_hash: str):
+            async def mock_get(self, file_hash: str, codec=None):
                 yield b"test file content"
             
             with patch("src.infrastructure.storage.LocalBlobStorage.LocalBlobStorage.save") as mock_save, \
@@ -391,6 +411,456 @@ class TestZipUpload:
                     files={"file": ("large.zip", zip_buffer.getvalue(), "application/zip")},
                 )
             
-            assert response.status_code == 200
+            assert response.status_code == 202
         finally:
             app.dependency_overrides.clear()
+
+    async def test_upload_zip_streams_members(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """A large member is staged chunk by chunk: peak memory stays a few MB and the blob round-trips."""
+        import tracemalloc
+        from sqlalchemy import select
+        from src.domain.entities.blob import Blob
+
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+
+        try:
+            member_size = 48 * 1024 * 1024
+            zip_buffer = io.BytesIO()
+            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                with zip_file.open("big/zeros.bin", "w") as dest:
+                    for _ in range(48):
+                        dest.write(bytes(1024 * 1024))
+                zip_file.writestr("big/copy.bin", b"")
+            archive = zip_buffer.getvalue()
+
+            tracemalloc.start()
+            try:
+                response = await client.post(
+                    "/api/v1/files/zip",
+                    files={"file": ("streamed.zip", archive, "application/zip")},
+                )
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            assert response.status_code == 202
+            job = (await client.get(f"/api/v1/files/zip/jobs/{response.json()['job_id']}")).json()
+            assert job["status"] == "completed"
+            assert job["entries_processed"] == 2
+            assert peak < 16 * 1024 * 1024
+
+            async with sqlite_uow:
+                sizes = (await sqlite_uow.session.execute(select(Blob.size_bytes))).scalars().all()
+            assert sorted(sizes) == [0, member_size]
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_reimport_reuses_tree_and_adds_versions(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+        session_engine,
+    ):
+        """Importing into an existing tree reuses folders and versions files; the statement count does not grow with entries."""
+        from sqlalchemy import event, select
+        from src.domain.entities.file import File
+        from src.domain.entities.file_version import FileVersion
+
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+
+        def archive(files: int, tag: bytes) -> bytes:
+            zip_buffer = io.BytesIO()
+            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                for i in range(files):
+                    zip_file.writestr(f"docs/part{i % 5}/sub/file{i}.txt", b"shared" if i == 0 else tag + str(i).encode())
+            return zip_buffer.getvalue()
+
+        statements = []
+
+        def count(*args):
+            statements.append(args[2])
+
+        event.listen(session_engine.sync_engine, "before_cursor_execute", count)
+        try:
+            response = await client.post("/api/v1/files/zip", files={"file": ("tree.zip", archive(10, b"v1-"), "application/zip")})
+            assert response.status_code == 202
+            small_import = len(statements)
+
+            statements.clear()
+            response = await client.post("/api/v1/files/zip", files={"file": ("tree.zip", archive(200, b"v2-"), "application/zip")})
+            assert response.status_code == 202
+            # Per tree level and per table, not per entry
+            assert len(statements) <= small_import + 5
+            job = (await client.get(f"/api/v1/files/zip/jobs/{response.json()['job_id']}")).json()
+            assert job["entries_processed"] == 200
+            assert job["dedup_hits"] == 1
+        finally:
+            event.remove(session_engine.sync_engine, "before_cursor_execute", count)
+            app.dependency_overrides.clear()
+
+        async with sqlite_uow:
+            files = (await sqlite_uow.session.execute(
+                select(File.name, File.is_folder, FileVersion.version_no)
+                .outerjoin(FileVersion, FileVersion.id == File.current_version_id)
+                .where(File.owner_id == user.id)
+            )).all()
+        folders = [f.name for f in files if f.is_folder]
+        assert sorted(folders) == sorted(["tree", "docs"] + [f"part{i}" for i in range(5)] + ["sub"] * 5)
+        versions = {f.name: f.version_no for f in files if not f.is_folder}
+        assert len(versions) == 200
+        assert versions["file0.txt"] == 2 and versions["file9.txt"] == 2
+        assert versions["file10.txt"] == 1
+
+    async def test_name_clashes_are_skipped_and_reported(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+    ):
+        """A member whose name is taken by the other kind (file vs folder) is skipped with everything under it."""
+        from sqlalchemy import select
+        from src.domain.entities.file import File
+
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+        tree = await seed.seed_folder(owner_id=user.id, name="tree")
+        await seed.seed_file(owner_id=user.id, name="docs", parent_folder_id=tree.id)
+        await seed.seed_folder(owner_id=user.id, name="notes.txt", parent_folder_id=tree.id)
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+
+        zip_buffer = io.BytesIO()
+        with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
+            for name in ("docs/a.txt", "notes.txt", "ok.txt", "x", "x/y.txt"):
+                zip_file.writestr(name, name.encode())
+
+        try:
+            response = await client.post("/api/v1/files/zip", files={"file": ("tree.zip", zip_buffer.getvalue(), "application/zip")})
+            assert response.status_code == 202
+            job = (await client.get(f"/api/v1/files/zip/jobs/{response.json()['job_id']}")).json()
+        finally:
+            app.dependency_overrides.clear()
+
+        assert job["status"] == "completed"
+        assert job["entries_processed"] == 5
+        assert job["error_count"] == 3
+        assert sorted(error["path"] for error in job["errors"]) == ["docs/a.txt", "notes.txt", "x"]
+
+        async with sqlite_uow:
+            names = (await sqlite_uow.session.execute(
+                select(File.name, File.is_folder).where(File.parent_folder_id == tree.id)
+            )).all()
+        assert sorted(names) == [("docs", False), ("notes.txt", True), ("ok.txt", False), ("x", True)]
+
+    async def test_batch_retries_after_concurrent_name_clash(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+        monkeypatch,
+    ):
+        """A sibling created after the batch read the folder rolls the batch back; the retry skips that member."""
+        from src.infrastructure.repositories.file_repo import FileRepo
+
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+        tree = await seed.seed_folder(owner_id=user.id, name="tree")
+        await seed.seed_folder(owner_id=user.id, name="a.txt", parent_folder_id=tree.id)
+
+        real_get_children = FileRepo.get_children
+        calls = []
+
+        async def stale_first_read(self, owner_id, parent_ids):
+            calls.append(parent_ids)
+            return [] if len(calls) == 1 else await real_get_children(self, owner_id, parent_ids)
+
+        monkeypatch.setattr(FileRepo, "get_children", stale_first_read)
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+
+        zip_buffer = io.BytesIO()
+        with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
+            zip_file.writestr("a.txt", b"a")
+            zip_file.writestr("b.txt", b"b")
+
+        try:
+            response = await client.post("/api/v1/files/zip", files={"file": ("tree.zip", zip_buffer.getvalue(), "application/zip")})
+            assert response.status_code == 202
+            job = (await client.get(f"/api/v1/files/zip/jobs/{response.json()['job_id']}")).json()
+            listing = (await client.get("/api/v1/files/", params={"folder_id": str(tree.id)})).json()
+        finally:
+            app.dependency_overrides.clear()
+
+        assert job["status"] == "completed"
+        assert [error["path"] for error in job["errors"]] == ["a.txt"]
+        assert [(item["name"], item["is_folder"]) for item in listing["items"]] == [("a.txt", True), ("b.txt", False)]
+
+    async def test_parallel_members_keep_content_and_clean_up_on_error(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+        monkeypatch,
+    ):
+        """Members inflated on several workers land intact; a corrupt member is reported on the job and leaves no staging files."""
+        import hashlib
+        import os
+        from src.config.app_config import settings
+        from src.deps import get_storage
+
+        monkeypatch.setattr(settings, "zip_import_workers", 4)
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+
+        contents = {f"m{i}.txt": (f"member {i} ".encode() + os.urandom(16).hex().encode()) * 40_000 for i in range(6)}
+        zip_buffer = io.BytesIO()
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for name, content in contents.items():
+                zip_file.writestr(name, content)
+        archive = zip_buffer.getvalue()
+
+        staging_dir = get_storage()._get_staging_path("probe").parent
+        staged_before = set(os.listdir(staging_dir)) if staging_dir.exists() else set()
+
+        try:
+            response = await client.post("/api/v1/files/zip", files={"file": ("parallel.zip", archive, "application/zip")})
+            assert response.status_code == 202
+            job = (await client.get(f"/api/v1/files/zip/jobs/{response.json()['job_id']}")).json()
+            assert job["entries_processed"] == 6 and job["error_count"] == 0
+
+            response = await client.get("/api/v1/files/")
+            root = next(f for f in response.json()["items"] if f["name"] == "parallel")
+            response = await client.get("/api/v1/files/", params={"folder_id": root["id"]})
+            for item in response.json()["items"]:
+                download = await client.get(f"/api/v1/files/{item['id']}/download")
+                assert hashlib.sha256(download.content).digest() == hashlib.sha256(contents[item["name"]]).digest()
+
+            # Flip a byte inside the last member's compressed data: its CRC check fails mid-import
+            info = zipfile.ZipFile(io.BytesIO(archive)).getinfo("m5.txt")
+            data_start = info.header_offset + 30 + len(info.filename.encode()) + len(info.extra)
+            corrupt = bytearray(archive)
+            corrupt[data_start + info.compress_size // 2] ^= 0xFF
+            response = await client.post("/api/v1/files/zip", files={"file": ("broken.zip", bytes(corrupt), "application/zip")})
+            assert response.status_code == 202
+            job = (await client.get(f"/api/v1/files/zip/jobs/{response.json()['job_id']}")).json()
+            assert job["status"] == "completed"
+            assert job["entries_processed"] == 6
+            assert job["error_count"] == 1
+            assert job["errors"][0]["path"] == "m5.txt"
+            assert set(os.listdir(staging_dir)) == staged_before
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_failed_worker_stops_the_others_before_cleanup(self, tmp_path, monkeypatch):
+        """An unexpected error in one staging worker cancels the rest, so nothing is staged after the cleanup."""
+        import asyncio
+        import os
+        from src.application.file_service import FileService
+        from src.application.logbook_service import LogbookService
+        from src.config.app_config import settings
+        from src.common.utils.zip_utils import plan_zip_import
+        from src.infrastructure.storage.LocalBlobStorage import LocalBlobStorage
+
+        monkeypatch.setattr(settings, "zip_import_workers", 4)
+        storage = LocalBlobStorage(base_path=str(tmp_path))
+        real_stage = storage.stage
+
+        async def stage(stream):
+            if not hasattr(stage, "failed"):
+                stage.failed = True
+                raise OSError("disk full")
+            await asyncio.sleep(0.05)
+            return await real_stage(stream)
+
+        monkeypatch.setattr(storage, "stage", stage)
+
+        zip_buffer = io.BytesIO()
+        with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
+            for i in range(8):
+                zip_file.writestr(f"m{i}.txt", b"x" * 100)
+        with zipfile.ZipFile(zip_buffer) as zip_ref:
+            _, members = plan_zip_import(zip_ref.infolist())
+            with pytest.raises(OSError):
+                await FileService(LogbookService(), storage)._stage_zip_members(zip_ref, members)
+
+        await asyncio.sleep(0.2)
+        staging_dir = storage._get_staging_path("probe").parent
+        assert not staging_dir.exists() or os.listdir(staging_dir) == []
+
+    async def test_import_job_reports_progress_per_batch(
+        self,
+        client: AsyncClient,
+        sqlite_uow: SqlAlchemyUoW,
+        monkeypatch,
+    ):
+        """Counters add up across batches, empty folders are created, and other users cannot see the job."""
+        from src.config.app_config import settings
+
+        monkeypatch.setattr(settings, "zip_import_batch_entries", 2)
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+
+        from src.api.auto_auth import current_user as real_current_user
+        from src.api.schemas.users import UserFromToken
+
+        async def fake_current_user():
+            return UserFromToken(id=user.id, email=user.email, display_name=user.display_name)
+
+        app.dependency_overrides[real_current_user] = fake_current_user
+
+        zip_buffer = io.BytesIO()
+        with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
+            zip_file.writestr("a/one.txt", b"same")
+            zip_file.writestr("a/two.txt", b"same")
+            zip_file.writestr("b/three.txt", b"three")
+            zip_file.writestr("b/c/four.txt", b"four!")
+            zip_file.writestr("b/c/five.txt", b"same")
+            zip_file.writestr("empty/", b"")
+
+        try:
+            response = await client.post("/api/v1/files/zip", files={"file": ("batches.zip", zip_buffer.getvalue(), "application/zip")})
+            assert response.status_code == 202
+            assert response.json()["entries_total"] == 5
+            job_id = response.json()["job_id"]
+
+            job = (await client.get(f"/api/v1/files/zip/jobs/{job_id}")).json()
+            assert job["status"] == "completed"
+            assert job["entries_processed"] == 5
+            assert job["dedup_hits"] == 2
+            assert job["bytes_written"] == len(b"same") + len(b"three") + len(b"four!")
+            assert job["error_count"] == 0 and job["errors"] == []
+            assert job["finished_at"] is not None
+
+            response = await client.get("/api/v1/files/", params={"folder_id": job["root_folder_id"]})
+            assert sorted(item["name"] for item in response.json()["items"]) == ["a", "b", "empty"]
+
+            async def other_user():
+                return UserFromToken(id=uuid.uuid4(), email="other@example.com", display_name="Other")
+
+            app.dependency_overrides[real_current_user] = other_user
+            response = await client.get(f"/api/v1/files/zip/jobs/{job_id}")
+            assert response.status_code == 404
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_interrupted_job_resumes_from_last_committed_batch(
+        self,
+        sqlite_uow: SqlAlchemyUoW,
+        monkeypatch,
+    ):
+        """A worker killed after the first batch leaves the job running; resuming finishes it without re-importing committed files."""
+        import asyncio
+        from datetime import timedelta
+        from sqlalchemy import select, update
+        from starlette.datastructures import UploadFile, Headers
+        from src.common.utils.time_utils import utcnow
+        from src.domain.entities.zip_import_job import ZipImportJob
+        from src.application.file_service import FileService
+        from src.application.logbook_service import LogbookService
+        from src.config.app_config import settings
+        from src.deps import get_storage
+        from src.domain.entities.file import File
+        from src.domain.entities.file_version import FileVersion
+
+        monkeypatch.setattr(settings, "zip_import_batch_entries", 2)
+        seed = TestDataSeed(sqlite_uow)
+        user = await seed.seed_user()
+        storage = get_storage()
+        filesvc = FileService(LogbookService(), storage)
+
+        zip_buffer = io.BytesIO()
+        with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
+            for i in range(5):
+                zip_file.writestr(f"data/file{i}.txt", f"content {i}".encode())
+        zip_buffer.seek(0)
+        upload = UploadFile(file=zip_buffer, filename="resume.zip", headers=Headers({"content-type": "application/zip"}))
+        job_id = (await filesvc.create_zip_import_job(sqlite_uow, user.id, upload, None, "127.0.0.1", "tests"))["job_id"]
+
+        stage = filesvc._stage_zip_members
+        batches = 0
+
+        async def dying_stage(zip_ref, file_members):
+            nonlocal batches
+            batches += 1
+            if batches == 2:
+                raise asyncio.CancelledError()
+            return await stage(zip_ref, file_members)
+
+        monkeypatch.setattr(filesvc, "_stage_zip_members", dying_stage)
+        with pytest.raises(asyncio.CancelledError):
+            await filesvc.run_zip_import_job(sqlite_uow, job_id)
+        monkeypatch.setattr(filesvc, "_stage_zip_members", stage)
+
+        job = await filesvc.get_zip_import_job(sqlite_uow, user.id, job_id)
+        assert job.status == "running"
+        assert job.entries_processed == 2
+        assert [data async for data in storage.read_import_archive(str(job_id))]
+        # The archive is not in the upload-session chunk area
+        assert await storage.list_chunks(str(job_id)) == {}
+
+        # The lease has not expired yet: the job may still belong to a live worker
+        assert await filesvc.resume_zip_import_jobs(sqlite_uow) == 0
+
+        # The dead worker sends no more heartbeats: once its lease runs out, the job is taken over
+        async with sqlite_uow:
+            await sqlite_uow.session.execute(
+                update(ZipImportJob)
+                .where(ZipImportJob.id == job_id)
+                .values(updated_at=utcnow() - timedelta(seconds=settings.zip_import_lease_s + 1))
+            )
+        assert await filesvc.resume_zip_import_jobs(sqlite_uow) == 1
+
+        job = await filesvc.get_zip_import_job(sqlite_uow, user.id, job_id)
+        assert job.status == "completed"
+        assert job.entries_processed == 5
+        with pytest.raises(FileNotFoundError):
+            [data async for data in storage.read_import_archive(str(job_id))]
+        # The archive is gone and the job is finished: nothing left to resume
+        assert await filesvc.resume_zip_import_jobs(sqlite_uow) == 0
+
+        async with sqlite_uow:
+            versions = (await sqlite_uow.session.execute(
+                select(File.name, FileVersion.version_no)
+                .join(FileVersion, FileVersion.id == File.current_version_id)
+                .where(File.owner_id == user.id)
+            )).all()
+        assert sorted(versions) == [(f"file{i}.txt", 1) for i in range(5)]
@@ -0,0 +1,115 @@
+"""
+Tests for BlobCache and CachedBlobStorage.
+"""
+import os
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.infrastructure.storage.CachedBlobStorage import BlobCache, CachedBlobStorage
+from src.infrastructure.storage.LocalBlobStorage import LocalBlobStorage
+from tests.helpers import StorageTestHelper
+
+KB = 1024
+MB = 1024 * KB
+
+
+class TestBlobCache:
+    """Tests for the LRU + TinyLFU policy."""
+
+    def test_lru_eviction_within_budget(self):
+        """Equally popular entries are evicted least recently used first, never exceeding the budget."""
+        cache = BlobCache(max_bytes=3 * KB, max_object_bytes=KB)
+        for key in "abc":
+            cache.get(key)
+            assert cache.put(key, b"x" * KB)
+        cache.get("a")  # "b" becomes the least recently used
+
+        cache.get("d")
+        assert cache.put("d", b"x" * KB)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.size_bytes == 3 * KB
+        assert cache.evictions == 1
+
+    def test_object_ceiling(self):
+        """Objects above the per-object limit are never stored."""
+        cache = BlobCache(max_bytes=10 * KB, max_object_bytes=KB)
+        assert not cache.put("big", b"x" * (KB + 1))
+        assert cache.size_bytes == 0
+
+    def test_scan_does_not_flush_popular_entries(self):
+        """A one-off sweep over many blobs cannot push out frequently read ones."""
+        cache = BlobCache(max_bytes=4 * KB, max_object_bytes=KB)
+        for key in ("logo", "config"):
+            for _ in range(5):
+                cache.get(key)
+            cache.put(key, b"x" * KB)
+
+        for i in range(100):
+            key = f"scan-{i}"
+            if cache.get(key) is None:
+                cache.put(key, b"x" * KB)
+
+        assert cache.get("logo") is not None
+        assert cache.get("config") is not None
+        assert cache.rejections > 0
+        assert cache.size_bytes <= 4 * KB
+
+
+@pytest.mark.asyncio
+class TestCachedBlobStorage:
+    """Tests for the caching wrapper."""
+
+    async def test_second_read_is_a_hit(self, tmp_path):
+        """The first read goes to storage, the next ones come from memory."""
+        inner = LocalBlobStorage(base_path=str(tmp_path))
+        storage = CachedBlobStorage(inner, BlobCache(max_bytes=MB, max_object_bytes=MB))
+        content = os.urandom(300 * KB)
+        file_hash, _, _ = await StorageTestHelper.put(storage, content)
+
+        assert await StorageTestHelper.collect(storage.get(file_hash)) == content
+        # Now served from memory, even with the file gone from disk
+        inner._get_path(file_hash).unlink()
+        assert await StorageTestHelper.collect(storage.get(file_hash)) == content
+        assert await StorageTestHelper.collect(storage.get_range(file_hash, 10, 19)) == content[10:20]
+
+        snapshot = storage.cache.snapshot()
+        assert snapshot["hits"] == 2
+        assert snapshot["misses"] == 1
+
+    async def test_large_blob_streams_without_caching(self, tmp_path):
+        """Blobs above the ceiling still stream in full but are not kept."""
+        storage = CachedBlobStorage(LocalBlobStorage(base_path=str(tmp_path)), BlobCache(max_bytes=MB, max_object_bytes=64 * KB))
+        content = os.urandom(3 * MB)
+        file_hash, _, _ = await StorageTestHelper.put(storage, content)
+
+        assert await StorageTestHelper.collect(storage.get(file_hash)) == content
+        assert storage.cache.size_bytes == 0
+
+    async def test_delete_invalidates(self, tmp_path):
+        """Deleting a blob drops its cached copy."""
+        storage = CachedBlobStorage(LocalBlobStorage(base_path=str(tmp_path)), BlobCache(max_bytes=MB, max_object_bytes=MB))
+        file_hash, _, _ = await StorageTestHelper.put(storage, b"shared logo")
+        await StorageTestHelper.collect(storage.get(file_hash))
+
+        await storage.delete(file_hash)
+
+        assert storage.cache.size_bytes == 0
+        with pytest.raises(FileNotFoundError):
+            await StorageTestHelper.collect(storage.get(file_hash))
+
+
+@pytest.mark.asyncio
+class TestBlobCacheMetrics:
+    """Tests for the blob cache metrics endpoint."""
+
+    async def test_requires_login(self, client):
+        """Cache counters are not served to anonymous callers."""
+        response = await client.get("/api/v1/metrics/blob-cache")
+        assert response.status_code == 401
@@ -0,0 +1,150 @@
+"""
+Tests for content-defined chunking and ChunkedBlobStorage.
+"""
+import hashlib
+import os
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.common.utils.cdc_utils import ContentDefinedChunker
+from src.common.utils.process_utils import shutdown_pool
+from src.infrastructure.storage.ChunkedBlobStorage import ChunkedBlobStorage
+from src.infrastructure.storage.LocalBlobStorage import LocalBlobStorage
+from src.common.utils.stream_utils import AsyncBytesIO
+from tests.helpers import StorageTestHelper
+
+KB = 1024
+
+
+def _chunk(data: bytes, read_size: int = 64 * KB) -> list[bytes]:
+    chunker = ContentDefinedChunker(4 * KB, 16 * KB, 64 * KB)
+    chunks = []
+    for i in range(0, len(data), read_size):
+        chunks += chunker.feed(data[i:i + read_size])
+    return chunks + chunker.flush()
+
+
+class TestContentDefinedChunker:
+    """Tests for chunk boundaries."""
+
+    def test_chunks_reassemble_within_bounds(self):
+        """Chunks concatenate back to the input and respect min/max sizes."""
+        data = os.urandom(1024 * KB)
+        chunks = _chunk(data)
+
+        assert b"".join(chunks) == data
+        assert all(4 * KB <= len(c) <= 64 * KB for c in chunks[:-1])
+
+    def test_boundaries_do_not_depend_on_read_size(self):
+        """The same content gives the same chunks however the stream is split."""
+        data = os.urandom(512 * KB)
+
+        assert _chunk(data, read_size=7 * KB) == _chunk(data, read_size=256 * KB)
+
+    def test_insert_only_changes_nearby_chunks(self):
+        """Inserting bytes in the middle keeps most chunk hashes unchanged."""
+        data = os.urandom(1024 * KB)
+        edited = data[:500 * KB] + b"inserted" + data[500 * KB:]
+
+        before = {hashlib.sha256(c).digest() for c in _chunk(data)}
+        after = [hashlib.sha256(c).digest() for c in _chunk(edited)]
+
+        assert len([h for h in after if h not in before]) <= 3
+
+    def test_boundaries_found_in_any_content(self):
+        """Boundaries come from a rolling hash over every byte, not from marker bytes such as newlines."""
+        data = os.urandom(1024 * KB).replace(b"\n", b"")
+        chunks = _chunk(data)
+        sizes = [len(c) for c in chunks[:-1]]
+
+        assert sum(size == 64 * KB for size in sizes) < len(sizes) // 4
+        assert 8 * KB <= sum(sizes) / len(sizes) <= 32 * KB
+
+        edited = data[:300 * KB] + b"x" + data[300 * KB:]
+        before = {hashlib.sha256(c).digest() for c in chunks}
+        assert len([c for c in _chunk(edited) if hashlib.sha256(c).digest() not in before]) <= 3
+
+    def test_rejects_min_size_below_hash_window(self):
+        """Chunks shorter than the gear hash window would get boundaries from the previous chunk."""
+        with pytest.raises(ValueError):
+            ContentDefinedChunker(32, 16 * KB, 64 * KB)
+
+    @pytest.mark.asyncio
+    async def test_process_pool_gives_same_boundaries(self):
+        """Boundaries computed in the process pool match the inline scan."""
+        data = os.urandom(2048 * KB)
+        chunker = ContentDefinedChunker(4 * KB, 16 * KB, 64 * KB)
+        chunks = []
+        for i in range(0, len(data), 512 * KB):
+            chunks += await chunker.feed_async(data[i:i + 512 * KB])
+
+        assert chunks + chunker.flush() == _chunk(data)
+        shutdown_pool()
+
+
+@pytest.mark.asyncio
+class TestChunkedBlobStorage:
+    """Tests for the chunked blob format."""
+
+    async def test_roundtrip(self, tmp_path):
+        """A chunked blob reads back byte-for-byte."""
+        storage = ChunkedBlobStorage(LocalBlobStorage(base_path=str(tmp_path)), 4 * KB, 16 * KB, 64 * KB)
+        content = os.urandom(300 * KB)
+
+        file_hash, _, stored_bytes = await StorageTestHelper.put(storage, content)
+
+        assert stored_bytes >= len(content)
+        assert await storage.exists(file_hash)
+        assert await StorageTestHelper.collect(storage.get(file_hash)) == content
+
+    async def test_new_version_stores_only_changed_chunks(self, tmp_path):
+        """A small edit to a large blob adds a few chunks, not a full copy."""
+        storage = ChunkedBlobStorage(LocalBlobStorage(base_path=str(tmp_path)), 4 * KB, 16 * KB, 64 * KB)
+        content = os.urandom(1024 * KB)
+        edited = content[:600 * KB] + b"one changed page" + content[600 * KB + 16:]
+
+        await StorageTestHelper.put(storage, content)
+        file_hash, _, stored_bytes = await StorageTestHelper.put(storage, edited)
+
+        assert stored_bytes < len(edited) // 4
+        assert await StorageTestHelper.collect(storage.get(file_hash)) == edited
+
+    async def test_reads_blobs_stored_whole(self, tmp_path):
+        """Blobs written before chunking was enabled stay readable."""
+        inner = LocalBlobStorage(base_path=str(tmp_path))
+        content = b"legacy blob"
+        file_hash = hashlib.sha256(content).hexdigest()
+        await inner.save(AsyncBytesIO(content), file_hash)
+
+        storage = ChunkedBlobStorage(inner, 4 * KB, 16 * KB, 64 * KB)
+
+        assert await storage.exists(file_hash)
+        assert await StorageTestHelper.collect(storage.get(file_hash)) == content
+
+    async def test_garbage_collection_frees_unreferenced_chunks(self, tmp_path):
+        """After a delete, chunks only the deleted blob used are swept; shared chunks stay."""
+        storage = ChunkedBlobStorage(LocalBlobStorage(base_path=str(tmp_path)), 4 * KB, 16 * KB, 64 * KB)
+        content = os.urandom(1024 * KB)
+        edited = content[:600 * KB] + os.urandom(64 * KB) + content[664 * KB:]
+        old_hash, _, _ = await StorageTestHelper.put(storage, content)
+        new_hash, _, _ = await StorageTestHelper.put(storage, edited)
+        await storage.delete(old_hash)
+
+        removed = await storage.collect_garbage({new_hash}, min_age_s=0)
+
+        assert removed > 0
+        assert not await storage.exists(old_hash)
+        assert await StorageTestHelper.collect(storage.get(new_hash)) == edited
+        assert await storage.collect_garbage({new_hash}, min_age_s=0) == 0
+
+    async def test_garbage_collection_keeps_young_objects(self, tmp_path):
+        """Objects younger than the minimum age may belong to an upload in flight and are kept."""
+        storage = ChunkedBlobStorage(LocalBlobStorage(base_path=str(tmp_path)), 4 * KB, 16 * KB, 64 * KB)
+        await StorageTestHelper.put(storage, os.urandom(300 * KB))
+
+        assert await storage.collect_garbage(set(), min_age_s=3600) == 0
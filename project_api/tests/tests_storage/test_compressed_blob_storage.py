@@ -0,0 +1,120 @@
+"""
+Tests for CompressedBlobStorage.
+"""
+import hashlib
+import os
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.infrastructure.storage.CompressedBlobStorage import CompressedBlobStorage, shannon_entropy
+from src.infrastructure.storage.ChunkedBlobStorage import ChunkedBlobStorage
+from src.infrastructure.storage.LocalBlobStorage import LocalBlobStorage
+from src.common.utils.stream_utils import AsyncBytesIO
+from tests.helpers import StorageTestHelper
+
+KB = 1024
+
+
+def test_shannon_entropy():
+    """Text sits well below the threshold, random bytes close to 8 bits per byte."""
+    assert shannon_entropy(b"") == 0.0
+    assert shannon_entropy(b"a" * 100) == 0.0
+    assert shannon_entropy(b"id,name,amount\n1,alice,10\n" * 100) < 5
+    assert shannon_entropy(os.urandom(64 * KB)) > 7.9
+
+
+@pytest.mark.asyncio
+class TestCompressedBlobStorage:
+    """Tests for the compression wrapper."""
+
+    async def test_text_is_compressed(self, tmp_path):
+        """Compressible content is stored smaller and reads back unchanged."""
+        inner = LocalBlobStorage(base_path=str(tmp_path))
+        storage = CompressedBlobStorage(inner)
+        content = b"".join(b'{"id": %d, "status": "ok"}\n' % i for i in range(200_000))
+
+        file_hash, codec, stored_bytes = await StorageTestHelper.put(storage, content)
+
+        assert codec == "zlib"
+        assert stored_bytes < len(content) // 5
+        assert not await inner.exists(file_hash)
+        assert await storage.exists(file_hash, codec)
+        assert await StorageTestHelper.collect(storage.get(file_hash, codec)) == content
+
+    async def test_high_entropy_is_stored_raw(self, tmp_path):
+        """Already-compressed content skips the codec."""
+        inner = LocalBlobStorage(base_path=str(tmp_path))
+        storage = CompressedBlobStorage(inner)
+        content = os.urandom(300 * KB)
+
+        file_hash, codec, stored_bytes = await StorageTestHelper.put(storage, content)
+
+        assert codec is None
+        assert stored_bytes == len(content)
+        assert await StorageTestHelper.collect(inner.get(file_hash)) == content
+        assert await StorageTestHelper.collect(storage.get(file_hash)) == content
+
+    async def test_save_and_delete(self, tmp_path):
+        """save() compresses with the codec codec_for() predicts and delete() removes the compressed object."""
+        storage = CompressedBlobStorage(LocalBlobStorage(base_path=str(tmp_path)))
+        content = b"hello " * 10_000
+        file_hash = hashlib.sha256(content).hexdigest()
+        codec = storage.codec_for(content)
+
+        await storage.save(AsyncBytesIO(content), file_hash)
+        assert codec == "zlib"
+        assert await StorageTestHelper.collect(storage.get(file_hash, codec)) == content
+
+        await storage.delete(file_hash)
+        assert not await storage.exists(file_hash, codec)
+
+    async def test_chunks_are_compressed_under_chunking(self, tmp_path):
+        """Chunking on top of compression stores each chunk compressed and reassembles it."""
+        storage = ChunkedBlobStorage(
+            CompressedBlobStorage(LocalBlobStorage(base_path=str(tmp_path))), 4 * KB, 16 * KB, 64 * KB
+        )
+        content = b"".join(b"row %d;value\n" % i for i in range(50_000))
+
+        file_hash, codec, _ = await StorageTestHelper.put(storage, content)
+
+        assert await StorageTestHelper.collect(storage.get(file_hash, codec)) == content
+        stored = sum(p.stat().st_size for p in tmp_path.rglob("*") if p.is_file())
+        assert stored < len(content) // 2
+
+    async def test_get_range(self, tmp_path):
+        """Ranges read correctly from compressed, raw and chunked blobs."""
+        inner = LocalBlobStorage(base_path=str(tmp_path))
+        storage = ChunkedBlobStorage(CompressedBlobStorage(inner), 4 * KB, 16 * KB, 64 * KB)
+        text = b"".join(b"line %d of the report\n" % i for i in range(50_000))
+        noise = os.urandom(300 * KB)
+
+        for content in (text, noise):
+            file_hash, codec, _ = await StorageTestHelper.put(storage, content)
+            for start, end in ((0, 0), (5, 70_000), (len(content) - 10, len(content) - 1)):
+                assert await StorageTestHelper.collect(storage.get_range(file_hash, start, end, codec)) == content[start:end + 1]
+
+    async def test_reads_trust_the_given_codec(self, tmp_path):
+        """Reads go straight to the key of the given codec and never probe the other one."""
+        inner = LocalBlobStorage(base_path=str(tmp_path))
+        storage = CompressedBlobStorage(inner)
+        content = b"plain text, compressed on write\n" * 10_000
+        file_hash, codec, _ = await StorageTestHelper.put(storage, content)
+
+        probed = []
+        real_exists = inner.exists
+
+        async def exists(key, codec=None):
+            probed.append(key)
+            return await real_exists(key, codec)
+
+        inner.exists = exists
+        assert await StorageTestHelper.collect(storage.get(file_hash, codec)) == content
+        assert await StorageTestHelper.collect(storage.get_range(file_hash, 0, 9, codec)) == content[:10]
+        assert await storage.local_path(file_hash, codec) is None
+        assert await storage.local_path(file_hash) is None  # no raw copy on disk
+        assert probed == []
@@ -0,0 +1,92 @@
+"""
+Tests for LocalBlobStorage.
+"""
+import hashlib
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.infrastructure.storage.LocalBlobStorage import LocalBlobStorage
+from src.application.file_service import HashingReader
+from src.common.utils.stream_utils import AsyncBytesIO
+from src.application.errors import FileTooLargeError
+from tests.helpers import StorageTestHelper
+
+
+@pytest.mark.asyncio
+class TestLocalBlobStorageStaging:
+    """Tests for the stage -> promote / discard ingest path."""
+
+    async def test_stage_and_promote(self, tmp_path):
+        """Staged bytes end up under their content address and the staging copy is gone."""
+        storage = LocalBlobStorage(base_path=str(tmp_path))
+        content = b"hello staging" * 1000
+        reader = HashingReader(AsyncBytesIO(content), max_size_bytes=1024 * 1024)
+
+        staging_id = await storage.stage(reader)
+        file_hash = reader.hexdigest()
+        assert file_hash == hashlib.sha256(content).hexdigest()
+        assert reader.size_bytes == len(content)
+
+        storage_path = await storage.promote(staging_id, file_hash)
+
+        assert Path(storage_path).exists()
+        assert await storage.exists(file_hash)
+        assert await StorageTestHelper.collect(storage.get(file_hash)) == content
+        assert not storage._get_staging_path(staging_id).exists()
+
+    async def test_promote_existing_blob_drops_staged_copy(self, tmp_path):
+        """Promoting a duplicate keeps the existing blob and removes the staged file."""
+        storage = LocalBlobStorage(base_path=str(tmp_path))
+        content = b"duplicate"
+        file_hash = hashlib.sha256(content).hexdigest()
+        await storage.save(AsyncBytesIO(content), file_hash)
+
+        staging_id = await storage.stage(AsyncBytesIO(content))
+        await storage.promote(staging_id, file_hash)
+
+        assert not storage._get_staging_path(staging_id).exists()
+        assert await StorageTestHelper.collect(storage.get(file_hash)) == content
+
+    async def test_discard(self, tmp_path):
+        """Discard removes the staged copy and is idempotent."""
+        storage = LocalBlobStorage(base_path=str(tmp_path))
+        staging_id = await storage.stage(AsyncBytesIO(b"to be dropped"))
+
+        await storage.discard(staging_id)
+        await storage.discard(staging_id)
+
+        assert not storage._get_staging_path(staging_id).exists()
+
+    async def test_stage_too_large_leaves_nothing(self, tmp_path):
+        """A stream exceeding the limit aborts staging without leaving partial files."""
+        storage = LocalBlobStorage(base_path=str(tmp_path))
+        reader = HashingReader(AsyncBytesIO(b"x" * 4096), max_size_bytes=1024)
+
+        with pytest.raises(FileTooLargeError):
+            await storage.stage(reader)
+
+        assert list((tmp_path / ".staging").iterdir()) == []
+
+
+@pytest.mark.asyncio
+class TestLocalBlobStorageImportArchives:
+    """Tests for ZIP import archives kept apart from upload-session chunks."""
+
+    async def test_archive_roundtrip_outside_upload_chunks(self, tmp_path):
+        """An import archive reads back intact, is not listed as upload chunks and is removed on delete."""
+        storage = LocalBlobStorage(base_path=str(tmp_path))
+        content = b"PK archive bytes" * 1000
+
+        assert await storage.save_import_archive("job-1", AsyncBytesIO(content)) == len(content)
+
+        assert await StorageTestHelper.collect(storage.read_import_archive("job-1")) == content
+        assert await storage.list_chunks("job-1") == {}
+
+        await storage.delete_import_archive("job-1")
+        with pytest.raises(FileNotFoundError):
+            await StorageTestHelper.collect(storage.read_import_archive("job-1"))
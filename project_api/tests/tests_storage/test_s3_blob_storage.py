@@ -0,0 +1,145 @@
+"""
+Tests for S3BlobStorage multipart streaming (against an in-memory fake S3 client).
+"""
+import asyncio
+import pytest
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+from botocore.exceptions import ClientError
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.infrastructure.storage.S3BlobStorage import S3BlobStorage, MIN_PART_SIZE
+from src.common.utils.stream_utils import AsyncBytesIO
+
+
+class FakeS3:
+    """Minimal in-memory stand-in for the aioboto3 S3 client calls used by S3BlobStorage."""
+
+    def __init__(self, fail_on_part: int | None = None):
+        self.objects: dict[str, bytes] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.aborted: list[str] = []
+        self.fail_on_part = fail_on_part
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def put_object(self, Bucket, Key, Body):
+        self.objects[Key] = Body
+
+    async def create_multipart_upload(self, Bucket, Key):
+        upload_id = f"upload-{len(self.uploads) + len(self.aborted)}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    async def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if PartNumber == self.fail_on_part:
+                raise ClientError({"Error": {"Code": "InternalError"}}, "UploadPart")
+            self.uploads[UploadId][PartNumber] = Body
+            return {"ETag": f'"etag-{PartNumber}"'}
+        finally:
+            self.in_flight -= 1
+
+    async def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        self.objects[Key] = b"".join(parts[p["PartNumber"]] for p in MultipartUpload["Parts"])
+
+    async def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId, None)
+        self.aborted.append(UploadId)
+
+
+def _storage_with(fake: FakeS3, max_concurrency: int = 2) -> S3BlobStorage:
+    storage = S3BlobStorage(
+        bucket="test-bucket",
+        region="us-east-1",
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+        part_size=MIN_PART_SIZE,
+        max_concurrency=max_concurrency,
+    )
+
+    @asynccontextmanager
+    async def fake_client():
+        yield fake
+
+    storage._client = fake_client
+    return storage
+
+
+@pytest.mark.asyncio
+class TestS3MultipartSave:
+    """Tests for streaming multipart uploads in S3BlobStorage."""
+
+    async def test_small_file_uses_single_put(self):
+        """Content smaller than one part goes through put_object."""
+        fake = FakeS3()
+        storage = _storage_with(fake)
+
+        await storage.save(AsyncBytesIO(b"small"), "hash-small")
+
+        assert fake.objects["hash-small"] == b"small"
+        assert fake.uploads == {}
+
+    async def test_large_file_multipart_with_bounded_window(self):
+        """Large content is split into parts, reassembled in order, with at most max_concurrency parts in flight."""
+        fake = FakeS3()
+        storage = _storage_with(fake, max_concurrency=2)
+        content = bytes(range(256)) * (MIN_PART_SIZE * 5 // 256) + b"tail"
+
+        await storage.save(AsyncBytesIO(content), "hash-large")
+
+        assert fake.objects["hash-large"] == content
+        assert fake.max_in_flight <= 2
+        assert fake.aborted == []
+
+    async def test_failed_part_aborts_upload(self):
+        """A failing part aborts the multipart upload and re-raises."""
+        fake = FakeS3(fail_on_part=2)
+        storage = _storage_with(fake)
+        content = b"x" * (MIN_PART_SIZE * 3)
+
+        with pytest.raises(ClientError):
+            await storage.save(AsyncBytesIO(content), "hash-fail")
+
+        assert "hash-fail" not in fake.objects
+        assert len(fake.aborted) == 1
+        assert fake.uploads == {}
+
+
+@pytest.mark.asyncio
+class TestS3SharedClient:
+    """Tests for the process-wide client opened by the app lifespan."""
+
+    async def test_open_shares_one_client_until_close(self):
+        """After open() every operation borrows the same client; close() returns to per-call clients."""
+        storage = S3BlobStorage(
+            bucket="test-bucket",
+            region="us-east-1",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+            endpoint_url="http://127.0.0.1:9",
+            max_pool_connections=32,
+        )
+        async with storage._client() as first, storage._client() as second:
+            assert first is not second
+
+        await storage.open()
+        try:
+            async with storage._client() as first:
+                pass
+            async with storage._client() as second:
+                assert second is first
+            assert first.meta.config.max_pool_connections == 32
+        finally:
+            await storage.close()
+
+        async with storage._client() as third:
+            assert third is not first